@@ -8,13 +8,132 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
     
+    # Storage backend: "firebase" (Realtime Database) or "sqlite" (embedded, WAL mode)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "firebase")
+    
     # Firebase settings
     FIREBASE_CREDENTIALS_PATH: str = os.getenv("FIREBASE_CREDENTIALS_PATH", "credentials/firebase_service_account.json")
     FIREBASE_DATABASE_URL: str = os.getenv("FIREBASE_DATABASE_URL", "https://sihp-2135d-default-rtdb.firebaseio.com/")
     
+    # SQLite settings
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "data/smart_captcha.db")
+    SQLITE_POOL_SIZE: int = 4
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Blacklist lookup cache (TTLs in seconds)
+    BOT_CACHE_MAX_ENTRIES: int = 10000
+    BOT_CACHE_POSITIVE_TTL: float = 300.0
+    BOT_CACHE_NEGATIVE_TTL: float = 5.0
+    
+    # Visit rate limit: more than VISIT_THRESHOLD visits in VISIT_WINDOW_MS blacklists a fingerprint.
+    # "local" counts in memory per process, "storage" queries the stored visits (plus queued ones).
+    VISIT_COUNTER_BACKEND: str = os.getenv("VISIT_COUNTER_BACKEND", "local")
+    VISIT_WINDOW_MS: int = 30000
+    VISIT_THRESHOLD: int = 15
+    VISIT_COUNTER_BUCKET_MS: int = 1000
+    VISIT_COUNTER_MAX_KEYS: int = 100000
+    
+    # Write-behind visit storage: respond once queued, flush in multi-path updates.
+    # When the queue is full, "block" applies backpressure and "drop" discards the visit.
+    VISIT_WRITE_BEHIND_ENABLED: bool = False
+    VISIT_QUEUE_MAX_SIZE: int = 10000
+    VISIT_FLUSH_INTERVAL_MS: float = 200.0
+    VISIT_FLUSH_MAX_RECORDS: int = 500
+    VISIT_QUEUE_FULL_POLICY: str = os.getenv("VISIT_QUEUE_FULL_POLICY", "block")
+    
+    # Browser automation rules: JSON rule file, polled for changes every RELOAD_INTERVAL seconds (0 = never)
+    BROWSER_RULES_PATH: str = os.getenv("BROWSER_RULES_PATH", "app/config/browser_rules.json")
+    BROWSER_RULES_RELOAD_INTERVAL: float = 5.0
+    BROWSER_VERDICT_CACHE_SIZE: int = 4096
+    
     # Model settings
     MOUSE_MODEL_PATH: str = os.getenv("MOUSE_MODEL_PATH", "models/MouseVerifier.pkl")
     KEYBOARD_MODEL_PATH: str = os.getenv("KEYBOARD_MODEL_PATH", "models/KeyboardVerifier.pkl")
+    MOUSE_SESSION_MODEL_PATH: str = os.getenv("MOUSE_SESSION_MODEL_PATH", "models/MouseSessionVerifier.pkl")
+    SCROLL_MODEL_PATH: str = os.getenv("SCROLL_MODEL_PATH", "models/ScrollVerifier.pkl")
+    
+    # Keyboard feature layout: comma-separated fields, 4 features each (KeyboardVerifier.pkl
+    # expects one field). Empty keeps every field present, sorted by name, as in keypress.py
+    KEYBOARD_FIELD_ORDER: str = os.getenv("KEYBOARD_FIELD_ORDER", "username")
+    
+    # Mouse scoring mode: "point" votes over every event, "session" over 20-event window summaries
+    MOUSE_MODEL_MODE: str = os.getenv("MOUSE_MODEL_MODE", "point")
+    
+    # Mouse upload bounds: at most MOUSE_MAX_EVENTS events are scored (0 = no cap), kept as evenly
+    # spaced contiguous blocks so per-step features keep their native sampling rate. MOUSE_REDUCTION
+    # then thins each block: "none", "rdp" (Ramer-Douglas-Peucker, MOUSE_RDP_EPSILON pixels) or
+    # "resample" (first event in every MOUSE_RESAMPLE_INTERVAL_MS slot)
+    MOUSE_MAX_EVENTS: int = 5000
+    MOUSE_REDUCTION: str = os.getenv("MOUSE_REDUCTION", "none")
+    MOUSE_RDP_EPSILON: float = 1.0
+    MOUSE_RESAMPLE_INTERVAL_MS: float = 8.0
+    
+    # Model evaluator: "sklearn" uses the pickled estimator, "compiled" the flat-array CompiledForest
+    MODEL_BACKEND: str = os.getenv("MODEL_BACKEND", "sklearn")
+    
+    # Startup: "eager" builds the services and loads the models when app.main is imported, "lazy"
+    # defers pandas, sklearn, firebase_admin and the models to the first request needing them, and
+    # "prefork" is set by `python -m app.prefork`, which loads the models once in a parent process
+    # and forks PREFORK_WORKERS workers (0 = os.cpu_count()) sharing them copy-on-write
+    STARTUP_MODE: str = os.getenv("STARTUP_MODE", "eager")
+    PREFORK_WORKERS: int = 0
+    
+    # Warm-up before readiness: once started, each worker scores WARMUP_ROUNDS rounds of synthetic
+    # mouse, key and scroll uploads (WARMUP_EVENTS events each) through every detector and checks the
+    # browser rules and a storage lookup. /health/ready answers 503 until a warm-up succeeds; failed
+    # ones are retried every WARMUP_RETRY_INTERVAL seconds. Disabled, workers are ready at once.
+    WARMUP_ENABLED: bool = True
+    WARMUP_ROUNDS: int = 2
+    WARMUP_EVENTS: int = 300
+    WARMUP_RETRY_INTERVAL: float = 10.0
+    
+    # Inference executor: "thread" pool or "process" pool (models loaded once per worker)
+    INFERENCE_EXECUTOR: str = os.getenv("INFERENCE_EXECUTOR", "thread")
+    INFERENCE_WORKERS: int = 0  # 0 = os.cpu_count()
+    INFERENCE_MAX_CONCURRENCY: int = 0  # 0 = 2 x workers
+    INFERENCE_THREADS_PER_WORKER: int = 1  # BLAS/OpenMP threads per worker
+    
+    # Inference micro-batching across concurrent requests
+    INFERENCE_BATCHING_ENABLED: bool = False
+    INFERENCE_BATCH_MAX_ROWS: int = 64
+    INFERENCE_BATCH_MAX_WAIT_MS: float = 2.0
+    
+    # Content-addressed verdict cache: ML verdicts keyed by a hash of the uploaded bytes, within
+    # VERDICT_CACHE_MAX_BYTES of memory. A byte-identical re-upload skips parsing and inference
+    # and is listed in "replayed", since a recorded session never produces the same CSV twice.
+    # Off by default: a client retrying the same upload would be reported as a replay
+    VERDICT_CACHE_ENABLED: bool = False
+    VERDICT_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    VERDICT_CACHE_TTL: float = 3600.0
+    
+    # Short-circuit scoring: run signals cheapest first (browser, blacklist, keyboard, mouse)
+    # and skip the rest once one flags a bot, since the verdict can no longer change
+    SHORT_CIRCUIT_ENABLED: bool = False
+    
+    # Streaming scoring: early mouse verdict once STREAM_MIN_EVENTS are scored and the
+    # Wilson lower bound of the leading class reaches STREAM_VERDICT_CONFIDENCE.
+    # In "session" mouse mode at most STREAM_MAX_SESSION_EVENTS mouse events are buffered per stream
+    STREAM_MIN_EVENTS: int = 30
+    STREAM_VERDICT_CONFIDENCE: float = 0.9
+    STREAM_MAX_FRAME_EVENTS: int = 1000
+    STREAM_MAX_SESSION_EVENTS: int = 50000
+    
+    # Per-stage latency histograms and queue gauges, served on /metrics in Prometheus format
+    METRICS_ENABLED: bool = True
+    
+    # Per-request sampling profiler. A request is profiled when it carries an X-Profile-Request
+    # header signed with PROFILING_SECRET, or is picked at PROFILING_SAMPLE_RATE among PROFILING_PATHS.
+    # The newest PROFILING_MAX_FILES profiles ("speedscope" or "collapsed") are kept in PROFILING_DIR
+    # and served on /admin/profiles to callers presenting the secret as a bearer token.
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: str = os.getenv("PROFILING_SECRET", "")
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_PATHS: str = os.getenv("PROFILING_PATHS", "/api/predict_behavior,/api/add_visit_info")
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_MAX_CONCURRENT: int = 4
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "data/profiles")
+    PROFILING_MAX_FILES: int = 200
+    PROFILING_FORMAT: str = os.getenv("PROFILING_FORMAT", "speedscope")
     
     class Config:
         env_file = ".env"
@@ -3,7 +3,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
-from app.routes import api_router
+from app.middleware import InFlightMiddleware, ProfilingMiddleware
+from app.repositories.factory import get_repository, repository_loaded
+from app.routes import admin_router, api_router, health_router, metrics_router
+from app.services.factory import behavior_service_loaded, get_behavior_service, get_startup_mode
+from app.services.warmup import get_warmup
 
 # Configure logging
 logging.basicConfig(
@@ -33,22 +37,49 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Count requests in flight for /metrics
+    if settings.METRICS_ENABLED:
+        app.add_middleware(InFlightMiddleware)
+    
+    # Sample the stacks of signed or randomly picked requests
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
+    
     # Include routers
     app.include_router(api_router)
+    app.include_router(health_router)
+    app.include_router(metrics_router)
+    app.include_router(admin_router)
     
     return app
 
 app = create_application()
 
+# Eager startup loads the models before serving; prefork workers build the
+# services after the fork, from the models their parent loaded
+if get_startup_mode() == 'eager':
+    get_behavior_service()
+
 @app.on_event("startup")
 async def startup_event():
     """Application startup events"""
     logger.info("Starting Bot Detection API")
+    if get_startup_mode() == 'prefork':
+        get_behavior_service()
+    
+    # /health/ready stays 503 until the warm-up has scored synthetic uploads
+    get_warmup().start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown events"""
     logger.info("Shutting down Bot Detection API")
+    await get_warmup().stop()
+    # Lazy workers may not have built either
+    if repository_loaded():
+        await get_repository().close()
+    if behavior_service_loaded():
+        get_behavior_service().close()
 
 if __name__ == "__main__":
     import uvicorn
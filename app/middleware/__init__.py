@@ -0,0 +1,4 @@
+from app.middleware.metrics import InFlightMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+
+__all__ = ["InFlightMiddleware", "ProfilingMiddleware"]
\ No newline at end of file
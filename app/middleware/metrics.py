@@ -0,0 +1,24 @@
+from app.utils.metrics import get_metrics
+
+class InFlightMiddleware:
+    """
+    ASGI middleware counting HTTP requests in flight
+    
+    Plain ASGI rather than BaseHTTPMiddleware so it adds no extra task or
+    response copy per request. The counter lives on the event loop, so no
+    lock is needed.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self.metrics = get_metrics()
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        
+        self.metrics.requests_in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.metrics.requests_in_flight -= 1
\ No newline at end of file
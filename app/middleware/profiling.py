@@ -0,0 +1,59 @@
+import random
+import asyncio
+from app.config import get_settings
+from app.utils.profiling import active_profile, get_profile_store, get_profiler, verify_profile_request
+
+# Request header carrying a signature from sign_profile_request()
+PROFILE_REQUEST_HEADER = b'x-profile-request'
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected requests
+    
+    A request is profiled when it carries a valid X-Profile-Request
+    signature for its method and path, or when it is picked at
+    PROFILING_SAMPLE_RATE. The response gets an X-Profile-Id header, and the
+    profile is written to PROFILING_DIR once the response has been sent.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        settings = get_settings()
+        self.secret = settings.PROFILING_SECRET
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.paths = tuple(path.strip() for path in settings.PROFILING_PATHS.split(',') if path.strip())
+        self.profiler = get_profiler()
+        self.store = get_profile_store()
+    
+    def _wanted(self, scope) -> bool:
+        """Signed request, or a random pick among the sampled paths"""
+        for name, value in scope['headers']:
+            if name == PROFILE_REQUEST_HEADER:
+                return verify_profile_request(self.secret, scope['method'], scope['path'], value.decode('latin-1'))
+        
+        return (self.sample_rate > 0 and scope['path'].startswith(self.paths)
+                and random.random() < self.sample_rate)
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self._wanted(scope):
+            return await self.app(scope, receive, send)
+        
+        profile = self.profiler.start(scope['method'], scope['path'])
+        if profile is None:
+            return await self.app(scope, receive, send)
+        
+        async def send_with_id(message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = [*message.get('headers', []), (b'x-profile-id', profile.id.encode())]
+            await send(message)
+        
+        token = active_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            active_profile.reset(token)
+            self.profiler.stop(profile)
+            try:
+                await asyncio.to_thread(self.store.save, profile)
+            except Exception as e:
+                print(f"Error saving profile {profile.id}: {e}")
\ No newline at end of file
@@ -19,6 +19,10 @@ class BehaviorDetectionResponse(BaseModel):
     key_result: str
     is_automated: str
     is_bot: str
+    scroll_result: Optional[str] = None
+    evaluated: List[str] = Field(default_factory=list)
+    skipped: List[str] = Field(default_factory=list)
+    replayed: List[str] = Field(default_factory=list)
 
 
 class VisitInfo(BaseModel):
@@ -31,4 +35,5 @@ class VisitInfoResponse(BaseModel):
     """Response schema for visit info"""
     message: str
     timestamp: int
-    fingerprint: str
\ No newline at end of file
+    fingerprint: str
+    saved: bool = True
\ No newline at end of file
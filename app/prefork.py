@@ -0,0 +1,126 @@
+import os
+import gc
+import time
+import signal
+import socket
+import logging
+import argparse
+import resource
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Workers dying sooner than this after being forked are not replaced (they would just crash again)
+MIN_WORKER_UPTIME = 5.0
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Listening socket created once in the parent and inherited by every worker"""
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """
+    Parent process of forked uvicorn workers serving one socket
+    
+    The app is imported and every model loaded before forking, then the
+    garbage collector is frozen so collections in the workers don't write
+    to the parent's objects. Workers share those pages copy-on-write and
+    only build their own executor, repository and caches. Workers that
+    die are replaced from the same preloaded state; SIGINT and SIGTERM
+    are passed on to every worker.
+    """
+    
+    def __init__(self, sock: socket.socket, workers: int, log_level: str = 'info'):
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self._children: Dict[int, float] = {}
+        self._stopping = False
+    
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self._children[pid] = time.monotonic()
+            return
+        
+        # Worker: own process group so a terminal Ctrl-C reaches only the parent
+        exit_code = 1
+        try:
+            os.setpgid(0, 0)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            
+            import uvicorn
+            from app.main import app
+            uvicorn.Server(uvicorn.Config(app, log_level=self.log_level)).run(sockets=[self.sock])
+            exit_code = 0
+        except BaseException:
+            logger.exception("Worker %d failed", os.getpid())
+        finally:
+            os._exit(exit_code)
+    
+    def _stop(self, signum, frame):
+        self._stopping = True
+        for pid in self._children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+    
+    def run(self):
+        """Fork the workers and supervise them until they have all exited"""
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.workers):
+            self._spawn()
+        
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        
+        while self._children:
+            pid, status = os.wait()
+            started = self._children.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            
+            logger.warning("Worker %d exited with status %d", pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < MIN_WORKER_UPTIME:
+                logger.error("Worker died during startup, stopping")
+                self._stop(signal.SIGTERM, None)
+            else:
+                self._spawn()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API from forked workers sharing preloaded models")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None, help="Defaults to PREFORK_WORKERS, then os.cpu_count()")
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+    
+    # Workers build their services after the fork, see app.main
+    os.environ['STARTUP_MODE'] = 'prefork'
+    from app.config import get_settings
+    from app.services.factory import preload_models
+    
+    # Build the FastAPI app and load the models once, before forking
+    preload_started = time.perf_counter()
+    import app.main
+    preload_models()
+    workers = args.workers or get_settings().PREFORK_WORKERS or os.cpu_count() or 1
+    logger.info(
+        "Preloaded app and models in %.2fs (max RSS %d MB), forking %d workers",
+        time.perf_counter() - preload_started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024, workers
+    )
+    
+    PreforkServer(bind_socket(args.host, args.port), workers, args.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
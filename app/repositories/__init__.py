@@ -1,3 +1,15 @@
-from app.repositories.firebase_repository import FirebaseRepository
+from app.utils.lazy_imports import lazy_exports
 
-__all__ = ["FirebaseRepository"]
\ No newline at end of file
+# Imported on first access, see lazy_exports
+_EXPORTS = {
+    "BaseRepository": "app.repositories.base_repository",
+    "FirebaseRepository": "app.repositories.firebase_repository",
+    "PushIdGenerator": "app.repositories.write_behind",
+    "SQLiteRepository": "app.repositories.sqlite_repository",
+    "WriteBehindQueue": "app.repositories.write_behind",
+    "get_repository": "app.repositories.factory"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
\ No newline at end of file
@@ -0,0 +1,229 @@
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from app.config import get_settings
+from app.utils.cache import TTLCache
+from app.utils.metrics import get_metrics
+from app.utils.visit_counter import SlidingWindowCounter
+from app.repositories.write_behind import PushIdGenerator, WriteBehindQueue
+
+# Queued visit: (fingerprint, push_id, timestamp)
+VisitRecord = Tuple[str, str, int]
+
+class BaseRepository(ABC):
+    """
+    Storage interface for fingerprint visits and the bot blacklist
+    
+    Backends implement the storage primitives (_fetch_bot_status,
+    _store_visit, _write_visits, _add_bot, _count_visits_since). The
+    blacklist cache, the local visit counter and the write-behind queue
+    live here, so every backend gets them.
+    """
+    
+    def _init_state(self):
+        """Set up cache, visit counter and write-behind queue"""
+        self._init_cache()
+        self._init_visit_counter()
+        self._init_visit_writer()
+        self._metrics = get_metrics()
+        if self._visit_writer is not None:
+            writer = self._visit_writer
+            self._metrics.register_gauge('visit_queue_depth', "Visits waiting in the write-behind queue",
+                                         lambda: writer.stats()['queue_depth'])
+    
+    def _init_cache(self):
+        """Read-through blacklist cache with single-flight lookups"""
+        settings = get_settings()
+        self._bot_cache = TTLCache(settings.BOT_CACHE_MAX_ENTRIES)
+        self._bot_positive_ttl = settings.BOT_CACHE_POSITIVE_TTL
+        self._bot_negative_ttl = settings.BOT_CACHE_NEGATIVE_TTL
+        self._bot_lookups: Dict[str, asyncio.Task] = {}
+        self._bot_cache_stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}
+    
+    def _init_visit_counter(self):
+        """In-memory sliding window used for the rate-limit decision"""
+        settings = get_settings()
+        self._visit_counter_backend = settings.VISIT_COUNTER_BACKEND
+        self._visit_window_ms = settings.VISIT_WINDOW_MS
+        self._visit_threshold = settings.VISIT_THRESHOLD
+        self._visit_counter = SlidingWindowCounter(
+            window_ms=settings.VISIT_WINDOW_MS,
+            bucket_ms=settings.VISIT_COUNTER_BUCKET_MS,
+            max_keys=settings.VISIT_COUNTER_MAX_KEYS
+        )
+    
+    def _init_visit_writer(self):
+        """Optional write-behind queue for visit records"""
+        settings = get_settings()
+        self._push_id = PushIdGenerator()
+        self._visit_writer: Optional[WriteBehindQueue] = None
+        
+        # Timestamps of queued visits per fingerprint, until their batch is written
+        self._queued_visits: Dict[str, List[int]] = {}
+        if settings.VISIT_WRITE_BEHIND_ENABLED:
+            self._visit_writer = WriteBehindQueue(
+                self._write_queued_visits,
+                max_size=settings.VISIT_QUEUE_MAX_SIZE,
+                flush_interval_ms=settings.VISIT_FLUSH_INTERVAL_MS,
+                max_batch=settings.VISIT_FLUSH_MAX_RECORDS,
+                full_policy=settings.VISIT_QUEUE_FULL_POLICY
+            )
+    
+    # Storage primitives implemented by each backend
+    
+    @abstractmethod
+    async def _fetch_bot_status(self, fingerprint: str) -> bool:
+        """True if the fingerprint is stored in the blacklist"""
+    
+    @abstractmethod
+    async def _store_visit(self, fingerprint: str, push_id: str, timestamp: int):
+        """Store a single visit"""
+    
+    @abstractmethod
+    async def _write_visits(self, batch: List[VisitRecord]):
+        """Store a batch of queued visits in one operation"""
+    
+    @abstractmethod
+    async def _add_bot(self, fingerprint: str):
+        """Add a fingerprint to the blacklist"""
+    
+    @abstractmethod
+    async def _count_visits_since(self, fingerprint: str, since_ms: int) -> int:
+        """Number of stored visits with timestamp >= since_ms"""
+    
+    # Public API used by the routes and services
+    
+    async def is_bot_fingerprint(self, fingerprint: str) -> str:
+        """Check if fingerprint is in the blacklist"""
+        # Serve from cache when possible
+        cached = self._bot_cache.get(fingerprint)
+        if cached is not None:
+            self._bot_cache_stats['hits'] += 1
+            return cached
+        
+        # Share an in-flight lookup for the same fingerprint
+        lookup = self._bot_lookups.get(fingerprint)
+        if lookup is not None:
+            self._bot_cache_stats['coalesced'] += 1
+        else:
+            self._bot_cache_stats['misses'] += 1
+            lookup = asyncio.ensure_future(self._lookup_bot_fingerprint(fingerprint))
+            self._bot_lookups[fingerprint] = lookup
+            lookup.add_done_callback(lambda task: self._forget_lookup(fingerprint, task))
+        
+        # Shield so one cancelled caller doesn't cancel the shared lookup
+        return await asyncio.shield(lookup)
+    
+    async def _lookup_bot_fingerprint(self, fingerprint: str) -> str:
+        """Query the backend and populate the cache"""
+        try:
+            with self._metrics.timer('blacklist_lookup'):
+                is_bot = await self._fetch_bot_status(fingerprint)
+        except Exception as e:
+            print(f"Error checking bot status: {e}")
+            self._bot_cache_stats['errors'] += 1
+            return 'No'
+        
+        result = 'Yes' if is_bot else 'No'
+        
+        # Skip caching if the entry was invalidated while the query ran
+        if self._bot_lookups.get(fingerprint) is asyncio.current_task():
+            ttl = self._bot_positive_ttl if result == 'Yes' else self._bot_negative_ttl
+            self._bot_cache.set(fingerprint, result, ttl)
+        
+        return result
+    
+    def _forget_lookup(self, fingerprint: str, task: asyncio.Task):
+        """Remove a finished lookup unless a newer one replaced it"""
+        if self._bot_lookups.get(fingerprint) is task:
+            del self._bot_lookups[fingerprint]
+    
+    def invalidate_bot_fingerprint(self, fingerprint: str):
+        """Drop cached and in-flight blacklist state for a fingerprint"""
+        self._bot_cache.invalidate(fingerprint)
+        self._bot_lookups.pop(fingerprint, None)
+    
+    def cache_stats(self) -> dict:
+        """Blacklist cache hit/miss/coalesce counters"""
+        return {
+            **self._bot_cache_stats,
+            'size': len(self._bot_cache),
+            'max_entries': self._bot_cache.max_entries,
+            'evictions': self._bot_cache.evictions,
+            'in_flight': len(self._bot_lookups),
+        }
+    
+    async def save_fingerprint_visit(self, fingerprint: str, timestamp: int) -> dict:
+        """Save fingerprint and timestamp, blacklisting fingerprints that visit too often"""
+        try:
+            # Save fingerprint and timestamp, or queue it for the next batch write
+            saved = True
+            with self._metrics.timer('visit_write'):
+                if self._visit_writer is not None:
+                    # False when the queue is full under the "drop" policy
+                    saved = await self._visit_writer.submit((fingerprint, self._push_id(), timestamp))
+                    if saved:
+                        self._queued_visits.setdefault(fingerprint, []).append(timestamp)
+                else:
+                    await self._store_visit(fingerprint, self._push_id(), timestamp)
+            
+            # Check recent visits: counted locally, or queried from storage
+            with self._metrics.timer('recent_count'):
+                if self._visit_counter_backend == 'storage':
+                    recent_entries_count = await self.check_recent_entries(fingerprint)
+                else:
+                    recent_entries_count = self._visit_counter.record(fingerprint, timestamp)
+            
+            # If too many recent visits, add to bot list
+            if recent_entries_count > self._visit_threshold:
+                await self._add_bot(fingerprint)
+                self.invalidate_bot_fingerprint(fingerprint)
+            
+            # A dropped visit still counts towards the rate limit
+            return {
+                'message': 'Fingerprint and visit info saved successfully!' if saved
+                           else 'Visit not saved: the write queue is full',
+                'timestamp': timestamp,
+                'fingerprint': fingerprint,
+                'saved': saved
+            }
+        
+        except Exception as e:
+            print(f"Error saving fingerprint visit: {e}")
+            raise
+    
+    async def _write_queued_visits(self, batch: List[VisitRecord]):
+        """Write-behind flush: store a batch, then stop counting it as queued"""
+        try:
+            await self._write_visits(batch)
+        finally:
+            for fingerprint, _, timestamp in batch:
+                queued = self._queued_visits.get(fingerprint)
+                if queued is not None:
+                    queued.remove(timestamp)
+                    if not queued:
+                        del self._queued_visits[fingerprint]
+    
+    async def check_recent_entries(self, fingerprint: str) -> int:
+        """Count entries with the same fingerprint inside the visit window, stored or still queued"""
+        try:
+            since_ms = int(time.time() * 1000) - self._visit_window_ms
+            
+            # Taken before the query: a batch flushed meanwhile is counted twice rather than missed
+            queued = sum(1 for timestamp in self._queued_visits.get(fingerprint, ()) if timestamp >= since_ms)
+            return queued + await self._count_visits_since(fingerprint, since_ms)
+        except Exception as e:
+            print(f"Error checking recent entries: {e}")
+            return 0
+    
+    def visit_writer_stats(self) -> dict:
+        """Write-behind queue counters"""
+        if self._visit_writer is None:
+            return {'enabled': False}
+        return {'enabled': True, **self._visit_writer.stats()}
+    
+    async def close(self):
+        """Drain queued visit writes"""
+        if self._visit_writer is not None:
+            await self._visit_writer.close()
\ No newline at end of file
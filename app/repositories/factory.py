@@ -0,0 +1,21 @@
+from functools import lru_cache
+from app.config import get_settings
+from app.repositories.base_repository import BaseRepository
+
+STORAGE_BACKENDS = ('firebase', 'sqlite')
+
+@lru_cache()
+def get_repository() -> BaseRepository:
+    """Get the shared repository for the configured storage backend"""
+    backend = get_settings().STORAGE_BACKEND
+    if backend == 'sqlite':
+        from app.repositories.sqlite_repository import SQLiteRepository
+        return SQLiteRepository()
+    if backend == 'firebase':
+        from app.repositories.firebase_repository import FirebaseRepository
+        return FirebaseRepository()
+    raise ValueError(f"Unknown storage backend '{backend}', expected one of {STORAGE_BACKENDS}")
+
+def repository_loaded() -> bool:
+    """True once get_repository() has created the repository"""
+    return get_repository.cache_info().currsize > 0
\ No newline at end of file
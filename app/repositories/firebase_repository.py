@@ -1,10 +1,11 @@
-import time
 import asyncio
 import firebase_admin
+from typing import List
 from firebase_admin import credentials, db
 from app.config import get_settings
+from app.repositories.base_repository import BaseRepository, VisitRecord
 
-class FirebaseRepository:
+class FirebaseRepository(BaseRepository):
     """Repository for Firebase operations"""
     
     _instance = None
@@ -13,6 +14,7 @@ class FirebaseRepository:
         if cls._instance is None:
             cls._instance = super(FirebaseRepository, cls).__new__(cls)
             cls._instance._initialized = False
+            cls._instance._init_state()
         return cls._instance
     
     def __init__(self):
@@ -27,72 +29,49 @@ class FirebaseRepository:
             except Exception as e:
                 print(f"Error initializing Firebase: {e}")
     
-    async def is_bot_fingerprint(self, fingerprint: str) -> str:
-        """Check if fingerprint is in the blacklist"""
-        try:
-            # Reference to the 'bots' node in Firebase
-            bots_ref = db.reference('bots')
-            
-            # Query the database
-            snapshot = await asyncio.to_thread(bots_ref.child(fingerprint).get)
-            
-            # Return result
-            return 'Yes' if snapshot else 'No'
-                
-        except Exception as e:
-            print(f"Error checking bot status: {e}")
-            return 'No'
+    async def _fetch_bot_status(self, fingerprint: str) -> bool:
+        """Look the fingerprint up under the 'bots' node"""
+        # Reference to the 'bots' node in Firebase
+        bots_ref = db.reference('bots')
+        
+        # Query the database
+        snapshot = await asyncio.to_thread(bots_ref.child(fingerprint).get)
+        return bool(snapshot)
     
-    async def save_fingerprint_visit(self, fingerprint: str, timestamp: int) -> dict:
-        """Save fingerprint and timestamp to Firebase"""
-        try:
-            # Save fingerprint and timestamp
-            fingerprint_ref = db.reference(f'fingerprints/{fingerprint}')
-            new_visit_ref = fingerprint_ref.push()
-            await asyncio.to_thread(new_visit_ref.set, {
-                'timestamp': timestamp,
-                'fingerprint': fingerprint
-            })
-            
-            # Check recent visits
-            recent_entries_count = await self.check_recent_entries(fingerprint)
-            
-            # If too many recent visits, add to bot list
-            if recent_entries_count > 15:
-                bots_ref = db.reference('bots')
-                await asyncio.to_thread(bots_ref.update, {fingerprint: fingerprint})
-            
-            return {
-                'message': 'Fingerprint and visit info saved successfully!',
-                'timestamp': timestamp,
-                'fingerprint': fingerprint
-            }
-            
-        except Exception as e:
-            print(f"Error saving fingerprint visit: {e}")
-            raise
+    async def _store_visit(self, fingerprint: str, push_id: str, timestamp: int):
+        """Save fingerprint and timestamp under a locally generated push key"""
+        new_visit_ref = db.reference(f'fingerprints/{fingerprint}/{push_id}')
+        await asyncio.to_thread(new_visit_ref.set, {
+            'timestamp': timestamp,
+            'fingerprint': fingerprint
+        })
     
-    async def check_recent_entries(self, fingerprint: str) -> int:
+    async def _write_visits(self, batch: List[VisitRecord]):
+        """Store queued visits with one multi-path update"""
+        updates = {
+            f'fingerprints/{fingerprint}/{push_id}': {'timestamp': timestamp, 'fingerprint': fingerprint}
+            for fingerprint, push_id, timestamp in batch
+        }
+        await asyncio.to_thread(db.reference('/').update, updates)
+    
+    async def _add_bot(self, fingerprint: str):
+        """Add the fingerprint to the 'bots' node"""
+        bots_ref = db.reference('bots')
+        await asyncio.to_thread(bots_ref.update, {fingerprint: fingerprint})
+    
+    async def _count_visits_since(self, fingerprint: str, since_ms: int) -> int:
         """Count recent entries with the same fingerprint"""
-        try:
-            # Calculate timestamp for 30 seconds ago
-            thirty_seconds_ago = int(time.time() * 1000) - 30000
-            
-            # Reference to the database path
-            fingerprint_ref = db.reference(f'fingerprints/{fingerprint}')
-            
-            # Create a query to get entries from the last 30 seconds
-            query = fingerprint_ref.order_by_child('timestamp').start_at(thirty_seconds_ago)
-            
-            # Retrieve and count entries
-            snapshot = await asyncio.to_thread(query.get)
-            if snapshot:
-                count = len(snapshot)
-                print(f'Recent entries count: {count}')
-                return count
-            
-            return 0
-                
-        except Exception as e:
-            print(f"Error checking recent entries: {e}")
-            return 0
\ No newline at end of file
+        # Reference to the database path
+        fingerprint_ref = db.reference(f'fingerprints/{fingerprint}')
+        
+        # Create a query to get entries from the start of the window
+        query = fingerprint_ref.order_by_child('timestamp').start_at(since_ms)
+        
+        # Retrieve and count entries
+        snapshot = await asyncio.to_thread(query.get)
+        if snapshot:
+            count = len(snapshot)
+            print(f'Recent entries count: {count}')
+            return count
+        
+        return 0
\ No newline at end of file
@@ -0,0 +1,136 @@
+import os
+import queue
+import asyncio
+import sqlite3
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, TypeVar
+from app.config import get_settings
+from app.repositories.base_repository import BaseRepository, VisitRecord
+
+T = TypeVar('T')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS visits (
+    push_id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    timestamp INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_visits_fingerprint_timestamp ON visits (fingerprint, timestamp);
+CREATE TABLE IF NOT EXISTS bots (
+    fingerprint TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+# Constant SQL so each connection compiles a statement once and reuses it from its cache
+INSERT_VISIT = "INSERT OR IGNORE INTO visits (push_id, fingerprint, timestamp) VALUES (?, ?, ?)"
+SELECT_BOT = "SELECT 1 FROM bots WHERE fingerprint = ?"
+INSERT_BOT = "INSERT OR IGNORE INTO bots (fingerprint) VALUES (?)"
+COUNT_VISITS_SINCE = "SELECT COUNT(*) FROM visits WHERE fingerprint = ? AND timestamp >= ?"
+
+
+class SQLiteRepository(BaseRepository):
+    """
+    Repository backed by an embedded SQLite database in WAL mode
+    
+    Queries run on a dedicated thread pool, each thread borrowing a
+    connection from a fixed-size pool. WAL lets the readers run alongside
+    the single writer; the (fingerprint, timestamp) index answers the
+    recent-visit count without touching the table.
+    """
+    
+    def __init__(self, path: str = None, pool_size: int = None, busy_timeout_ms: int = None):
+        settings = get_settings()
+        self.path = path or settings.SQLITE_PATH
+        self.pool_size = pool_size or settings.SQLITE_POOL_SIZE
+        self.busy_timeout_ms = busy_timeout_ms or settings.SQLITE_BUSY_TIMEOUT_MS
+        
+        # Create the database file and schema before opening the pool
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._connections: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(self.pool_size):
+            self._connections.put(self._connect())
+        
+        connection = self._connections.get()
+        try:
+            connection.executescript(SCHEMA)
+        finally:
+            self._connections.put(connection)
+        
+        # One thread per connection, so a worker never waits on the pool
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='sqlite')
+        self._init_state()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a pooled connection configured for WAL"""
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=32
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return connection
+    
+    def _with_connection(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """Run func with a borrowed connection (called on the executor)"""
+        connection = self._connections.get()
+        try:
+            return func(connection)
+        finally:
+            self._connections.put(connection)
+    
+    async def _run(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """Run a query on the SQLite thread pool"""
+        loop = asyncio.get_running_loop()
+        
+        # Keep the caller's Context, like asyncio.to_thread, for the request profiler
+        job = functools.partial(contextvars.copy_context().run, self._with_connection, func)
+        return await loop.run_in_executor(self._executor, job)
+    
+    async def _fetch_bot_status(self, fingerprint: str) -> bool:
+        """Look the fingerprint up in the bots table"""
+        def query(connection: sqlite3.Connection) -> bool:
+            return connection.execute(SELECT_BOT, (fingerprint,)).fetchone() is not None
+        return await self._run(query)
+    
+    async def _store_visit(self, fingerprint: str, push_id: str, timestamp: int):
+        """Insert one visit"""
+        def insert(connection: sqlite3.Connection):
+            with connection:
+                connection.execute(INSERT_VISIT, (push_id, fingerprint, timestamp))
+        await self._run(insert)
+    
+    async def _write_visits(self, batch: List[VisitRecord]):
+        """Insert queued visits in a single transaction"""
+        rows = [(push_id, fingerprint, timestamp) for fingerprint, push_id, timestamp in batch]
+        def insert(connection: sqlite3.Connection):
+            with connection:
+                connection.executemany(INSERT_VISIT, rows)
+        await self._run(insert)
+    
+    async def _add_bot(self, fingerprint: str):
+        """Add the fingerprint to the bots table"""
+        def insert(connection: sqlite3.Connection):
+            with connection:
+                connection.execute(INSERT_BOT, (fingerprint,))
+        await self._run(insert)
+    
+    async def _count_visits_since(self, fingerprint: str, since_ms: int) -> int:
+        """Count visits in the window using the covering index"""
+        def query(connection: sqlite3.Connection) -> int:
+            return connection.execute(COUNT_VISITS_SINCE, (fingerprint, since_ms)).fetchone()[0]
+        return await self._run(query)
+    
+    async def close(self):
+        """Drain queued visit writes, then close the pool"""
+        await super().close()
+        self._executor.shutdown(wait=True)
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
\ No newline at end of file
@@ -0,0 +1,162 @@
+import time
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Queued after the last record to stop the flusher
+_STOP = object()
+
+# Alphabet of Firebase push IDs, in lexicographic order
+PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+
+
+class PushIdGenerator:
+    """
+    Client-side Firebase push IDs
+    
+    Same layout as the SDKs generate: 8 characters of millisecond timestamp
+    followed by 12 random characters, incremented for IDs created within the
+    same millisecond so keys stay unique and chronologically ordered.
+    """
+    
+    def __init__(self):
+        self._last_ms = 0
+        self._last_random = [0] * 12
+    
+    def __call__(self) -> str:
+        now_ms = int(time.time() * 1000)
+        duplicate = now_ms == self._last_ms
+        self._last_ms = now_ms
+        
+        timestamp_chars = []
+        for _ in range(8):
+            timestamp_chars.append(PUSH_CHARS[now_ms % 64])
+            now_ms //= 64
+        timestamp_chars.reverse()
+        
+        if not duplicate:
+            self._last_random = [random.randrange(64) for _ in range(12)]
+        else:
+            # Increment the random part, carrying over 63s
+            i = 11
+            while i >= 0 and self._last_random[i] == 63:
+                self._last_random[i] = 0
+                i -= 1
+            if i >= 0:
+                self._last_random[i] += 1
+        
+        return ''.join(timestamp_chars) + ''.join(PUSH_CHARS[i] for i in self._last_random)
+
+
+class WriteBehindQueue:
+    """
+    Bounded asyncio queue flushed to storage in batches
+    
+    Records are accepted immediately and a background task hands them to
+    flush_fn every flush_interval_ms or max_batch records, whichever comes
+    first. When the queue is full, the "block" policy makes callers wait
+    (backpressure) and the "drop" policy discards the record and counts it.
+    """
+    
+    POLICIES = ('block', 'drop')
+    
+    def __init__(self, flush_fn: Callable[[List[Any]], Awaitable[None]], max_size: int = 10000,
+                 flush_interval_ms: float = 200, max_batch: int = 500, full_policy: str = 'block'):
+        if full_policy not in self.POLICIES:
+            raise ValueError(f"Unknown queue full policy '{full_policy}', expected one of {self.POLICIES}")
+        
+        self.flush_fn = flush_fn
+        self.max_size = max_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self.full_policy = full_policy
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+        self._stats = {'accepted': 0, 'dropped': 0, 'written': 0, 'failed': 0, 'batches': 0}
+    
+    def _ensure_started(self):
+        """Create the queue and flusher on the running loop"""
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+    
+    async def submit(self, record: Any) -> bool:
+        """Queue a record; False if it was dropped"""
+        if self._closing:
+            raise RuntimeError("Write-behind queue is shutting down")
+        self._ensure_started()
+        
+        if self.full_policy == 'drop':
+            try:
+                self._queue.put_nowait(record)
+            except asyncio.QueueFull:
+                self._stats['dropped'] += 1
+                return False
+        else:
+            await self._queue.put(record)
+        
+        self._stats['accepted'] += 1
+        return True
+    
+    async def _run(self):
+        """Collect batches and flush them until the stop marker arrives"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                return
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            
+            # Fill the batch until it is full or the interval elapses
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(record)
+            
+            await self._flush(batch)
+    
+    async def _flush(self, batch: List[Any]):
+        """Write one batch, counting failures instead of raising"""
+        try:
+            await self.flush_fn(batch)
+            self._stats['written'] += len(batch)
+        except Exception as e:
+            print(f"Error flushing {len(batch)} queued writes: {e}")
+            self._stats['failed'] += len(batch)
+        finally:
+            self._stats['batches'] += 1
+            for _ in batch:
+                self._queue.task_done()
+    
+    async def close(self):
+        """Stop accepting records and drain everything already queued"""
+        self._closing = True
+        if self._worker is None:
+            return
+        
+        # The stop marker queues behind every accepted record
+        await self._queue.put(_STOP)
+        await self._worker
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and accepted/dropped/written/failed counters"""
+        return {
+            **self._stats,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'max_size': self.max_size,
+            'full_policy': self.full_policy,
+        }
\ No newline at end of file
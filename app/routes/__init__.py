@@ -1,3 +1,6 @@
+from app.routes.admin import router as admin_router
 from app.routes.api import router as api_router
+from app.routes.health import router as health_router
+from app.routes.metrics import router as metrics_router
 
-__all__ = ["api_router"]
\ No newline at end of file
+__all__ = ["admin_router", "api_router", "health_router", "metrics_router"]
\ No newline at end of file
@@ -0,0 +1,35 @@
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.config import get_settings
+from app.utils.profiling import get_profile_store
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+def require_admin(authorization: str = Header(None)):
+    """Bearer PROFILING_SECRET; the routes don't exist while profiling is off"""
+    settings = get_settings()
+    if not settings.PROFILING_ENABLED or not settings.PROFILING_SECRET:
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    scheme, _, token = (authorization or '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), settings.PROFILING_SECRET.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
+
+
+@router.get("/profiles", response_model=list, dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Stored request profiles, newest first"""
+    return get_profile_store().list()
+
+
+@router.get("/profiles/{name}", dependencies=[Depends(require_admin)])
+async def get_profile(name: str):
+    """Download one profile (open .speedscope.json files at https://www.speedscope.app)"""
+    path = get_profile_store().path_of(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    media_type = 'application/json' if name.endswith('.json') else 'text/plain'
+    return FileResponse(path, media_type=media_type, filename=name)
\ No newline at end of file
@@ -1,29 +1,59 @@
 import time
 import json
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException
+from typing import Optional
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
 
 from app.models.schemas import BehaviorDetectionResponse, VisitInfoResponse
-from app.services.behavior_detection_service import BehaviorDetectionService
-from app.repositories.firebase_repository import FirebaseRepository
+from app.services.factory import get_behavior_service
+from app.repositories.factory import get_repository
+from app.utils.metrics import get_metrics
 
 router = APIRouter(prefix="/api", tags=["bot-detection"])
 
-behavior_service = BehaviorDetectionService()
-firebase_repo = FirebaseRepository()
-
 @router.get("/", response_model=dict)
 async def root():
     """Root endpoint to check if the API is running"""
     return {"message": "Bot Detection API is running"}
 
 
+@router.get("/inference_stats", response_model=dict)
+async def inference_stats():
+    """Queue depth, batch size and wait time of the inference micro-batcher"""
+    return get_behavior_service().inference_stats()
+
+
+@router.get("/cache_stats", response_model=dict)
+async def cache_stats():
+    """Hit/miss/coalesce counters of the blacklist lookup cache"""
+    return get_repository().cache_stats()
+
+
+@router.get("/visit_writer_stats", response_model=dict)
+async def visit_writer_stats():
+    """Queue depth and accepted/dropped/written counters of the visit write-behind queue"""
+    return get_repository().visit_writer_stats()
+
+
+@router.get("/browser_stats", response_model=dict)
+async def browser_stats():
+    """Verdict cache counters and rule reloads of the browser automation check"""
+    return get_behavior_service().browser_service.cache_stats()
+
+
+@router.get("/verdict_cache_stats", response_model=dict)
+async def verdict_cache_stats():
+    """Hits, replays per signal and memory use of the content-addressed verdict cache"""
+    return get_behavior_service().verdict_cache_stats()
+
+
 @router.post("/predict_behavior", response_model=BehaviorDetectionResponse)
 async def predict_behavior(
     mouse_file: UploadFile = File(...),
     key_file: UploadFile = File(...),
     browser_info: str = Form(...),
-    fingerprint: str = Form(...)
+    fingerprint: str = Form(...),
+    scroll_file: Optional[UploadFile] = File(None)
 ):
     """
     Predict if user behavior indicates bot activity
@@ -33,24 +63,28 @@ async def predict_behavior(
         key_file: CSV file with keyboard typing data
         browser_info: JSON string with browser details
         fingerprint: Unique browser fingerprint
+        scroll_file: Optional CSV file with scroll data
         
     Returns:
         Detection results for different behavior aspects
     """
     try:
         # Read uploaded files
-        mouse_data = await mouse_file.read()
-        key_data = await key_file.read()
+        with get_metrics().timer('upload_read'):
+            mouse_data = await mouse_file.read()
+            key_data = await key_file.read()
+            scroll_data = await scroll_file.read() if scroll_file is not None else None
         
         # Parse browser info
         browser_info_dict = json.loads(browser_info)
         
         # Analyze behavior
-        results = await behavior_service.analyze_behavior(
+        results = await get_behavior_service().analyze_behavior(
             mouse_data, 
             key_data, 
             browser_info_dict, 
-            fingerprint
+            fingerprint,
+            scroll_data
         )
         
         return BehaviorDetectionResponse(**results)
@@ -72,16 +106,78 @@ async def add_visit_info(
         timestamp: Visit timestamp (optional)
         
     Returns:
-        Confirmation of saved information
+        Confirmation of saved information, or a 503 if the visit was dropped
     """
     try:
         # Use provided timestamp or create a new one
         current_timestamp = timestamp or int(time.time() * 1000)
         
         # Save visit info
-        result = await firebase_repo.save_fingerprint_visit(fingerprint, current_timestamp)
+        result = await get_repository().save_fingerprint_visit(fingerprint, current_timestamp)
+        
+        # Dropped by a full write-behind queue: tell the client to retry
+        if not result['saved']:
+            return JSONResponse(VisitInfoResponse(**result).model_dump(), status_code=503)
         
         return VisitInfoResponse(**result)
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error saving visit info: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error saving visit info: {str(e)}")
+
+
+@router.websocket("/stream_behavior")
+async def stream_behavior(websocket: WebSocket):
+    """
+    Score a session incrementally while the client streams events
+    
+    Messages are JSON objects with a "type":
+        start: {"fingerprint": ..., "browser_info": {...}}, must come first
+        mouse: columnar frame {"x": [...], "y": [...], "timestamp": [...]}
+        key: columnar frame {"fieldName": [...], "timestamp": [...]}
+        submit: ends the session
+    
+    Timestamps are epoch milliseconds or ISO-8601 strings. Every frame gets a
+    "progress" reply, a mouse frame that settles the mouse verdict gets a
+    "verdict" reply, and submit returns a "result" with the same fields as
+    /predict_behavior. Bad frames get an "error" reply and are discarded.
+    """
+    from app.services.streaming_service import StreamingSession
+    
+    await websocket.accept()
+    session = None
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame['type'] == 'websocket.disconnect':
+                break
+            try:
+                # JSON may arrive in a text or a binary frame
+                message = json.loads(frame.get('text') or frame.get('bytes') or '')
+                kind = message.get('type') if isinstance(message, dict) else None
+                if kind == 'start':
+                    if not isinstance(message.get('browser_info'), dict):
+                        raise ValueError("browser_info must be a JSON object")
+                    if session is not None:
+                        session.close()
+                    session = StreamingSession(get_behavior_service(), str(message['fingerprint']), message['browser_info'])
+                    await websocket.send_json({'type': 'started'})
+                elif session is None:
+                    raise ValueError("Session not started")
+                elif kind == 'mouse':
+                    await websocket.send_json(await session.add_mouse_frame(message))
+                elif kind == 'key':
+                    await websocket.send_json(session.add_key_frame(message))
+                elif kind == 'submit':
+                    await websocket.send_json(await session.finish())
+                    await websocket.close()
+                    return
+                else:
+                    raise ValueError(f"Unknown message type '{kind}'")
+            except (KeyError, TypeError, ValueError) as e:
+                await websocket.send_json({'type': 'error', 'detail': str(e)})
+    
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if session is not None:
+            session.close()
\ No newline at end of file
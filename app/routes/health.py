@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.warmup import get_warmup
+
+router = APIRouter(prefix="/health", tags=["monitoring"])
+
+@router.get("/live", response_model=dict)
+async def live():
+    """Liveness: the process is up and its event loop answers"""
+    return {"status": "alive"}
+
+
+@router.get("/ready", response_model=dict)
+async def ready():
+    """Readiness: 200 once the startup warm-up has succeeded, 503 before"""
+    warmup = get_warmup()
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
\ No newline at end of file
@@ -1,11 +1,19 @@
-from app.services.behavior_detection_service import BehaviorDetectionService
-from app.services.browser_detection_service import BrowserDetectionService
-from app.services.keyboard_detection_service import KeyboardDetectionService
-from app.services.mouse_detection_service import MouseDetectionService
+from app.utils.lazy_imports import lazy_exports
 
-__all__ = [
-    "BehaviorDetectionService",
-    "BrowserDetectionService",
-    "KeyboardDetectionService",
-    "MouseDetectionService"
-]
\ No newline at end of file
+# Imported on first access, see lazy_exports
+_EXPORTS = {
+    "BehaviorDetectionService": "app.services.behavior_detection_service",
+    "BrowserDetectionService": "app.services.browser_detection_service",
+    "InferenceBatcher": "app.services.inference_scheduler",
+    "InferenceExecutor": "app.services.inference_executor",
+    "KeyboardDetectionService": "app.services.keyboard_detection_service",
+    "MouseDetectionService": "app.services.mouse_detection_service",
+    "ScrollDetectionService": "app.services.scroll_detection_service",
+    "StreamingSession": "app.services.streaming_service",
+    "VerdictCache": "app.services.verdict_cache",
+    "get_behavior_service": "app.services.factory"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
\ No newline at end of file
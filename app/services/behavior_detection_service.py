@@ -0,0 +1,264 @@
+import asyncio
+import functools
+from typing import Dict, Any, List, Optional
+
+from app.config import get_settings
+from app.services.inference_executor import InferenceExecutor
+from app.services.inference_scheduler import InferenceBatcher
+from app.services.mouse_detection_service import MouseDetectionService
+from app.services.keyboard_detection_service import KeyboardDetectionService
+from app.services.scroll_detection_service import ScrollDetectionService
+from app.services.verdict_cache import VerdictCache
+from app.services.browser_detection_service import BrowserDetectionService
+from app.repositories.factory import get_repository
+from app.utils.metrics import get_metrics
+
+# Signals combined into a verdict, in short-circuit evaluation order
+SIGNALS = ('browser', 'blacklist', 'keyboard', 'scroll', 'mouse')
+
+# Result reported for a signal that short-circuit evaluation did not run
+SKIPPED = 'Skipped'
+
+class BehaviorDetectionService:
+    """Service for detecting bot behavior through multiple sources"""
+    
+    def __init__(self):
+        self.mouse_service = MouseDetectionService()
+        self.keyboard_service = KeyboardDetectionService()
+        self.scroll_service = ScrollDetectionService()
+        self.browser_service = BrowserDetectionService()
+        self.repository = get_repository()
+        
+        settings = get_settings()
+        self.short_circuit = settings.SHORT_CIRCUIT_ENABLED
+        
+        # Parsing, feature extraction and prediction run in this executor
+        self.executor = InferenceExecutor(
+            {'mouse': self.mouse_service, 'keyboard': self.keyboard_service, 'scroll': self.scroll_service},
+            backend=settings.INFERENCE_EXECUTOR,
+            workers=settings.INFERENCE_WORKERS,
+            max_concurrency=settings.INFERENCE_MAX_CONCURRENCY,
+            threads_per_worker=settings.INFERENCE_THREADS_PER_WORKER
+        )
+        
+        # Optional cross-request micro-batching of model calls
+        self.batchers: Dict[str, InferenceBatcher] = {}
+        if settings.INFERENCE_BATCHING_ENABLED:
+            self.batchers['mouse'] = InferenceBatcher(
+                self.mouse_service.model, 'MouseVerifier',
+                functools.partial(self.executor.predict_features, 'mouse'),
+                settings.INFERENCE_BATCH_MAX_ROWS, settings.INFERENCE_BATCH_MAX_WAIT_MS
+            )
+            self.batchers['keyboard'] = InferenceBatcher(
+                self.keyboard_service.model, 'KeyboardVerifier',
+                functools.partial(self.executor.predict_features, 'keyboard'),
+                settings.INFERENCE_BATCH_MAX_ROWS, settings.INFERENCE_BATCH_MAX_WAIT_MS
+            )
+            self.batchers['scroll'] = InferenceBatcher(
+                self.scroll_service.model, 'ScrollVerifier',
+                functools.partial(self.executor.predict_features, 'scroll'),
+                settings.INFERENCE_BATCH_MAX_ROWS, settings.INFERENCE_BATCH_MAX_WAIT_MS
+            )
+        
+        # Verdicts of byte-identical uploads, reported as replays
+        self.verdict_cache: Optional[VerdictCache] = None
+        if settings.VERDICT_CACHE_ENABLED:
+            self.verdict_cache = VerdictCache(settings.VERDICT_CACHE_MAX_BYTES, settings.VERDICT_CACHE_TTL)
+        
+        self._register_gauges()
+    
+    def _register_gauges(self):
+        """Expose executor and batcher queue depths on /metrics"""
+        metrics = get_metrics()
+        executor = self.executor
+        metrics.register_gauge('inference_workers', "Inference pool workers", lambda: executor.workers)
+        metrics.register_gauge('inference_jobs_waiting', "Inference jobs waiting for the concurrency limit",
+                               lambda: executor.stats()['waiting'])
+        metrics.register_gauge('inference_jobs_in_flight', "Inference jobs submitted to the pool",
+                               lambda: executor.stats()['in_flight'])
+        for signal, batcher in self.batchers.items():
+            metrics.register_gauge(f'{signal}_batch_queue_rows', f"Rows waiting in the {signal} micro-batch",
+                                   lambda batcher=batcher: batcher.stats()['queue_depth_rows'])
+        if self.verdict_cache is not None:
+            cache = self.verdict_cache
+            metrics.register_gauge('verdict_cache_bytes', "Memory charged to the verdict cache",
+                                   lambda: cache.stats()['size_bytes'])
+            metrics.register_gauge('replayed_payloads', "Uploads identical to an earlier one",
+                                   lambda: sum(cache.replays.values()))
+    
+    async def _predict(self, signal: str, service, data: bytes) -> str:
+        """Score one signal, through the batcher when batching is enabled"""
+        batcher = self.batchers.get(signal)
+        if batcher is None:
+            return await self.executor.predict(signal, data)
+        
+        features = await self.executor.extract_features(signal, data)
+        if isinstance(features, str):
+            return features
+        
+        try:
+            # Includes the wait for the batch to fill
+            with get_metrics().timer(f'{signal}_predict'):
+                predictions = await batcher.predict(features)
+            return service.interpret(predictions)
+        except Exception as e:
+            print(f"{signal.capitalize()} prediction error: {e}")
+            return f"Error: {str(e)}"
+    
+    async def _score(self, signal: str, service, data: bytes, replayed: List[str]) -> str:
+        """Score one upload, from the verdict cache when the same bytes were scored before"""
+        if self.verdict_cache is None:
+            return await self._predict(signal, service, data)
+        
+        verdict, replay = await self.verdict_cache.score(signal, data, lambda: self._predict(signal, service, data))
+        if replay:
+            replayed.append(signal)
+        return verdict
+    
+    def verdict_cache_stats(self) -> Dict[str, Any]:
+        """Verdict cache counters, or just enabled=False"""
+        if self.verdict_cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.verdict_cache.stats()}
+    
+    def inference_stats(self) -> Dict[str, Any]:
+        """Executor and micro-batching counters"""
+        return {
+            'executor': self.executor.stats(),
+            'batching_enabled': bool(self.batchers),
+            'models': [batcher.stats() for batcher in self.batchers.values()]
+        }
+    
+    async def warm_up(self, uploads: Dict[str, bytes], browser_info: Dict[str, Any], fingerprint: str) -> Dict[str, str]:
+        """
+        Score synthetic uploads through every detector, bypassing the verdict cache
+        
+        Each signal is scored once per inference worker at the same time, so
+        the pool starts all its threads or processes and every model runs.
+        The browser rules and a storage lookup of fingerprint run as well.
+        Raises RuntimeError if any step returns an error.
+        """
+        services = {'mouse': self.mouse_service, 'keyboard': self.keyboard_service, 'scroll': self.scroll_service}
+        lookup_errors = self.repository.cache_stats()['errors']
+        
+        # One job per worker for every signal, plus the blacklist lookup
+        jobs = [(signal, self._predict(signal, service, uploads[signal]))
+                for signal, service in services.items() for _ in range(self.executor.workers)]
+        *results, is_bot = await asyncio.gather(*(job for _, job in jobs), self.repository.is_bot_fingerprint(fingerprint))
+        
+        verdicts = {signal: result for (signal, _), result in zip(jobs, results)}
+        for (signal, _), result in zip(jobs, results):
+            if result.startswith('Error'):
+                raise RuntimeError(f"{signal} warm-up failed: {result}")
+        if self.repository.cache_stats()['errors'] > lookup_errors:
+            raise RuntimeError("Blacklist lookup failed during warm-up")
+        
+        verdicts['browser'] = self.browser_service.detect_automation(browser_info)
+        # A string like the other verdicts, whatever type the repository answers with
+        verdicts['blacklist'] = str(is_bot)
+        return verdicts
+    
+    def close(self):
+        """Release the inference executor"""
+        self.executor.shutdown()
+    
+    async def analyze_behavior(self, 
+                              mouse_data: bytes, 
+                              key_data: bytes, 
+                              browser_info: Dict[str, Any], 
+                              fingerprint: str,
+                              scroll_data: Optional[bytes] = None) -> Dict[str, Any]:
+        """Analyze user behavior from multiple data sources"""
+        try:
+            replayed: List[str] = []
+            if self.short_circuit:
+                results = await self._analyze_short_circuit(mouse_data, key_data, browser_info, fingerprint,
+                                                            scroll_data, replayed)
+            else:
+                # Parse and score the uploads concurrently, off the event loop
+                mouse_result, key_result, is_bot, scroll_result = await asyncio.gather(
+                    self._score('mouse', self.mouse_service, mouse_data, replayed),
+                    self._score('keyboard', self.keyboard_service, key_data, replayed),
+                    self.repository.is_bot_fingerprint(fingerprint),
+                    self._score_optional('scroll', self.scroll_service, scroll_data, replayed)
+                )
+                
+                # Detect browser automation
+                is_automated = self.browser_service.detect_automation(browser_info)
+                
+                results = {
+                    'mouse_result': mouse_result,
+                    'key_result': key_result,
+                    'is_automated': is_automated,
+                    'is_bot': is_bot,
+                    'scroll_result': scroll_result,
+                    'evaluated': [signal for signal in SIGNALS if signal != 'scroll' or scroll_data is not None],
+                    'skipped': []
+                }
+            results['replayed'] = [signal for signal in SIGNALS if signal in replayed]
+            
+            # Log results
+            print(f'Mouse is controlled by: {results["mouse_result"]}')
+            print(f'Keyboard is controlled by: {results["key_result"]}')
+            if results['scroll_result'] is not None:
+                print(f'Scrolling is controlled by: {results["scroll_result"]}')
+            print(f'Malicious Browser found?: {results["is_automated"]}')
+            print(f'Is device fingerprint blacklisted?: {results["is_bot"]}')
+            if results['replayed']:
+                print(f'Replayed payloads: {", ".join(results["replayed"])}')
+            
+            # Return combined results
+            return results
+            
+        except Exception as e:
+            print(f"Error in behavior analysis: {e}")
+            raise
+    
+    async def _score_optional(self, signal: str, service, data: Optional[bytes], replayed: List[str]) -> Optional[str]:
+        """Score an optional upload, None when it wasn't sent"""
+        if data is None:
+            return None
+        return await self._score(signal, service, data, replayed)
+    
+    async def _detect_automation(self, browser_info: Dict[str, Any]) -> str:
+        """Browser rules as an awaitable step"""
+        return self.browser_service.detect_automation(browser_info)
+    
+    async def _analyze_short_circuit(self, 
+                                     mouse_data: bytes, 
+                                     key_data: bytes, 
+                                     browser_info: Dict[str, Any], 
+                                     fingerprint: str,
+                                     scroll_data: Optional[bytes] = None,
+                                     replayed: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Run signals cheapest first and stop at the first one that flags a bot
+        
+        A single positive signal already marks the request as a bot, so the
+        remaining signals can't change the outcome and are reported as skipped.
+        A replayed upload counts as a positive signal.
+        """
+        replayed = [] if replayed is None else replayed
+        # (signal, response field, positive value, step), cheapest first
+        steps = (
+            ('browser', 'is_automated', 'Yes', lambda: self._detect_automation(browser_info)),
+            ('blacklist', 'is_bot', 'Yes', lambda: self.repository.is_bot_fingerprint(fingerprint)),
+            ('keyboard', 'key_result', 'Bot', lambda: self._score('keyboard', self.keyboard_service, key_data, replayed)),
+            ('scroll', 'scroll_result', 'Bot', lambda: self._score('scroll', self.scroll_service, scroll_data, replayed)),
+            ('mouse', 'mouse_result', 'Bot', lambda: self._score('mouse', self.mouse_service, mouse_data, replayed)),
+        )
+        if scroll_data is None:
+            steps = tuple(step for step in steps if step[0] != 'scroll')
+        
+        results = {field: SKIPPED for _, field, _, _ in steps}
+        results.setdefault('scroll_result', None)
+        evaluated = []
+        for signal, field, positive, step in steps:
+            results[field] = await step()
+            evaluated.append(signal)
+            if results[field] == positive or signal in replayed:
+                break
+        
+        results['evaluated'] = evaluated
+        results['skipped'] = [signal for signal, _, _, _ in steps[len(evaluated):]]
+        return results
\ No newline at end of file
@@ -1,75 +1,156 @@
-from typing import Dict, Any
+import os
+import re
+import json
+import time
+from typing import Dict, Any, Optional
+from app.config import get_settings
+from app.utils.cache import TTLCache
+from app.utils.metrics import timed
+
+class BrowserRules:
+    """Browser rule set compiled once for constant-time lookups"""
+    
+    def __init__(self, patterns: Dict[str, Any]):
+        self.user_agents = frozenset(patterns['userAgent'])
+        self.platforms = frozenset(patterns['platform'])
+        self.max_touch_points = frozenset(patterns['maxTouchPoints'])
+        self.min_screen_width = patterns.get('minScreenWidth', 500)
+        self.min_screen_height = patterns.get('minScreenHeight', 500)
+        self.required_attrs = tuple(patterns['requiredAttributes'])
+        
+        # One alternation instead of a substring scan per indicator
+        indicators = sorted(patterns['botIndicators'], key=len, reverse=True)
+        self.bot_indicators = re.compile('|'.join(map(re.escape, indicators))) if indicators else None
+    
+    @classmethod
+    def load(cls, path: str) -> "BrowserRules":
+        """Read and compile a JSON rule file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+
+def _is_member(value: Any, allowed: frozenset) -> bool:
+    """Set membership that treats unhashable values as unknown"""
+    try:
+        return value in allowed
+    except TypeError:
+        return False
+
 
 class BrowserDetectionService:
     """Service for browser automation detection"""
     
-    def __init__(self):
-        self.known_patterns = {
-            'userAgent': [
-                # Common user agents for popular browsers
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36', 
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15',
-                'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:89.0) Gecko/20100101 Firefox/89.0',
-                'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.159 Safari/537.36 Edg/92.0.902.67',
-                'Mozilla/5.0 (Linux; Android 11; SM-G996B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Mobile Safari/537.36',
-                'Mozilla/5.0 (iPad; CPU OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1',
-            ],
-            'webdriver': [
-                False  # Expected webdriver status for non-automated browsers
-            ],
-            'platform': [
-                'Win32', 'Win64', 'MacIntel', 'Linux x86_64', 'iPhone', 'iPad', 'Android', 'Linux armv7l',
-                'Linux armv8l', 'Linux aarch64', 'Linux i686', 'Linux x86',
-            ],
-            'screenResolution': [
-                '1920x1080', '1366x768', '1440x900', '1536x864', '1600x900', '1280x720', '2560x1440', '1536x864',
-                '3840x2160', '2560x1600', '2880x1800', '320x480', '360x640', '375x667',
-                '412x869', '414x896', '768x1024',
-            ],
-            'maxTouchPoints': [
-                0, 1, 2, 5, 10, 15, 20
-            ],
-        }
+    # Fields that decide the verdict; everything else is ignored by the cache key
+    KEY_FIELDS = ('webdriver', 'userAgent', 'platform', 'maxTouchPoints', 'screenResolution')
+    
+    def __init__(self, rules_path: Optional[str] = None):
+        settings = get_settings()
+        self.rules_path = rules_path or settings.BROWSER_RULES_PATH
+        self.reload_interval = settings.BROWSER_RULES_RELOAD_INTERVAL
+        self._verdicts = TTLCache(settings.BROWSER_VERDICT_CACHE_SIZE)
+        self._stats = {'hits': 0, 'misses': 0, 'reloads': 0}
+        
+        self.rules = BrowserRules.load(self.rules_path)
+        self._rules_mtime = os.path.getmtime(self.rules_path)
+        self._next_reload_check = time.monotonic() + self.reload_interval
     
+    def reload_rules(self, force: bool = False) -> bool:
+        """Recompile the rule file if it changed; keeps the old rules if it can't be read"""
+        try:
+            mtime = os.path.getmtime(self.rules_path)
+            if not force and mtime == self._rules_mtime:
+                return False
+            rules = BrowserRules.load(self.rules_path)
+        except Exception as e:
+            print(f"Error reloading browser rules: {e}")
+            return False
+        
+        self.rules = rules
+        self._rules_mtime = mtime
+        self._verdicts.clear()
+        self._stats['reloads'] += 1
+        return True
+    
+    def _maybe_reload(self):
+        """Poll the rule file at most once per reload interval"""
+        if self.reload_interval <= 0:
+            return
+        now = time.monotonic()
+        if now >= self._next_reload_check:
+            self._next_reload_check = now + self.reload_interval
+            self.reload_rules()
+    
+    def _cache_key(self, browser_info: Dict[str, Any]) -> tuple:
+        """Canonical key of the fields the verdict depends on"""
+        get = browser_info.get
+        return (
+            get('webdriver') is True, get('userAgent', ''), get('platform'), get('maxTouchPoints'),
+            get('screenResolution', '0x0'), *[attr in browser_info for attr in self.rules.required_attrs]
+        )
+    
+    @timed('browser_rules')
     def detect_automation(self, browser_info: Dict[str, Any]) -> str:
         """Determine if browser shows signs of automation"""
+        self._maybe_reload()
+        
+        key = self._cache_key(browser_info)
+        try:
+            verdict = self._verdicts.get(key)
+        except TypeError:
+            # Unhashable field values can't be cached
+            return self._classify(browser_info)
+        if verdict is not None:
+            self._stats['hits'] += 1
+            return verdict
+        
+        self._stats['misses'] += 1
+        verdict = self._classify(browser_info)
+        self._verdicts.set(key, verdict)
+        return verdict
+    
+    def _classify(self, browser_info: Dict[str, Any]) -> str:
+        """Apply the compiled rules to one browser_info"""
+        rules = self.rules
         
         # Check if WebDriver is detected
         if browser_info.get('webdriver') is True:
             return 'Yes'
         
         # Check userAgent against known patterns
-        if browser_info.get('userAgent', '') not in self.known_patterns['userAgent']:
+        if not _is_member(browser_info.get('userAgent', ''), rules.user_agents):
             return 'Yes'
         
         # Check platform
-        if browser_info.get('platform') not in self.known_patterns['platform']:
+        if not _is_member(browser_info.get('platform'), rules.platforms):
             return 'Yes'
         
         # Check max touch points
-        if browser_info.get('maxTouchPoints') not in self.known_patterns['maxTouchPoints']:
+        if not _is_member(browser_info.get('maxTouchPoints'), rules.max_touch_points):
             return 'Yes'
         
         # Check for unusual screen resolution
         screen_res = browser_info.get('screenResolution', '0x0')
         screen_width, screen_height = map(int, screen_res.split('x'))
-        if screen_width < 500 or screen_height < 500:
+        if screen_width < rules.min_screen_width or screen_height < rules.min_screen_height:
             return 'Yes'
         
         # Check for missing required attributes
-        required_attrs = ['userAgent', 'pluginsCount', 'languages', 'platform']
-        if any(attr not in browser_info for attr in required_attrs):
+        if any(attr not in browser_info for attr in rules.required_attrs):
             return 'Yes'
         
         # Check for bot indicators in user agent
         user_agent = browser_info.get('userAgent', '').lower()
-        bot_indicators = ['phantomjs', 'selenium', 'puppeteer', 'crawler', 'curl', 'scrapy', 
-                        'wget', 'robot', 'headless']
-        if any(indicator in user_agent for indicator in bot_indicators):
+        if rules.bot_indicators is not None and rules.bot_indicators.search(user_agent):
             return 'Yes'
         
         # No indicators of automation detected
-        return 'No'
\ No newline at end of file
+        return 'No'
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Verdict cache counters and rule reloads"""
+        return {
+            **self._stats,
+            'size': len(self._verdicts),
+            'max_entries': self._verdicts.max_entries,
+            'evictions': self._verdicts.evictions,
+        }
\ No newline at end of file
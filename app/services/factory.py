@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from app.config import get_settings
+
+if TYPE_CHECKING:
+    from app.services.behavior_detection_service import BehaviorDetectionService
+
+STARTUP_MODES = ('eager', 'lazy', 'prefork')
+
+def get_startup_mode() -> str:
+    """Configured STARTUP_MODE, validated"""
+    mode = get_settings().STARTUP_MODE
+    if mode not in STARTUP_MODES:
+        raise ValueError(f"Unknown STARTUP_MODE '{mode}', expected one of {STARTUP_MODES}")
+    return mode
+
+@lru_cache()
+def get_behavior_service() -> "BehaviorDetectionService":
+    """Get the shared behavior service, importing pandas and loading the models on first call"""
+    from app.services.behavior_detection_service import BehaviorDetectionService
+    return BehaviorDetectionService()
+
+def behavior_service_loaded() -> bool:
+    """True once get_behavior_service() has built the service"""
+    return get_behavior_service.cache_info().currsize > 0
+
+def preload_models():
+    """
+    Import the scoring modules and load every model, without building the service
+    
+    Used by the prefork launcher before forking: load_model() keeps what
+    it loads, so the services each worker builds later reuse the parent's
+    models, shared copy-on-write, instead of unpickling their own. No
+    threads, sockets or storage clients are created here.
+    """
+    # Modules a lazy worker would otherwise import on its first request
+    import app.services.behavior_detection_service
+    import app.services.streaming_service
+    from app.services.mouse_detection_service import MouseDetectionService
+    from app.services.keyboard_detection_service import KeyboardDetectionService
+    from app.services.scroll_detection_service import ScrollDetectionService
+    MouseDetectionService()
+    KeyboardDetectionService()
+    ScrollDetectionService()
\ No newline at end of file
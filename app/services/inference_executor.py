@@ -0,0 +1,213 @@
+import os
+import asyncio
+import functools
+import contextvars
+import multiprocessing
+import numpy as np
+import pandas as pd
+from io import BytesIO
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Union
+from app.utils.columnar import decode_columnar, is_columnar
+from app.utils.compiled_forest import model_predict
+from app.utils.downsampling import cap_csv_rows
+from app.utils.metrics import get_metrics
+from app.utils.trajectory_codec import decode_trajectory, is_trajectory
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # pragma: no cover - shipped with scikit-learn
+    threadpool_limits = None
+
+# Environment variables read by the BLAS/OpenMP runtimes at import time
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+# Services loaded once per process-pool worker
+_worker_services: Dict[str, Any] = {}
+
+
+def pin_native_threads(threads: int):
+    """Cap BLAS/OpenMP threads so pool workers don't oversubscribe cores"""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=threads)
+
+
+def _init_worker(threads: int):
+    """Process-pool initializer: pin threads, then load every model once"""
+    pin_native_threads(threads)
+    
+    from app.services.mouse_detection_service import MouseDetectionService
+    from app.services.keyboard_detection_service import KeyboardDetectionService
+    from app.services.scroll_detection_service import ScrollDetectionService
+    _worker_services['mouse'] = MouseDetectionService()
+    _worker_services['keyboard'] = KeyboardDetectionService()
+    _worker_services['scroll'] = ScrollDetectionService()
+
+
+def parse_csv(data: bytes, max_rows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Parse an uploaded CSV, timed as the csv_parse stage
+    
+    With max_rows, larger uploads are cut down to evenly spaced blocks of
+    rows before parsing; the block starts go in df.attrs['segment_starts'].
+    """
+    with get_metrics().timer('csv_parse'):
+        segment_starts = None
+        if max_rows:
+            data, segment_starts = cap_csv_rows(data, max_rows)
+        df = pd.read_csv(BytesIO(data))
+        if segment_starts is not None:
+            df.attrs['segment_starts'] = segment_starts
+        return df
+
+
+def parse_upload(data: bytes, max_rows: Optional[int] = None) -> pd.DataFrame:
+    """Decode a columnar .npy or compact trajectory upload, or parse a CSV one"""
+    if is_columnar(data):
+        with get_metrics().timer('columnar_decode'):
+            return decode_columnar(data)
+    if is_trajectory(data):
+        with get_metrics().timer('trajectory_decode'):
+            return decode_trajectory(data)
+    return parse_csv(data, max_rows)
+
+
+def parse_and_predict(service: Any, data: bytes) -> str:
+    """Parse an upload and score it; parse errors propagate"""
+    return service.predict(parse_upload(data, getattr(service, 'max_events', None)))
+
+
+def parse_and_extract(service: Any, data: bytes) -> Union[np.ndarray, str]:
+    """Parse an upload into model input, or an "Error: ..." verdict"""
+    df = parse_upload(data, getattr(service, 'max_events', None))
+    try:
+        return service.extract_features(df)
+    except Exception as e:
+        print(f"{type(service).__name__} feature error: {e}")
+        return f"Error: {str(e)}"
+
+
+def _worker_predict(signal: str, data: bytes):
+    # Stage timings go back with the result, the parent records them
+    with get_metrics().capture() as observations:
+        result = parse_and_predict(_worker_services[signal], data)
+    return result, observations
+
+
+def _worker_extract(signal: str, data: bytes):
+    with get_metrics().capture() as observations:
+        result = parse_and_extract(_worker_services[signal], data)
+    return result, observations
+
+
+def _worker_predict_features(signal: str, features: np.ndarray) -> np.ndarray:
+    return model_predict(_worker_services[signal].model, features)
+
+
+class InferenceExecutor:
+    """
+    Runs upload parsing, feature extraction and prediction off the event loop
+    
+    The "thread" backend shares the caller's services across a thread pool.
+    The "process" backend starts worker processes that each load the models
+    once, so scoring is not limited to a single core by the GIL. Both cap
+    in-flight jobs with a semaphore and pin native threads per worker.
+    """
+    
+    BACKENDS = ('thread', 'process')
+    
+    def __init__(self, services: Dict[str, Any], backend: str = 'thread', workers: int = 0,
+                 max_concurrency: int = 0, threads_per_worker: int = 1):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown inference executor '{backend}', expected one of {self.BACKENDS}")
+        
+        self.services = services
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or 2 * self.workers
+        self.threads_per_worker = threads_per_worker
+        
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._in_flight = 0
+        self._completed = 0
+        
+        if backend == 'process':
+            self._pool: Executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(threads_per_worker,)
+            )
+        else:
+            # Thread workers share this process, so pin its native pools once
+            pin_native_threads(threads_per_worker)
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='inference')
+    
+    async def _submit(self, func, *args) -> Any:
+        """Run func in the pool under the concurrency limit"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        # Jobs held back by the concurrency limit count as waiting
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        
+        # Thread jobs run in a copy of the caller's Context, like asyncio.to_thread,
+        # so the request profiler can attribute them
+        if self.backend == 'thread':
+            func, args = functools.partial(contextvars.copy_context().run, func, *args), ()
+        
+        self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+            self._semaphore.release()
+    
+    async def predict(self, signal: str, data: bytes) -> str:
+        """Parse and score one upload"""
+        if self.backend == 'process':
+            return self._record(await self._submit(_worker_predict, signal, data))
+        return await self._submit(parse_and_predict, self.services[signal], data)
+    
+    async def extract_features(self, signal: str, data: bytes) -> Union[np.ndarray, str]:
+        """Parse one upload into model input for the micro-batcher"""
+        if self.backend == 'process':
+            return self._record(await self._submit(_worker_extract, signal, data))
+        return await self._submit(parse_and_extract, self.services[signal], data)
+    
+    async def predict_features(self, signal: str, features: np.ndarray) -> np.ndarray:
+        """Run a signal's model on a feature matrix (micro-batches, streamed frames)"""
+        if self.backend == 'process':
+            return await self._submit(_worker_predict_features, signal, features)
+        return await self._submit(model_predict, self.services[signal].model, features)
+    
+    @staticmethod
+    def _record(job_result: tuple) -> Any:
+        """Record a process worker's stage timings and return its result"""
+        result, observations = job_result
+        get_metrics().record(observations)
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Backend, pool size and in-flight counters"""
+        return {
+            'backend': self.backend,
+            'workers': self.workers,
+            'max_concurrency': self.max_concurrency,
+            'threads_per_worker': self.threads_per_worker,
+            'waiting': self._waiting,
+            'in_flight': self._in_flight,
+            'completed': self._completed,
+        }
+    
+    def shutdown(self):
+        """Stop the pool, letting running jobs finish"""
+        self._pool.shutdown(wait=True, cancel_futures=True)
\ No newline at end of file
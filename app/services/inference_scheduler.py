@@ -0,0 +1,139 @@
+import time
+import asyncio
+import numpy as np
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+class InferenceBatcher:
+    """
+    Cross-request micro-batching for a single model
+    
+    Feature matrices submitted by concurrent requests are queued and flushed
+    as one stacked predict call once max_batch_rows rows are waiting or the
+    oldest submission has waited max_wait_ms. Predictions are split back to
+    the waiting requests in submission order. The stacked matrix is scored
+    by run_predict, normally InferenceExecutor.predict_features, so batches
+    share the executor's pool and concurrency limit.
+    """
+    
+    def __init__(self, model: Any, name: str, run_predict: Callable[[np.ndarray], Awaitable[np.ndarray]],
+                 max_batch_rows: int = 64, max_wait_ms: float = 2.0):
+        self.model = model
+        self.name = name
+        self.run_predict = run_predict
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.n_features = getattr(model, 'n_features_in_', None)
+        
+        self._pending: List[Tuple[np.ndarray, asyncio.Future, float]] = []
+        self._pending_rows = 0
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        
+        # Counters exposed through stats()
+        self._batches = 0
+        self._requests = 0
+        self._rows = 0
+        self._fallbacks = 0
+        self._max_batch_rows_seen = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+    
+    async def predict(self, features: np.ndarray) -> np.ndarray:
+        """Queue a feature matrix and wait for its predictions"""
+        if features.ndim != 2:
+            raise ValueError(f"Expected 2D feature matrix, got {features.ndim}D")
+        if self.n_features is not None and features.shape[1] != self.n_features:
+            raise ValueError(
+                f"X has {features.shape[1]} features, but {type(self.model).__name__} "
+                f"is expecting {self.n_features} features as input."
+            )
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((features, future, time.perf_counter()))
+        self._pending_rows += len(features)
+        
+        # Flush on size, otherwise make sure a timer is armed
+        if self._pending_rows >= self.max_batch_rows:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.max_wait, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        """Hand the pending batch to the executor"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        
+        if not self._pending:
+            return
+        
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: List[Tuple[np.ndarray, asyncio.Future, float]]):
+        """Score a batch and resolve every waiting request"""
+        flushed_at = time.perf_counter()
+        sizes = [len(features) for features, _, _ in batch]
+        
+        # Update counters
+        self._batches += 1
+        self._requests += len(batch)
+        self._rows += sum(sizes)
+        self._max_batch_rows_seen = max(self._max_batch_rows_seen, sum(sizes))
+        for _, _, queued_at in batch:
+            waited = flushed_at - queued_at
+            self._total_wait += waited
+            self._max_wait_seen = max(self._max_wait_seen, waited)
+        
+        try:
+            if len(batch) == 1:
+                stacked = batch[0][0]
+            else:
+                stacked = np.concatenate([features for features, _, _ in batch])
+            predictions = await self.run_predict(stacked)
+            results = np.split(predictions, np.cumsum(sizes)[:-1])
+        except Exception as e:
+            if len(batch) == 1:
+                results = [e]
+            else:
+                # One bad matrix (e.g. inf values) must not fail the whole batch
+                self._fallbacks += 1
+                results = await self._predict_each(batch)
+        
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    async def _predict_each(self, batch: List[Tuple[np.ndarray, asyncio.Future, float]]) -> List[Any]:
+        """Score batch members separately, keeping each request's own error"""
+        return await asyncio.gather(
+            *(self.run_predict(features) for features, _, _ in batch), return_exceptions=True
+        )
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, batch size and wait time counters"""
+        return {
+            'model': self.name,
+            'max_batch_rows': self.max_batch_rows,
+            'max_wait_ms': self.max_wait * 1000,
+            'queue_depth_requests': len(self._pending),
+            'queue_depth_rows': self._pending_rows,
+            'batches': self._batches,
+            'requests': self._requests,
+            'rows': self._rows,
+            'fallbacks': self._fallbacks,
+            'avg_batch_requests': self._requests / self._batches if self._batches else 0.0,
+            'avg_batch_rows': self._rows / self._batches if self._batches else 0.0,
+            'max_batch_rows_seen': self._max_batch_rows_seen,
+            'avg_wait_ms': self._total_wait / self._requests * 1000 if self._requests else 0.0,
+            'max_wait_ms_seen': self._max_wait_seen * 1000,
+        }
\ No newline at end of file
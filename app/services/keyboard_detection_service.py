@@ -1,34 +1,63 @@
 import pandas as pd
-import joblib
+import numpy as np
 from app.config import get_settings
+from app.utils.compiled_forest import load_model, model_predict
+from app.utils.features import KEYBOARD_STAT_COLUMNS, extract_keyboard_features
+from app.utils.metrics import get_metrics, timed
+from app.utils.timestamps import decode_timestamps
 
 class KeyboardDetectionService:
     """Service for keyboard typing detection"""
     
     def __init__(self):
         settings = get_settings()
-        self.model = joblib.load(settings.KEYBOARD_MODEL_PATH)
+        self.model = load_model(settings.KEYBOARD_MODEL_PATH, settings.MODEL_BACKEND)
+        
+        # Declared field order gives a fixed-width vector; empty keeps every field, sorted
+        self.field_order = tuple(
+            field.strip() for field in settings.KEYBOARD_FIELD_ORDER.split(',') if field.strip()
+        ) or None
+        
+        n_features = getattr(self.model, 'n_features_in_', None)
+        if self.field_order and n_features is not None and n_features != len(self.field_order) * len(KEYBOARD_STAT_COLUMNS):
+            raise ValueError(
+                f"KEYBOARD_FIELD_ORDER {self.field_order} gives {len(self.field_order) * len(KEYBOARD_STAT_COLUMNS)} "
+                f"features, but the keyboard model expects {n_features}"
+            )
+    
+    @timed('keyboard_features')
+    def extract_features(self, data: pd.DataFrame) -> np.ndarray:
+        """Build the single-row model input from keystroke events"""
+        # Convert timestamps, raising "Invalid timestamps" on bad rows
+        timestamps_ns = decode_timestamps(data['timestamp'], unit='ns')
+        
+        # Check if data is valid
+        if data.empty:
+            raise ValueError("No valid data for prediction")
+        
+        # Per-field mean, std, min, max of time differences, flattened into a single row
+        feature_vector = extract_keyboard_features(
+            data['fieldName'].to_numpy(),
+            timestamps_ns,
+            self.field_order
+        )
+        return feature_vector.reshape(1, -1)
+    
+    def interpret(self, predictions: np.ndarray) -> str:
+        """Turn the model prediction for one request into a verdict"""
+        return 'Bot' if predictions[0] == 1 else 'Human'
     
     def predict(self, data: pd.DataFrame) -> str:
         """Predict if keyboard typing is from human or bot"""
         try:
-            # Convert timestamps
-            data['timestamp'] = pd.to_datetime(data['timestamp'])
-            
-            # Calculate time differences grouped by field
-            data['time_diff'] = data.groupby('fieldName')['timestamp'].diff().dt.total_seconds().fillna(0)
-            
-            # Extract features: mean, std, min, max of time differences
-            features = data.groupby('fieldName')['time_diff'].agg(['mean', 'std', 'min', 'max']).reset_index()
-            
-            # Flatten features into a single row
-            feature_vector = features.drop('fieldName', axis=1).values.flatten()
+            features = self.extract_features(data)
             
             # Make prediction
-            prediction = self.model.predict([feature_vector])
+            with get_metrics().timer('keyboard_predict'):
+                prediction = model_predict(self.model, features)
             
             # Return result
-            return 'Bot' if prediction[0] == 1 else 'Human'
+            return self.interpret(prediction)
             
         except Exception as e:
             print(f"Keyboard prediction error: {e}")
@@ -1,49 +1,89 @@
 import pandas as pd
 import numpy as np
-import joblib
 from app.config import get_settings
+from app.utils.compiled_forest import load_model, model_predict
+from app.utils.downsampling import REDUCTIONS, cap_segments, reduce_trajectory
+from app.utils.features import extract_mouse_features, extract_mouse_session_windows
+from app.utils.metrics import get_metrics, timed
+from app.utils.timestamps import decode_timestamps
 
 class MouseDetectionService:
     """Service for mouse movement detection"""
     
+    MODES = ('point', 'session')
+    
     def __init__(self):
         settings = get_settings()
-        self.model = joblib.load(settings.MOUSE_MODEL_PATH)
+        self.mode = settings.MOUSE_MODEL_MODE
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown MOUSE_MODEL_MODE '{self.mode}', expected one of {self.MODES}")
+        
+        model_path = settings.MOUSE_SESSION_MODEL_PATH if self.mode == 'session' else settings.MOUSE_MODEL_PATH
+        self.model = load_model(model_path, settings.MODEL_BACKEND)
+        
+        # Upload bounds: event cap, then optional trajectory reduction
+        self.max_events = settings.MOUSE_MAX_EVENTS
+        self.reduction = settings.MOUSE_REDUCTION
+        if self.reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown MOUSE_REDUCTION '{self.reduction}', expected one of {REDUCTIONS}")
+        self.rdp_epsilon = settings.MOUSE_RDP_EPSILON
+        self.resample_interval_ms = settings.MOUSE_RESAMPLE_INTERVAL_MS
+    
+    @timed('mouse_features')
+    def extract_features(self, data: pd.DataFrame) -> np.ndarray:
+        """Build the model input for the configured mode, raising ValueError on bad data"""
+        # Bound the work: uploads capped while parsing carry their block starts,
+        # DataFrames passed in directly are capped here
+        segment_starts = data.attrs.get('segment_starts')
+        if segment_starts is None and self.max_events and len(data) > self.max_events:
+            rows, segment_starts = cap_segments(len(data), self.max_events)
+            data = data.iloc[rows]
+        
+        # Convert timestamps, raising "Invalid timestamps" on bad rows
+        timestamps_ns = decode_timestamps(data['timestamp'], unit='ns')
+        
+        # Check if data is valid
+        if data.empty:
+            raise ValueError("No valid data for prediction")
+        
+        x = data['x'].to_numpy()
+        y = data['y'].to_numpy()
+        
+        # Thin the trajectory block by block
+        if self.reduction != 'none':
+            keep, segment_starts = reduce_trajectory(
+                x, y, timestamps_ns, self.reduction, segment_starts,
+                epsilon=self.rdp_epsilon, interval_ms=self.resample_interval_ms
+            )
+            x, y, timestamps_ns = x[keep], y[keep], timestamps_ns[keep]
+        
+        # Session mode: one summary row per window of the trained length
+        if self.mode == 'session':
+            return extract_mouse_session_windows(x, y, timestamps_ns, segment_starts)
+        
+        # Point mode: one row per event
+        return extract_mouse_features(x, y, timestamps_ns, segment_starts)
+    
+    def interpret(self, predictions: np.ndarray) -> str:
+        """Turn model predictions for one request into a verdict"""
+        # Count predictions, per event or per session window
+        human_count = (predictions == 0).sum()
+        bot_count = (predictions == 1).sum()
+        
+        # Return final prediction
+        return "Human" if human_count > bot_count else "Bot"
     
     def predict(self, data: pd.DataFrame) -> str:
         """Predict if mouse movement is from human or bot"""
         try:
-            # Convert timestamps
-            data['timestamp'] = pd.to_datetime(data['timestamp'], errors='coerce')
-            
-            # Handle invalid timestamps
-            if data['timestamp'].isna().any():
-                return "Error: Invalid timestamps"
-            
-            # Feature engineering
-            data['time_diff'] = data['timestamp'].diff().dt.total_seconds().fillna(0) * 1000
-            data['distance'] = np.sqrt((data['x'].diff()**2) + (data['y'].diff()**2)).fillna(0)
-            data['speed'] = data['distance'] / data['time_diff'].replace(0, np.nan).fillna(0)
-            data['direction'] = np.arctan2(data['y'].diff(), data['x'].diff()).fillna(0)
-            data['curvature'] = data['direction'].diff().fillna(0)
-            
-            # Select relevant columns
-            data = data[['time_diff', 'distance', 'speed', 'direction', 'curvature']]
-            
-            # Check if data is valid
-            if data.empty:
-                return "Error: No valid data for prediction"
+            features = self.extract_features(data)
             
             # Make prediction
-            predictions = self.model.predict(data)
-            
-            # Count predictions
-            human_count = (predictions == 0).sum()
-            bot_count = (predictions == 1).sum()
-            
-            # Return final prediction
-            return "Human" if human_count > bot_count else "Bot"
+            with get_metrics().timer('mouse_predict'):
+                predictions = model_predict(self.model, features)
             
+            return self.interpret(predictions)
+        
         except Exception as e:
             print(f"Mouse prediction error: {e}")
             return f"Error: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,54 @@
+import pandas as pd
+import numpy as np
+from app.config import get_settings
+from app.utils.compiled_forest import load_model, model_predict
+from app.utils.features import extract_scroll_features
+from app.utils.metrics import get_metrics, timed
+
+class ScrollDetectionService:
+    """Service for scroll behaviour detection"""
+    
+    def __init__(self):
+        settings = get_settings()
+        self.model = load_model(settings.SCROLL_MODEL_PATH, settings.MODEL_BACKEND)
+    
+    @timed('scroll_features')
+    def extract_features(self, data: pd.DataFrame) -> np.ndarray:
+        """Build the single-row model input from scroll events"""
+        # Check if data is valid
+        if data.empty:
+            raise ValueError("No valid data for prediction")
+        
+        # Timestamps are epoch milliseconds
+        timestamps_ms = pd.to_numeric(data['timestamp'], errors='coerce').to_numpy(dtype=np.float64)
+        if np.isnan(timestamps_ms).any():
+            raise ValueError("Invalid timestamps")
+        
+        # Total distance, speed variance, direction changes and average pause in one pass
+        feature_vector = extract_scroll_features(
+            pd.to_numeric(data['position'], errors='coerce').to_numpy(dtype=np.float64),
+            pd.to_numeric(data['speed'], errors='coerce').to_numpy(dtype=np.float64),
+            timestamps_ms
+        )
+        return feature_vector.reshape(1, -1)
+    
+    def interpret(self, predictions: np.ndarray) -> str:
+        """Turn the model prediction for one request into a verdict"""
+        # scroll_model.pkl was trained with is_human labels: 1 = human
+        return 'Human' if predictions[0] == 1 else 'Bot'
+    
+    def predict(self, data: pd.DataFrame) -> str:
+        """Predict if scrolling is from human or bot"""
+        try:
+            features = self.extract_features(data)
+            
+            # Make prediction
+            with get_metrics().timer('scroll_predict'):
+                prediction = model_predict(self.model, features)
+            
+            # Return result
+            return self.interpret(prediction)
+            
+        except Exception as e:
+            print(f"Scroll prediction error: {e}")
+            return f"Error: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,239 @@
+import math
+import asyncio
+import numpy as np
+from typing import Any, Dict, List, Optional
+from app.config import get_settings
+from app.utils.features import extract_mouse_features, extract_mouse_session_windows
+from app.utils.running_stats import RunningStats
+from app.utils.timestamps import decode_timestamps
+
+# Point-mode feature columns tracked with running statistics
+STREAM_STAT_COLUMNS = {'time_diff': 0, 'speed': 2, 'curvature': 4}
+
+
+def wilson_lower_bound(successes: int, n: int, z: float = 1.96) -> float:
+    """Lower bound of the Wilson score interval for a proportion"""
+    if n == 0:
+        return 0.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    centre = p + z * z / (2 * n)
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return (centre - margin) / denominator
+
+
+class StreamingSession:
+    """
+    Incremental scoring state for one streamed session
+    
+    Mouse frames are turned into point features as they arrive, using the
+    last event of the previous frame so the rows match the batch CSV
+    features exactly. Each frame is scored straight away and only the
+    vote counts and Welford statistics are kept. Once enough events have
+    arrived and the leading class passes the confidence threshold, an
+    early verdict is returned and later mouse frames are no longer scored.
+    Keystroke features are per-field running mean/std/min/max of the
+    inter-key times, the same aggregates the batch path computes.
+    
+    In "session" mouse mode the model scores windows that span frames, so
+    mouse events are buffered and scored on submit instead. At most
+    STREAM_MAX_SESSION_EVENTS are buffered; frames past that are rejected.
+    """
+    
+    def __init__(self, behavior_service: Any, fingerprint: str, browser_info: Dict[str, Any]):
+        settings = get_settings()
+        self.behavior_service = behavior_service
+        self.mouse_service = behavior_service.mouse_service
+        self.keyboard_service = behavior_service.keyboard_service
+        self.fingerprint = fingerprint
+        self.browser_info = browser_info
+        self.min_events = settings.STREAM_MIN_EVENTS
+        self.confidence_threshold = settings.STREAM_VERDICT_CONFIDENCE
+        self.max_frame_events = settings.STREAM_MAX_FRAME_EVENTS
+        self.max_session_events = settings.STREAM_MAX_SESSION_EVENTS
+        
+        # Mouse state: previous event (x, y, timestamp_ns, direction) and votes
+        self.mouse_events = 0
+        self.human_votes = 0
+        self.bot_votes = 0
+        self.early_verdict: Optional[str] = None
+        self.mouse_stats = {name: RunningStats() for name in STREAM_STAT_COLUMNS}
+        self._last_point: Optional[tuple] = None
+        self._session_chunks: List[tuple] = []
+        
+        # Keyboard state: last timestamp and inter-key statistics per field
+        self.key_events = 0
+        self._key_last_ns: Dict[str, int] = {}
+        self._key_stats: Dict[str, RunningStats] = {}
+        
+        # Blacklist lookup runs while the session streams
+        self._is_bot = asyncio.ensure_future(behavior_service.repository.is_bot_fingerprint(fingerprint))
+    
+    def _frame_columns(self, message: Dict[str, Any], columns: tuple) -> List[list]:
+        """Validate the columnar arrays of one frame"""
+        values = [message.get(column) for column in columns]
+        if any(not isinstance(column, list) for column in values):
+            raise ValueError(f"Frame must contain list columns {columns}")
+        if len({len(column) for column in values}) != 1:
+            raise ValueError("Frame columns have different lengths")
+        if len(values[0]) > self.max_frame_events:
+            raise ValueError(f"Frame has more than {self.max_frame_events} events")
+        return values
+    
+    async def _model_predict(self, signal: str, features: np.ndarray) -> np.ndarray:
+        """Run a model in the inference executor, through the micro-batcher if enabled"""
+        batcher = self.behavior_service.batchers.get(signal)
+        if batcher is not None:
+            return await batcher.predict(features)
+        return await self.behavior_service.executor.predict_features(signal, features)
+    
+    async def add_mouse_frame(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Score one frame of mouse events"""
+        x, y, timestamps = self._frame_columns(message, ('x', 'y', 'timestamp'))
+        if not timestamps:
+            return self._mouse_progress()
+        
+        # Session mode buffers every event, refuse frames that would overflow the buffer
+        if self.mouse_service.mode == 'session' and self.mouse_events + len(timestamps) > self.max_session_events:
+            raise ValueError(f"Session has more than {self.max_session_events} mouse events")
+        
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        timestamps_ns = decode_timestamps(timestamps, unit='ns')
+        
+        # Session mode: keep the events for the submit-time summary
+        if self.mouse_service.mode == 'session':
+            self._session_chunks.append((x, y, timestamps_ns))
+            self.mouse_events += len(timestamps_ns)
+            return self._mouse_progress()
+        
+        # After an early verdict later frames are only counted
+        if self.early_verdict is not None:
+            self.mouse_events += len(timestamps_ns)
+            return self._mouse_progress()
+        
+        # Prepend the previous event so the first row gets real differences
+        if self._last_point is not None:
+            last_x, last_y, last_ns, last_direction = self._last_point
+            features = extract_mouse_features(
+                np.r_[last_x, x], np.r_[last_y, y], np.r_[last_ns, timestamps_ns]
+            )[1:]
+            features[0, 4] = features[0, 3] - last_direction
+        else:
+            features = extract_mouse_features(x, y, timestamps_ns)
+        
+        predictions = await self._model_predict('mouse', features)
+        
+        # Fold the frame into the running state
+        self._last_point = (x[-1], y[-1], timestamps_ns[-1], features[-1, 3])
+        self.mouse_events += len(features)
+        self.bot_votes += int((predictions == 1).sum())
+        self.human_votes += int((predictions == 0).sum())
+        for name, column in STREAM_STAT_COLUMNS.items():
+            self.mouse_stats[name].update(features[:, column])
+        
+        # Early verdict once the leading class is confidently ahead
+        votes = self.human_votes + self.bot_votes
+        if votes >= self.min_events:
+            confidence = wilson_lower_bound(max(self.human_votes, self.bot_votes), votes)
+            if confidence >= self.confidence_threshold:
+                self.early_verdict = self._mouse_vote()
+                return {
+                    'type': 'verdict',
+                    'mouse_result': self.early_verdict,
+                    'confidence': confidence,
+                    'mouse_events': self.mouse_events
+                }
+        
+        return self._mouse_progress()
+    
+    def add_key_frame(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Fold one frame of keystroke events into the per-field statistics"""
+        field_names, timestamps = self._frame_columns(message, ('fieldName', 'timestamp'))
+        if timestamps:
+            timestamps_ns = decode_timestamps(timestamps, unit='ns')
+            for field_name, timestamp_ns in zip(field_names, timestamps_ns.tolist()):
+                stats = self._key_stats.get(field_name)
+                if stats is None:
+                    stats = self._key_stats[field_name] = RunningStats()
+                
+                # The first event of a field has a time difference of 0
+                last_ns = self._key_last_ns.get(field_name, timestamp_ns)
+                stats.add((timestamp_ns - last_ns) / 1e9)
+                self._key_last_ns[field_name] = timestamp_ns
+            self.key_events += len(timestamps_ns)
+        
+        return {'type': 'progress', 'key_events': self.key_events}
+    
+    def _mouse_vote(self) -> str:
+        """Majority vote, ties go to Bot like the batch path"""
+        return "Human" if self.human_votes > self.bot_votes else "Bot"
+    
+    def _mouse_progress(self) -> Dict[str, Any]:
+        """Progress reply for a mouse frame"""
+        votes = self.human_votes + self.bot_votes
+        return {
+            'type': 'progress',
+            'mouse_events': self.mouse_events,
+            'human_votes': self.human_votes,
+            'bot_votes': self.bot_votes,
+            'confidence': wilson_lower_bound(max(self.human_votes, self.bot_votes), votes),
+            'stats': {name: stats.to_dict() for name, stats in self.mouse_stats.items()}
+        }
+    
+    async def _mouse_result(self) -> str:
+        """Final mouse verdict from the running votes (or buffered session)"""
+        if self.mouse_events == 0:
+            return "Error: No valid data for prediction"
+        if self.mouse_service.mode != 'session':
+            return self.early_verdict or self._mouse_vote()
+        
+        x, y, timestamps_ns = (np.concatenate(column) for column in zip(*self._session_chunks))
+        features = extract_mouse_session_windows(x, y, timestamps_ns)
+        try:
+            predictions = await self._model_predict('mouse', features)
+            return self.mouse_service.interpret(predictions)
+        except Exception as e:
+            print(f"Mouse prediction error: {e}")
+            return f"Error: {str(e)}"
+    
+    async def _key_result(self) -> str:
+        """Keyboard verdict from the per-field statistics, in the service's field layout"""
+        if self.key_events == 0:
+            return "Error: No valid data for prediction"
+        
+        field_order = self.keyboard_service.field_order or sorted(self._key_stats)
+        rows = []
+        for field_name in field_order:
+            stats = self._key_stats.get(field_name)
+            rows.append((stats.mean, stats.std(), stats.min, stats.max) if stats is not None else (0.0, 0.0, 0.0, 0.0))
+        features = np.asarray(rows, dtype=np.float64).reshape(1, -1)
+        try:
+            predictions = await self._model_predict('keyboard', features)
+            return self.keyboard_service.interpret(predictions)
+        except Exception as e:
+            print(f"Keyboard prediction error: {e}")
+            return f"Error: {str(e)}"
+    
+    async def finish(self) -> Dict[str, Any]:
+        """Combine the running state into the final verdicts"""
+        mouse_result = await self._mouse_result()
+        key_result = await self._key_result()
+        is_automated = self.behavior_service.browser_service.detect_automation(self.browser_info)
+        is_bot = await self._is_bot
+        
+        return {
+            'type': 'result',
+            'mouse_result': mouse_result,
+            'key_result': key_result,
+            'is_automated': is_automated,
+            'is_bot': is_bot,
+            'early': self.early_verdict is not None,
+            'mouse_events': self.mouse_events,
+            'key_events': self.key_events
+        }
+    
+    def close(self):
+        """Drop the blacklist lookup if the session ends early"""
+        if not self._is_bot.done():
+            self._is_bot.cancel()
\ No newline at end of file
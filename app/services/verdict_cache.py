@@ -0,0 +1,85 @@
+import sys
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from app.utils.cache import ByteBudgetCache
+
+# Uploads at least this large are hashed off the event loop (hashlib releases the GIL)
+OFFLOAD_HASH_BYTES = 1 << 20
+
+# Bookkeeping per entry besides key and verdict: OrderedDict node, entry tuple, expiry
+ENTRY_OVERHEAD_BYTES = 200
+
+class VerdictCache:
+    """
+    Content-addressed cache of ML verdicts for uploaded CSVs
+    
+    Entries are keyed by a BLAKE2b digest of the raw upload, so a
+    byte-identical payload is answered without parsing or inference.
+    Recorded sessions carry millisecond timestamps and never repeat
+    exactly, so every hit, and every upload that joins an identical one
+    still being scored, is reported as a replay. Error verdicts are not
+    cached. Memory is bounded by the bytes the entries cost.
+    """
+    
+    def __init__(self, max_bytes: int, ttl: float):
+        self._cache = ByteBudgetCache(max_bytes, ttl)
+        self._pending: Dict[bytes, asyncio.Task] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+        self.replays: Dict[str, int] = {}
+    
+    @staticmethod
+    def digest(signal: str, data: bytes) -> bytes:
+        """128-bit content key of an upload for one signal"""
+        return hashlib.blake2b(data, digest_size=16, person=signal.encode()[:16]).digest()
+    
+    async def score(self, signal: str, data: bytes, compute: Callable[[], Awaitable[str]]) -> Tuple[str, bool]:
+        """Verdict for an upload, and whether it replays an earlier one"""
+        if len(data) >= OFFLOAD_HASH_BYTES:
+            key = await asyncio.to_thread(self.digest, signal, data)
+        else:
+            key = self.digest(signal, data)
+        
+        # Serve from cache when possible
+        verdict = self._cache.get(key)
+        if verdict is not None:
+            self._stats['hits'] += 1
+            self._count_replay(signal)
+            return verdict, True
+        
+        # Share the scoring of an identical upload still in flight
+        pending = self._pending.get(key)
+        if pending is not None:
+            self._stats['coalesced'] += 1
+            self._count_replay(signal)
+            return await asyncio.shield(pending), True
+        
+        self._stats['misses'] += 1
+        pending = asyncio.ensure_future(self._compute(key, compute))
+        self._pending[key] = pending
+        pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        
+        # Shield so one cancelled caller doesn't cancel the shared scoring
+        return await asyncio.shield(pending), False
+    
+    async def _compute(self, key: bytes, compute: Callable[[], Awaitable[str]]) -> str:
+        """Score a new upload and remember a successful verdict"""
+        verdict = await compute()
+        if not verdict.startswith('Error'):
+            size = ENTRY_OVERHEAD_BYTES + sys.getsizeof(key) + sys.getsizeof(verdict)
+            self._cache.set(key, verdict, size)
+        return verdict
+    
+    def _count_replay(self, signal: str):
+        self.replays[signal] = self.replays.get(signal, 0) + 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/coalesce counters, replays per signal and memory use"""
+        return {
+            **self._stats,
+            'replays': dict(self.replays),
+            'size': len(self._cache),
+            'size_bytes': self._cache.size_bytes,
+            'max_bytes': self._cache.max_bytes,
+            'evictions': self._cache.evictions,
+        }
\ No newline at end of file
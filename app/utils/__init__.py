@@ -1,3 +1,43 @@
-from app.utils.helpers import get_current_timestamp, validate_browser_info, format_log_message
+from app.utils.lazy_imports import lazy_exports
 
-__all__ = ["get_current_timestamp", "validate_browser_info", "format_log_message"]
\ No newline at end of file
+# Imported on first access, see lazy_exports
+_EXPORTS = {
+    "get_current_timestamp": "app.utils.helpers",
+    "validate_browser_info": "app.utils.helpers",
+    "format_log_message": "app.utils.helpers",
+    "ByteBudgetCache": "app.utils.cache",
+    "TTLCache": "app.utils.cache",
+    "decode_columnar": "app.utils.columnar",
+    "encode_columnar": "app.utils.columnar",
+    "is_columnar": "app.utils.columnar",
+    "read_columns": "app.utils.columnar",
+    "CompiledForest": "app.utils.compiled_forest",
+    "load_model": "app.utils.compiled_forest",
+    "model_predict": "app.utils.compiled_forest",
+    "cap_csv_rows": "app.utils.downsampling",
+    "cap_segments": "app.utils.downsampling",
+    "rdp_indices": "app.utils.downsampling",
+    "reduce_trajectory": "app.utils.downsampling",
+    "resample_indices": "app.utils.downsampling",
+    "KEYBOARD_STAT_COLUMNS": "app.utils.features",
+    "MOUSE_FEATURE_COLUMNS": "app.utils.features",
+    "MOUSE_SESSION_FEATURE_COLUMNS": "app.utils.features",
+    "MOUSE_SESSION_WINDOW": "app.utils.features",
+    "SCROLL_FEATURE_COLUMNS": "app.utils.features",
+    "ScrollFeatures": "app.utils.features",
+    "extract_keyboard_features": "app.utils.features",
+    "extract_mouse_features": "app.utils.features",
+    "extract_mouse_session_features": "app.utils.features",
+    "extract_mouse_session_windows": "app.utils.features",
+    "extract_scroll_features": "app.utils.features",
+    "RunningStats": "app.utils.running_stats",
+    "decode_timestamps": "app.utils.timestamps",
+    "decode_trajectory": "app.utils.trajectory_codec",
+    "encode_trajectory": "app.utils.trajectory_codec",
+    "is_trajectory": "app.utils.trajectory_codec",
+    "SlidingWindowCounter": "app.utils.visit_counter"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
\ No newline at end of file
@@ -0,0 +1,119 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Sentinel telling a missing key from a cached None
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry expiry
+    
+    Not thread-safe: intended for use from the event loop. Expired entries
+    are dropped lazily when read.
+    """
+    
+    def __init__(self, max_entries: int, default_ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.evictions = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live value and mark it recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry if full"""
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+
+class ByteBudgetCache:
+    """
+    LRU cache with per-entry expiry, bounded by the bytes its entries cost
+    
+    Every set() states the entry's size; least recently used entries are
+    evicted until the total fits max_bytes. Not thread-safe, like TTLCache.
+    """
+    
+    def __init__(self, max_bytes: int, default_ttl: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.size_bytes = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live value and mark it recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        
+        value, expires_at, _ = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.invalidate(key)
+            return default
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Hashable, value: Any, size: int, ttl: Optional[float] = None):
+        """Store a value costing size bytes, evicting least recently used entries to fit"""
+        if size > self.max_bytes:
+            return
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        
+        self.invalidate(key)
+        self._entries[key] = (value, expires_at, size)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.size_bytes -= evicted
+            self.evictions += 1
+    
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[2]
+    
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+        self.size_bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
\ No newline at end of file
@@ -0,0 +1,115 @@
+import io
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, Tuple
+
+# Every .npy array starts with this magic string
+NPY_MAGIC = b'\x93NUMPY'
+
+# Name suffix of the string array that decodes an integer-coded column
+CATEGORIES_SUFFIX = '.categories'
+
+# Columns holding event times, stored as datetime64[ms] or int64 epoch milliseconds
+TIMESTAMP_COLUMN = 'timestamp'
+
+
+def is_columnar(data: bytes) -> bool:
+    """True if an upload uses the columnar .npy encoding rather than CSV"""
+    return data[:len(NPY_MAGIC)] == NPY_MAGIC
+
+
+def _arrays(data: bytes) -> Iterator[Tuple[str, np.ndarray]]:
+    """(column name, read-only view into data) for every .npy array in the upload"""
+    stream = io.BytesIO(data)
+    while stream.tell() < len(data):
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+        else:
+            raise ValueError(f"Unsupported .npy version {version}")
+        
+        # One named column per array, plain numbers or strings only
+        if len(shape) != 1 or dtype.names is None or len(dtype.names) != 1:
+            raise ValueError("Each column must be a 1-D array with a single named field")
+        name = dtype.names[0]
+        column_dtype = dtype.fields[name][0]
+        if column_dtype.hasobject or column_dtype.kind not in 'biufMU':
+            raise ValueError(f"Unsupported dtype {column_dtype} for column '{name}'")
+        
+        offset = stream.tell()
+        count = shape[0]
+        if offset + count * dtype.itemsize > len(data):
+            raise ValueError(f"Column '{name}' is truncated")
+        yield name, np.frombuffer(data, dtype=column_dtype, count=count, offset=offset)
+        stream.seek(offset + count * dtype.itemsize)
+
+
+def read_columns(data: bytes) -> Dict[str, np.ndarray]:
+    """
+    Map a columnar upload to arrays without copying or parsing text
+    
+    The upload is a sequence of .npy arrays (format 1.0 or 2.0), each a
+    1-D structured array with a single field named after the column, so
+    every column is contiguous and becomes a np.frombuffer view. An
+    unsigned integer column can be dictionary encoded: its values are
+    then indices into a string array named "<column>.categories".
+    """
+    columns = dict(_arrays(data))
+    lengths = {len(values) for name, values in columns.items() if not name.endswith(CATEGORIES_SUFFIX)}
+    if len(lengths) > 1:
+        raise ValueError("Columns have different lengths")
+    return columns
+
+
+def decode_columnar(data: bytes) -> pd.DataFrame:
+    """
+    Columnar upload as a DataFrame shaped like the parsed CSV
+    
+    Timestamps become datetime64[ms] (int64 epoch milliseconds are viewed,
+    not converted) and dictionary-encoded columns become Categoricals.
+    """
+    columns = read_columns(data)
+    frame = {}
+    for name, values in columns.items():
+        if name.endswith(CATEGORIES_SUFFIX):
+            continue
+        
+        categories = columns.get(name + CATEGORIES_SUFFIX)
+        if categories is not None:
+            if values.dtype.kind != 'u':
+                raise ValueError(f"Dictionary-encoded column '{name}' must hold unsigned integers")
+            if len(values) and values.max() >= len(categories):
+                raise ValueError(f"Column '{name}' has codes outside its categories")
+            values = pd.Categorical.from_codes(values.astype(np.int64, copy=False), categories)
+        elif name == TIMESTAMP_COLUMN and values.dtype.kind == 'i':
+            values = values.astype(np.int64, copy=False).view('M8[ms]')
+        frame[name] = values
+    
+    return pd.DataFrame(frame, copy=False)
+
+
+def encode_columnar(columns: Dict[str, np.ndarray]) -> bytes:
+    """
+    Reference encoder: one .npy array per column, in the given order
+    
+    A column of strings is dictionary encoded into uint16 codes plus a
+    "<column>.categories" array.
+    """
+    out = io.BytesIO()
+    for name, values in columns.items():
+        values = np.asarray(values)
+        if values.dtype.kind in 'OUS':
+            categories, codes = np.unique(values.astype(str), return_inverse=True)
+            _write_column(out, name, codes.astype(np.uint16))
+            _write_column(out, name + CATEGORIES_SUFFIX, categories)
+        else:
+            _write_column(out, name, values)
+    return out.getvalue()
+
+
+def _write_column(out: io.BytesIO, name: str, values: np.ndarray):
+    column = np.empty(len(values), dtype=[(name, values.dtype)])
+    column[name] = values
+    np.lib.format.write_array(out, column, allow_pickle=False)
\ No newline at end of file
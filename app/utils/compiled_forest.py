@@ -0,0 +1,237 @@
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Any
+
+# Version of the .npz layout written by CompiledForest.save
+COMPILED_FORMAT_VERSION = 1
+
+
+class CompiledForest:
+    """
+    Tree ensemble flattened into contiguous NumPy arrays
+    
+    Every node of every tree lives in one set of arrays (feature, threshold,
+    left, right, missing_left, value), with leaves pointing to themselves.
+    Traversal advances every (tree, row) pair that is still on a split node
+    one level per vectorized step. Predictions match sklearn's RandomForest/ExtraTrees classifiers
+    exactly: inputs are cast to float32, missing values follow the fitted
+    missing_go_to_left flags, and tree probabilities are summed in tree order.
+    """
+    
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 missing_left: np.ndarray, value: np.ndarray, roots: np.ndarray, classes: np.ndarray,
+                 n_features: int, max_depth: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.max_depth = max_depth
+        
+        # Traversal helpers: children interleaved as [left, right] per node
+        self.is_leaf = left == np.arange(len(left))
+        self.children = np.stack([left, right], axis=1).ravel()
+    
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "CompiledForest":
+        """Compile a fitted single-output forest classifier"""
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output forests can be compiled")
+        
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = tree.__getstate__()['nodes']
+            node_ids = np.arange(tree.node_count, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+            
+            # Leaves loop back to themselves so extra traversal steps are no-ops
+            left = np.where(is_leaf, node_ids, tree.children_left).astype(np.int32) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right).astype(np.int32) + offset
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+            
+            # Per-tree class probabilities, normalized the way DecisionTreeClassifier does
+            proba = tree.value[:, 0, :].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+            
+            features.append(feature)
+            thresholds.append(tree.threshold.astype(np.float64))
+            lefts.append(left)
+            rights.append(right)
+            if 'missing_go_to_left' in nodes.dtype.names:
+                missing.append(nodes['missing_go_to_left'].astype(bool))
+            else:
+                missing.append(np.zeros(tree.node_count, dtype=bool))
+            values.append(proba)
+            roots.append(offset)
+            offset += tree.node_count
+        
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            missing_left=np.concatenate(missing),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            n_features=int(model.n_features_in_),
+            max_depth=max(estimator.tree_.max_depth for estimator in model.estimators_)
+        )
+    
+    def save(self, path: str):
+        """Write the compiled arrays to an uncompressed .npz file"""
+        np.savez(
+            path,
+            version=np.int32(COMPILED_FORMAT_VERSION),
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            missing_left=self.missing_left,
+            value=self.value,
+            roots=self.roots,
+            classes=self.classes_,
+            n_features=np.int32(self.n_features_in_),
+            max_depth=np.int32(self.max_depth)
+        )
+    
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        """Read arrays written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['version'])
+            if version != COMPILED_FORMAT_VERSION:
+                raise ValueError(f"Unsupported compiled model version {version} in {path}")
+            return cls(
+                feature=data['feature'],
+                threshold=data['threshold'],
+                left=data['left'],
+                right=data['right'],
+                missing_left=data['missing_left'],
+                value=data['value'],
+                roots=data['roots'],
+                classes=data['classes'],
+                n_features=int(data['n_features']),
+                max_depth=int(data['max_depth'])
+            )
+    
+    def _validate(self, X: Any) -> np.ndarray:
+        """Mirror sklearn's input checks: 2D, right width, float32, no infinity"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError(f"Expected 2D array, got {X.ndim}D array instead")
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but {type(self).__name__} "
+                f"is expecting {self.n_features_in_} features as input."
+            )
+        if np.isinf(X).any():
+            raise ValueError("Input X contains infinity or a value too large for dtype('float32').")
+        return X
+    
+    def apply(self, X: Any) -> np.ndarray:
+        """Leaf index reached by every row in every tree, shape (n_trees, n_samples)"""
+        X = np.ascontiguousarray(self._validate(X))
+        n_samples, n_trees = len(X), len(self.roots)
+        flat_X = X.ravel()
+        
+        # Tree-major layout keeps each tree's nodes close together in cache
+        nodes = np.repeat(self.roots, n_samples)
+        row_offsets = np.tile(np.arange(n_samples, dtype=np.intp) * X.shape[1], n_trees)
+        
+        # Only rows still sitting on a split node move on each step
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while active.size:
+            current = nodes[active]
+            values = flat_X[row_offsets[active] + self.feature[current]]
+            go_right = ~(values <= self.threshold[current])
+            missing = np.isnan(values)
+            if missing.any():
+                go_right[missing] = ~self.missing_left[current[missing]]
+            following = self.children[2 * current + go_right]
+            nodes[active] = following
+            active = active[~self.is_leaf[following]]
+        
+        return nodes.reshape(n_trees, n_samples)
+    
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Class probabilities averaged over trees"""
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[1], self.value.shape[1]), dtype=np.float64)
+        
+        # Accumulate in tree order so sums match sklearn bit for bit
+        for tree_leaves in leaves:
+            proba += self.value[tree_leaves]
+        proba /= len(leaves)
+        return proba
+    
+    def predict(self, X: Any) -> np.ndarray:
+        """Predicted class for every row"""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def compiled_path_for(model_path: str) -> str:
+    """Location of the compiled artifact next to a pickled model"""
+    return os.path.splitext(model_path)[0] + '.npz'
+
+
+@lru_cache(maxsize=None)
+def load_model(model_path: str, backend: str = 'sklearn') -> Any:
+    """
+    Load a verifier for the requested backend
+    
+    Each model is loaded once per process and shared by every service using
+    it; models loaded before a fork are shared with the children.
+    
+    Args:
+        model_path: Path to the joblib pickle
+        backend: "sklearn" for the pickled estimator, "compiled" for CompiledForest
+    
+    Returns:
+        Object with a sklearn-style predict method
+    """
+    if backend == 'sklearn':
+        return joblib.load(model_path)
+    if backend != 'compiled':
+        raise ValueError(f"Unknown model backend '{backend}', expected 'sklearn' or 'compiled'")
+    
+    # Prefer the saved compact format, compile from the pickle otherwise
+    compiled_path = compiled_path_for(model_path)
+    if os.path.exists(compiled_path):
+        return CompiledForest.load(compiled_path)
+    return CompiledForest.from_sklearn(joblib.load(model_path))
+
+
+def model_predict(model: Any, features: np.ndarray) -> np.ndarray:
+    """
+    Predict on a feature matrix, naming its columns if the model expects names
+    
+    Pickles fitted on a DataFrame (MouseVerifier, ScrollVerifier) warn on
+    every unnamed array, so the matrix is wrapped in a DataFrame with the
+    fitted feature names; other models get the array unchanged.
+    """
+    feature_names = getattr(model, 'feature_names_in_', None)
+    if feature_names is not None:
+        features = pd.DataFrame(features, columns=feature_names)
+    return model.predict(features)
+
+
+if __name__ == "__main__":
+    import sys
+    
+    # Usage: python -m app.utils.compiled_forest path/to/Model.pkl [...]
+    for pickle_path in sys.argv[1:]:
+        output_path = compiled_path_for(pickle_path)
+        CompiledForest.from_sklearn(joblib.load(pickle_path)).save(output_path)
+        print(f"Compiled {pickle_path} -> {output_path}")
\ No newline at end of file
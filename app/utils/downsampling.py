@@ -0,0 +1,159 @@
+import numpy as np
+from typing import Optional, Tuple
+
+# Trajectory reductions applied before mouse feature extraction
+REDUCTIONS = ('none', 'rdp', 'resample')
+
+# Contiguous blocks kept when an upload is over the event cap
+CAP_SEGMENTS = 10
+
+
+def cap_segments(n: int, max_rows: int, segments: int = CAP_SEGMENTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pick at most max_rows of n rows as evenly spaced contiguous blocks
+    
+    Per-step mouse features come from consecutive events, so keeping runs of
+    neighbouring rows preserves their native sampling rate where striding
+    over the whole upload would not.
+    
+    Args:
+        n: Number of rows in the upload
+        max_rows: Row budget
+        segments: Number of blocks to spread the budget over
+    
+    Returns:
+        (row indices to keep, start of every block within the kept rows)
+    """
+    if n <= max_rows:
+        return np.arange(n), np.zeros(1, dtype=np.int64)
+    
+    segments = max(1, min(segments, max_rows))
+    length = max_rows // segments
+    block_starts = np.linspace(0, n - length, segments).round().astype(np.int64)
+    rows = (block_starts[:, None] + np.arange(length)).ravel()
+    return rows, np.arange(segments, dtype=np.int64) * length
+
+
+def cap_csv_rows(data: bytes, max_rows: int) -> Tuple[bytes, Optional[np.ndarray]]:
+    """
+    Apply cap_segments to CSV bytes before parsing
+    
+    Splitting lines is about ten times cheaper than parsing them, so an
+    oversized upload costs little more than a capped one. Assumes no quoted
+    newlines, which holds for the numeric mouse CSVs.
+    
+    Returns:
+        (CSV bytes with the header and kept rows, block starts or None if not capped)
+    """
+    # Cheap upper bound before splitting
+    if data.count(b'\n') <= max_rows + 1:
+        return data, None
+    
+    header, *rows = data.split(b'\n')
+    while rows and not rows[-1].strip():
+        rows.pop()
+    if len(rows) <= max_rows:
+        return data, None
+    
+    keep, segment_starts = cap_segments(len(rows), max_rows)
+    return b'\n'.join([header, *(rows[i] for i in keep)]), segment_starts
+
+
+def rdp_indices(x: np.ndarray, y: np.ndarray, epsilon: float) -> np.ndarray:
+    """
+    Ramer-Douglas-Peucker simplification of a polyline
+    
+    Iterative, with one vectorized distance computation per split, so the
+    cost is O(n * kept points) without recursion limits.
+    
+    Returns:
+        Sorted indices of the points to keep, always including both ends
+    """
+    n = len(x)
+    if n < 3:
+        return np.arange(n)
+    
+    points = np.column_stack([x, y]).astype(np.float64)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        
+        # Perpendicular distance of the inner points to the chord start-end
+        origin = points[start]
+        chord = points[end] - origin
+        inner = points[start + 1:end] - origin
+        length = np.hypot(chord[0], chord[1])
+        if length == 0:
+            distance = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distance = np.abs(chord[0] * inner[:, 1] - chord[1] * inner[:, 0]) / length
+        
+        farthest = int(np.argmax(distance))
+        if distance[farthest] > epsilon:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    
+    return np.flatnonzero(keep)
+
+
+def resample_indices(timestamps_ns: np.ndarray, interval_ms: float) -> np.ndarray:
+    """
+    Fixed-rate resampling: the first event in every interval_ms slot
+    
+    Keeps recorded events rather than interpolating, so coordinates and
+    timestamps stay real; high-rate input is brought down to at most one
+    event per slot.
+    """
+    n = len(timestamps_ns)
+    if n < 2 or interval_ms <= 0:
+        return np.arange(n)
+    
+    slot = (timestamps_ns - timestamps_ns[0]) // int(interval_ms * 1e6)
+    return np.flatnonzero(np.r_[True, slot[1:] != slot[:-1]])
+
+
+def reduce_trajectory(x: np.ndarray, y: np.ndarray, timestamps_ns: np.ndarray, method: str,
+                      segment_starts: Optional[np.ndarray] = None, epsilon: float = 1.0,
+                      interval_ms: float = 8.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Thin a trajectory with one of REDUCTIONS, block by block
+    
+    Args:
+        x, y: Cursor coordinates
+        timestamps_ns: Event times as int64 nanoseconds
+        method: "none", "rdp" or "resample"
+        segment_starts: Starts of independent blocks (from cap_segments), None for one block
+        epsilon: RDP tolerance in pixels
+        interval_ms: Resampling slot length
+    
+    Returns:
+        (indices of the kept events, start of every block within them)
+    """
+    if method not in REDUCTIONS:
+        raise ValueError(f"Unknown trajectory reduction '{method}', expected one of {REDUCTIONS}")
+    
+    n = len(timestamps_ns)
+    starts = np.zeros(1, dtype=np.int64) if segment_starts is None else np.asarray(segment_starts, dtype=np.int64)
+    if method == 'none':
+        return np.arange(n), starts
+    
+    kept, new_starts = [], []
+    count = 0
+    bounds = np.r_[starts, n]
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        if method == 'rdp':
+            indices = rdp_indices(x[begin:end], y[begin:end], epsilon)
+        else:
+            indices = resample_indices(timestamps_ns[begin:end], interval_ms)
+        kept.append(indices + begin)
+        new_starts.append(count)
+        count += len(indices)
+    
+    return np.concatenate(kept), np.asarray(new_starts, dtype=np.int64)
\ No newline at end of file
@@ -0,0 +1,376 @@
+import numpy as np
+from typing import Optional, Sequence
+from app.utils.running_stats import RunningStats
+
+# Column order expected by MouseVerifier.pkl
+MOUSE_FEATURE_COLUMNS = ('time_diff', 'distance', 'speed', 'direction', 'curvature')
+
+# Column order expected by MouseSessionVerifier.pkl
+MOUSE_SESSION_FEATURE_COLUMNS = (
+    'speed_q10', 'speed_q50', 'speed_q90', 'speed_std',
+    'curvature_q50', 'curvature_q90', 'curvature_std',
+    'pause_q50', 'pause_q90', 'pause_ratio',
+    'straightness', 'jerk_mean', 'jerk_std',
+)
+
+# Events per window MouseSessionVerifier.pkl was trained on (mouse_session.py)
+MOUSE_SESSION_WINDOW = 20
+
+# Gaps longer than this (milliseconds) count as pauses
+PAUSE_THRESHOLD_MS = 100.0
+
+# Per-field statistics of inter-key times, in KeyboardVerifier.pkl order
+KEYBOARD_STAT_COLUMNS = ('mean', 'std', 'min', 'max')
+
+# Column order expected by ScrollVerifier.pkl
+SCROLL_FEATURE_COLUMNS = ('total_scroll_distance', 'scroll_speed_variance', 'direction_changes', 'average_pause')
+
+# Events folded into the scroll accumulator at a time
+SCROLL_CHUNK_SIZE = 4096
+
+
+def extract_mouse_features(x: np.ndarray, y: np.ndarray, timestamps_ns: np.ndarray,
+                           segment_starts: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Build the (n, 5) mouse feature matrix straight from parsed columns
+    
+    Matches the pandas feature engineering of the mouse training script bit
+    for bit: the first row of every diff is 0, distance and direction have
+    NaNs replaced by 0, and speed keeps inf/NaN for zero time differences.
+    
+    Args:
+        x: Cursor x coordinates
+        y: Cursor y coordinates
+        timestamps_ns: Event times as int64 nanoseconds since the epoch
+        segment_starts: Rows starting an independent block (see
+            app.utils.downsampling.cap_segments); each gets first-row
+            features, as if its block were scored on its own
+    
+    Returns:
+        float64 matrix with columns in MOUSE_FEATURE_COLUMNS order
+    """
+    n = len(timestamps_ns)
+    features = np.zeros((n, len(MOUSE_FEATURE_COLUMNS)), dtype=np.float64, order='F')
+    time_diff, distance, speed, direction, curvature = features.T
+    
+    # Time difference in milliseconds (Timedelta.total_seconds() * 1000)
+    np.divide(np.diff(timestamps_ns), 1e9, out=time_diff[1:])
+    time_diff[1:] *= 1000
+    
+    # Euclidean distance between consecutive points
+    dx = np.diff(x).astype(np.float64, copy=False)
+    dy = np.diff(y).astype(np.float64, copy=False)
+    np.sqrt(dx ** 2 + dy ** 2, out=distance[1:])
+    np.copyto(distance, 0.0, where=np.isnan(distance))
+    if segment_starts is not None:
+        time_diff[segment_starts] = 0.0
+        distance[segment_starts] = 0.0
+    
+    # Speed keeps inf/NaN where time_diff is 0, exactly like the pandas code
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(distance, time_diff, out=speed)
+    
+    # Direction of movement and its change between consecutive points
+    np.arctan2(dy, dx, out=direction[1:])
+    np.copyto(direction, 0.0, where=np.isnan(direction))
+    if segment_starts is not None:
+        direction[segment_starts] = 0.0
+    np.subtract(direction[1:], direction[:-1], out=curvature[1:])
+    if segment_starts is not None:
+        curvature[segment_starts] = 0.0
+    
+    return features
+
+
+def extract_mouse_session_features(x: np.ndarray, y: np.ndarray, timestamps_ns: np.ndarray,
+                                   segment_starts: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Summarize a whole trajectory into one fixed-length feature vector
+    
+    Args:
+        x: Cursor x coordinates
+        y: Cursor y coordinates
+        timestamps_ns: Event times as int64 nanoseconds since the epoch
+        segment_starts: Rows starting an independent block. Steps across
+            blocks are left out, straightness sums the net displacement
+            of every block; jerk still runs over the blocks end to end.
+    
+    Returns:
+        float64 vector with entries in MOUSE_SESSION_FEATURE_COLUMNS order
+    """
+    summary = np.zeros(len(MOUSE_SESSION_FEATURE_COLUMNS), dtype=np.float64)
+    points = extract_mouse_features(x, y, timestamps_ns, segment_starts)
+    points = points[1:] if segment_starts is None else np.delete(points, segment_starts, axis=0)
+    if len(points) == 0:
+        return summary
+    
+    time_diff, distance, speed, _, curvature = points.T
+    
+    # Speed distribution over steps with a usable time difference
+    valid = time_diff > 0
+    step_speed = speed[valid]
+    if len(step_speed):
+        summary[0:3] = np.quantile(step_speed, [0.1, 0.5, 0.9])
+        summary[3] = step_speed.std()
+    
+    # Turning behaviour, wrapped into [0, pi]
+    turn = np.abs(np.angle(np.exp(1j * curvature)))
+    summary[4:6] = np.quantile(turn, [0.5, 0.9])
+    summary[6] = turn.std()
+    
+    # Pauses between consecutive events
+    summary[7:9] = np.quantile(time_diff, [0.5, 0.9])
+    summary[9] = np.mean(time_diff > PAUSE_THRESHOLD_MS)
+    
+    # Net displacement over travelled path length, summed over blocks
+    path_length = distance.sum()
+    if path_length > 0:
+        if segment_starts is None:
+            net = np.hypot(float(x[-1]) - float(x[0]), float(y[-1]) - float(y[0]))
+        else:
+            first = np.asarray(segment_starts)
+            last = np.r_[first[1:] - 1, len(x) - 1]
+            net = np.hypot(x[last].astype(np.float64) - x[first], y[last].astype(np.float64) - y[first]).sum()
+        summary[10] = net / path_length
+    
+    # Jerk: rate of change of acceleration
+    if len(step_speed) >= 3:
+        seconds = time_diff[valid] / 1000
+        acceleration = np.diff(step_speed) / seconds[1:]
+        jerk = np.abs(np.diff(acceleration) / seconds[2:])
+        summary[11] = jerk.mean()
+        summary[12] = jerk.std()
+    
+    return summary
+
+
+def extract_mouse_session_windows(x: np.ndarray, y: np.ndarray, timestamps_ns: np.ndarray,
+                                  segment_starts: Optional[np.ndarray] = None,
+                                  window: int = MOUSE_SESSION_WINDOW) -> np.ndarray:
+    """
+    Summarize consecutive fixed-size windows, one session row per window
+    
+    The session features depend on trajectory length, so uploads are scored
+    on windows of the size the model was trained on rather than as one row.
+    Windows don't overlap and stay inside a block; a final window aligned to
+    the block end covers the remainder. A block shorter than the window
+    gives one row covering it.
+    
+    Rows equal extract_mouse_session_features on each window. Full windows
+    whose steps all have a positive time difference are summarized together
+    from the block's point features; the others go through it one by one.
+    
+    Returns:
+        float64 matrix, one row per window in MOUSE_SESSION_FEATURE_COLUMNS order
+    """
+    block_starts = [0] if segment_starts is None else list(segment_starts)
+    block_ends = block_starts[1:] + [len(x)]
+    
+    starts, ends = [], []
+    for block_start, block_end in zip(block_starts, block_ends):
+        block_windows = list(range(block_start, max(block_end - window, block_start) + 1, window))
+        if block_windows[-1] + window < block_end:
+            block_windows.append(block_end - window)
+        starts.extend(block_windows)
+        ends.extend(min(start + window, block_end) for start in block_windows)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    
+    summaries = np.zeros((len(starts), len(MOUSE_SESSION_FEATURE_COLUMNS)), dtype=np.float64)
+    batched = np.zeros(len(starts), dtype=bool)
+    if window >= 4 and np.any(ends - starts == window):
+        # Steps of a window are the block's point features, except that
+        # curvature restarts: the window's first direction counts as 0
+        points = extract_mouse_features(x, y, timestamps_ns, segment_starts)
+        full = np.flatnonzero(ends - starts == window)
+        steps = starts[full, None] + np.arange(1, window)
+        time_diff, distance, speed, direction, curvature = np.moveaxis(points[steps], 2, 0)
+        curvature[:, 0] = direction[:, 0]
+        
+        # Windows with a zero or negative step drop it from some statistics
+        valid = (time_diff > 0).all(axis=1)
+        batched[full[valid]] = True
+        time_diff, distance, speed, curvature = time_diff[valid], distance[valid], speed[valid], curvature[valid]
+        rows = summaries[full[valid]]
+        
+        rows[:, 0:3] = np.quantile(speed, [0.1, 0.5, 0.9], axis=1).T
+        rows[:, 3] = speed.std(axis=1)
+        
+        turn = np.abs(np.angle(np.exp(1j * curvature)))
+        rows[:, 4:6] = np.quantile(turn, [0.5, 0.9], axis=1).T
+        rows[:, 6] = turn.std(axis=1)
+        
+        rows[:, 7:9] = np.quantile(time_diff, [0.5, 0.9], axis=1).T
+        rows[:, 9] = np.mean(time_diff > PAUSE_THRESHOLD_MS, axis=1)
+        
+        first, last = starts[full[valid]], ends[full[valid]] - 1
+        net = np.hypot(x[last].astype(np.float64) - x[first], y[last].astype(np.float64) - y[first])
+        path_length = distance.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rows[:, 10] = np.where(path_length > 0, net / path_length, 0.0)
+        
+        seconds = time_diff / 1000
+        acceleration = np.diff(speed, axis=1) / seconds[:, 1:]
+        jerk = np.abs(np.diff(acceleration, axis=1) / seconds[:, 2:])
+        rows[:, 11] = jerk.mean(axis=1)
+        rows[:, 12] = jerk.std(axis=1)
+        summaries[full[valid]] = rows
+    
+    for i in np.flatnonzero(~batched):
+        start, end = starts[i], ends[i]
+        summaries[i] = extract_mouse_session_features(x[start:end], y[start:end], timestamps_ns[start:end])
+    return summaries
+
+
+def extract_keyboard_features(field_names: Sequence[str], timestamps_ns: np.ndarray,
+                              field_order: Optional[Sequence[str]] = None) -> np.ndarray:
+    """
+    Per-field inter-key time statistics without pandas groupby
+    
+    Events are stable-sorted by field code, time differences are taken
+    within each field segment (0 for the first event of a field, like the
+    pandas fillna(0)), and mean/std/min/max come from reduceat over the
+    segments. std uses ddof=1, so a field with a single event has NaN std.
+    
+    Args:
+        field_names: Field of every event, in arrival order
+        timestamps_ns: Event times as int64 nanoseconds since the epoch
+        field_order: Declared fields for a fixed-width layout. Events of
+            other fields are ignored and absent fields are filled with 0.
+            None keeps the pandas layout: every field present, sorted.
+    
+    Returns:
+        float64 vector of KEYBOARD_STAT_COLUMNS per field
+    """
+    timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+    
+    # Field codes: sorted unique fields, or positions in the declared order.
+    # A dict lookup per event is much cheaper than sorting Python strings.
+    if field_order is None:
+        field_order = sorted(set(field_names))
+        lookup = {field: i for i, field in enumerate(field_order)}
+        codes = np.fromiter(map(lookup.__getitem__, field_names), dtype=np.intp, count=len(field_names))
+        n_fields = len(field_order)
+    else:
+        lookup = {field: i for i, field in enumerate(field_order)}
+        codes = np.fromiter((lookup.get(name, -1) for name in field_names), dtype=np.intp, count=len(field_names))
+        known = codes >= 0
+        codes, timestamps_ns = codes[known], timestamps_ns[known]
+        n_fields = len(field_order)
+    
+    features = np.zeros((n_fields, len(KEYBOARD_STAT_COLUMNS)), dtype=np.float64)
+    if len(codes) == 0:
+        return features.ravel()
+    
+    # Group events by field, keeping arrival order inside each field
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    timestamps_ns = timestamps_ns[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    counts = np.diff(np.r_[starts, len(codes)])
+    
+    # Seconds since the previous event of the same field
+    time_diff = np.empty(len(codes), dtype=np.float64)
+    time_diff[0] = 0.0
+    np.divide(np.diff(timestamps_ns), 1e9, out=time_diff[1:])
+    time_diff[starts] = 0.0
+    
+    # Segment reductions
+    mean = np.add.reduceat(time_diff, starts) / counts
+    squares = np.add.reduceat(np.square(time_diff - np.repeat(mean, counts)), starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(squares / (counts - 1))
+    std[counts == 1] = np.nan
+    
+    present = codes[starts]
+    features[present, 0] = mean
+    features[present, 1] = std
+    features[present, 2] = np.minimum.reduceat(time_diff, starts)
+    features[present, 3] = np.maximum.reduceat(time_diff, starts)
+    return features.ravel()
+
+
+class ScrollFeatures:
+    """
+    Single-pass accumulator for the scroll session features
+    
+    Chunks of events are folded into a handful of running sums (plus the
+    last position, direction and timestamp to bridge chunk boundaries), so
+    memory stays constant however long the session is. The result matches
+    the pandas features of scroll.py: NaN differences count as 0, the
+    speed variance uses ddof=1 and the average pause divides by the event
+    count, first event included.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.total_distance = 0.0
+        self.direction_changes = 0.0
+        self.pause_sum = 0.0
+        self._speed = RunningStats()
+        self._last_position = None
+        self._last_direction = None
+        self._last_timestamp = None
+    
+    def update(self, position: np.ndarray, speed: np.ndarray, timestamps_ms: np.ndarray):
+        """Fold one chunk of events into the running sums"""
+        if len(position) == 0:
+            return
+        position = np.asarray(position, dtype=np.float64)
+        timestamps_ms = np.asarray(timestamps_ms, dtype=np.float64)
+        
+        # Differences against the previous event, including the one before this chunk
+        if self._last_position is not None:
+            position_diff = np.diff(position, prepend=self._last_position)
+            pauses = np.diff(timestamps_ms, prepend=self._last_timestamp)
+        else:
+            position_diff = np.diff(position)
+            pauses = np.diff(timestamps_ms)
+        
+        # Scroll distance and pauses, NaN differences counted as 0
+        self.total_distance += np.nansum(np.abs(position_diff))
+        self.pause_sum += np.nansum(pauses)
+        
+        # Changes of scroll direction between consecutive movements
+        direction = np.sign(position_diff)
+        if self._last_direction is not None:
+            direction_diff = np.diff(direction, prepend=self._last_direction)
+        else:
+            direction_diff = np.diff(direction)
+        self.direction_changes += np.nansum(np.abs(direction_diff))
+        
+        self._speed.update(speed)
+        self.count += len(position)
+        self._last_position = position[-1]
+        self._last_timestamp = timestamps_ms[-1]
+        if len(direction):
+            self._last_direction = direction[-1]
+    
+    def values(self) -> np.ndarray:
+        """Feature vector in SCROLL_FEATURE_COLUMNS order"""
+        average_pause = self.pause_sum / self.count if self.count else np.nan
+        return np.array(
+            [self.total_distance, self._speed.variance(), self.direction_changes, average_pause],
+            dtype=np.float64
+        )
+
+
+def extract_scroll_features(position: np.ndarray, speed: np.ndarray, timestamps_ms: np.ndarray,
+                            chunk_size: int = SCROLL_CHUNK_SIZE) -> np.ndarray:
+    """
+    Summarize a scroll session into the four scroll.py features
+    
+    Args:
+        position: Scroll offsets
+        speed: Scroll speeds recorded by the client
+        timestamps_ms: Event times in epoch milliseconds
+        chunk_size: Events folded into the accumulator at a time
+    
+    Returns:
+        float64 vector with entries in SCROLL_FEATURE_COLUMNS order
+    """
+    features = ScrollFeatures()
+    for start in range(0, len(position), chunk_size):
+        stop = start + chunk_size
+        features.update(position[start:stop], speed[start:stop], timestamps_ms[start:stop])
+    return features.values()
\ No newline at end of file
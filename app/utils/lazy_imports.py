@@ -0,0 +1,21 @@
+import sys
+import importlib
+from typing import Any, Callable, Dict
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    Module-level __getattr__ (PEP 562) for a package's re-exports
+    
+    Each name maps to the submodule defining it, which is imported on first
+    access and the value cached in the package, so importing one submodule
+    doesn't import its siblings (and pandas, sklearn or firebase_admin).
+    """
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module), name)
+        setattr(sys.modules[package], name, value)
+        return value
+    
+    return __getattr__
\ No newline at end of file
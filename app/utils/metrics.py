@@ -0,0 +1,218 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from app.config import get_settings
+
+# Histogram upper bounds in seconds: 100 µs to 10 s
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Stage timing recorded in another process: (stage, seconds)
+Observation = Tuple[str, float]
+
+_NOOP = nullcontext()
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """
+    Bucketed latency histogram with per-thread shards
+    
+    Each thread writes to its own list of bucket counts, so observe() takes
+    no lock; the lock is only taken the first time a thread records and
+    when shards are summed for a scrape.
+    """
+    
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._shards: List[list] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+    
+    def _shard(self) -> list:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            # One count per bucket, one for +Inf, then the sum
+            shard = [0] * (len(self.buckets) + 1) + [0.0]
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+    
+    def observe(self, seconds: float):
+        shard = self._shard()
+        shard[bisect.bisect_left(self.buckets, seconds)] += 1
+        shard[-1] += seconds
+    
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Cumulative bucket counts (last one is +Inf) and the sum"""
+        with self._lock:
+            shards = [list(shard) for shard in self._shards]
+        
+        totals = [sum(column) for column in zip(*shards)] or [0] * (len(self.buckets) + 1) + [0.0]
+        cumulative, running = [], 0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1]
+
+
+class _Timer:
+    """Context manager that records its wall time into a stage histogram"""
+    
+    __slots__ = ('_metrics', '_stage', '_start')
+    
+    def __init__(self, metrics: 'Metrics', stage: str):
+        self._metrics = metrics
+        self._stage = stage
+    
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self._metrics.observe(self._stage, time.perf_counter() - self._start)
+        return False
+
+
+class Metrics:
+    """
+    Per-stage latency histograms and scrape-time gauges
+    
+    Stages are timed with timer() or the timed() decorator and recorded
+    into one histogram per stage. Gauges are callables evaluated only when
+    /metrics is scraped, so queue depths cost nothing on the request path.
+    render() produces the Prometheus text exposition format.
+    
+    Process-pool workers can't record into the parent's histograms; they
+    wrap a job in capture() and return the observations, which the parent
+    adds with record().
+    """
+    
+    def __init__(self, enabled: bool = True, namespace: str = 'smart_captcha',
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._stages: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+        self._lock = threading.Lock()
+        self._capture = threading.local()
+        
+        # In-flight HTTP requests, updated from the event loop by the middleware
+        self.requests_in_flight = 0
+        self.register_gauge('http_requests_in_flight', "HTTP requests being handled",
+                            lambda: self.requests_in_flight)
+    
+    def _histogram(self, stage: str) -> Histogram:
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(stage, Histogram(self.buckets))
+        return histogram
+    
+    def observe(self, stage: str, seconds: float):
+        """Record one stage duration"""
+        if not self.enabled:
+            return
+        captured = getattr(self._capture, 'observations', None)
+        if captured is not None:
+            captured.append((stage, seconds))
+            return
+        self._histogram(stage).observe(seconds)
+    
+    def record(self, observations: Iterable[Observation]):
+        """Record stage durations captured in a worker process"""
+        for stage, seconds in observations:
+            self.observe(stage, seconds)
+    
+    def timer(self, stage: str):
+        """Context manager timing the enclosed block as stage"""
+        if not self.enabled:
+            return _NOOP
+        return _Timer(self, stage)
+    
+    @contextmanager
+    def capture(self):
+        """Collect this thread's observations into a list instead of the histograms"""
+        observations: List[Observation] = []
+        previous = getattr(self._capture, 'observations', None)
+        self._capture.observations = observations
+        try:
+            yield observations
+        finally:
+            self._capture.observations = previous
+    
+    def register_gauge(self, name: str, help_text: str, func: Callable[[], float]):
+        """Expose func() as a gauge; re-registering a name replaces it"""
+        self._gauges[name] = (help_text, func)
+    
+    def unregister_gauge(self, name: str):
+        self._gauges.pop(name, None)
+    
+    def render(self) -> str:
+        """Prometheus text exposition (version 0.0.4)"""
+        name = f"{self.namespace}_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each request processing stage",
+            f"# TYPE {name} histogram",
+        ]
+        bounds = [_format_value(bound) for bound in self.buckets] + ['+Inf']
+        with self._lock:
+            stages = sorted(self._stages.items())
+        for stage, histogram in stages:
+            cumulative, total = histogram.snapshot()
+            for bound, count in zip(bounds, cumulative):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {_format_value(total)}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {cumulative[-1]}')
+        
+        for gauge, (help_text, func) in sorted(list(self._gauges.items())):
+            try:
+                value = func()
+            except Exception as e:
+                print(f"Error reading gauge {gauge}: {e}")
+                continue
+            lines.append(f"# HELP {self.namespace}_{gauge} {help_text}")
+            lines.append(f"# TYPE {self.namespace}_{gauge} gauge")
+            lines.append(f"{self.namespace}_{gauge} {_format_value(value)}")
+        
+        return '\n'.join(lines) + '\n'
+
+
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    """Process-wide metrics registry"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics(enabled=get_settings().METRICS_ENABLED)
+    return _metrics
+
+
+def timed(stage: str) -> Callable:
+    """Decorator timing every call of a synchronous function as stage"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = get_metrics()
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
\ No newline at end of file
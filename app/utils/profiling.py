@@ -0,0 +1,328 @@
+import os
+import re
+import sys
+import hmac
+import json
+import time
+import hashlib
+import secrets
+import importlib
+import argparse
+import functools
+import threading
+import contextvars
+from types import CodeType
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from app.config import get_settings
+
+# Profile of the request being handled in the current context
+active_profile: contextvars.ContextVar[Optional['Profile']] = contextvars.ContextVar('active_profile', default=None)
+
+
+def _private_code(module: str, qualname: str) -> Optional[CodeType]:
+    """Code object of a CPython-internal function, or None where this Python lacks it"""
+    try:
+        target = importlib.import_module(module)
+        for name in qualname.split('.'):
+            target = getattr(target, name)
+        return target.__code__
+    except (ImportError, AttributeError):
+        return None
+
+
+# Frames where the sampler stops walking: every callback on the event loop runs
+# in Handle._run under its task's Context, and asyncio.to_thread work runs in
+# _WorkItem.run as functools.partial(context.run, func). Both are private; when
+# one is missing, stacks that reach no boundary are kept unattributed
+_LOOP_BOUNDARY = _private_code('asyncio.events', 'Handle._run')
+_THREAD_BOUNDARY = _private_code('concurrent.futures.thread', '_WorkItem.run')
+
+FORMATS = ('speedscope', 'collapsed')
+EXTENSIONS = {'speedscope': '.speedscope.json', 'collapsed': '.collapsed.txt'}
+
+# Sampled stack: root label, then frame names from outermost to innermost
+Stack = Tuple[str, ...]
+
+
+def sign_profile_request(secret: str, method: str, path: str, ttl: float = 600.0) -> str:
+    """X-Profile-Request header value asking for a profile of method + path, valid for ttl seconds"""
+    expires = int(time.time() + ttl)
+    digest = hmac.new(secret.encode(), f"{expires}:{method.upper()}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{digest}"
+
+
+def verify_profile_request(secret: str, method: str, path: str, header: str) -> bool:
+    """True if header is an unexpired signature for method + path"""
+    expires, _, digest = header.partition('.')
+    if not secret or not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), f"{expires}:{method.upper()}:{path}".encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, digest)
+
+
+def _context_of(frame) -> Optional[contextvars.Context]:
+    """Context a boundary frame runs its callback or job in"""
+    owner = frame.f_locals.get('self')
+    if frame.f_code is _LOOP_BOUNDARY:
+        return getattr(owner, '_context', None)
+    
+    fn = getattr(owner, 'fn', None)
+    if isinstance(fn, functools.partial) and isinstance(getattr(fn.func, '__self__', None), contextvars.Context):
+        return fn.func.__self__
+    return None
+
+
+class Profile:
+    """Samples collected for one request"""
+    
+    def __init__(self, method: str, path: str, interval: float):
+        self.id = secrets.token_hex(6)
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.started = time.time()
+        self.duration = 0.0
+        self.samples: Dict[Stack, float] = {}
+        self.sample_count = 0
+    
+    def add(self, stack: Stack, weight: float):
+        self.samples[stack] = self.samples.get(stack, 0.0) + weight
+        self.sample_count += 1
+    
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: 'root;outer;inner <microseconds>' per line"""
+        return ''.join(
+            f"{';'.join(stack)} {round(weight * 1e6)}\n"
+            for stack, weight in sorted(self.samples.items())
+        )
+    
+    def speedscope(self) -> dict:
+        """speedscope.app sampled profile, weights in milliseconds"""
+        frames: List[dict] = []
+        index: Dict[str, int] = {}
+        samples, weights = [], []
+        for stack, weight in self.samples.items():
+            for name in stack:
+                if name not in index:
+                    index[name] = len(frames)
+                    frames.append({'name': name})
+            samples.append([index[name] for name in stack])
+            weights.append(weight * 1000)
+        
+        title = f"{self.method} {self.path} ({self.id})"
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': title,
+            'exporter': 'smart-captcha',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': title,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+
+
+class SamplingProfiler:
+    """
+    Wall-clock stack sampler for individual requests
+    
+    A background thread wakes every interval while at least one profile is
+    active and reads every thread's stack with sys._current_frames(). Each
+    stack is charged to the profile found in the Context it runs in, so
+    the event loop only counts while it runs the request's own tasks, and
+    pool threads only while they run jobs the request started with
+    asyncio.to_thread (or InferenceExecutor, which propagates the Context
+    the same way). Event-loop attribution relies on the pure-Python asyncio
+    loop; under uvloop only the thread-pool work is sampled.
+    
+    Finding those frames relies on asyncio and concurrent.futures internals.
+    On a Python where one is missing, stacks that reach no known boundary
+    go to every active profile as "unattributed <thread>", whole.
+    """
+    
+    def __init__(self, interval_ms: float = 1.0, max_concurrent: int = 4):
+        self.interval = interval_ms / 1000
+        self.max_concurrent = max_concurrent
+        self._active: List[Profile] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._names: Dict[object, str] = {}
+    
+    def start(self, method: str, path: str) -> Optional[Profile]:
+        """Begin a profile, or None if max_concurrent are already running"""
+        with self._lock:
+            if len(self._active) >= self.max_concurrent:
+                return None
+            profile = Profile(method, path, self.interval)
+            self._active.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+        return profile
+    
+    def stop(self, profile: Profile):
+        """End a profile; the sampler no longer touches it afterwards"""
+        with self._lock:
+            if profile in self._active:
+                self._active.remove(profile)
+        profile.duration = time.time() - profile.started
+    
+    def _frame_name(self, code) -> str:
+        name = self._names.get(code)
+        if name is None:
+            filename = code.co_filename
+            marker = filename.rfind('site-packages' + os.sep)
+            if marker >= 0:
+                filename = filename[marker + len('site-packages') + 1:]
+            elif filename.startswith(os.getcwd()):
+                filename = os.path.relpath(filename)
+            name = f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{code.co_firstlineno})"
+            self._names[code] = name
+        return name
+    
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            weight, last = now - last, now
+            
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                active = set(self._active)
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    
+                    # Walk out to the loop callback or pool job that owns this stack
+                    codes = []
+                    while frame is not None and frame.f_code is not _LOOP_BOUNDARY and frame.f_code is not _THREAD_BOUNDARY:
+                        codes.append(frame.f_code)
+                        frame = frame.f_back
+                    if not codes:
+                        continue
+                    if frame is None:
+                        # No boundary to read a Context from: keep the stack unattributed
+                        if _LOOP_BOUNDARY is None or _THREAD_BOUNDARY is None:
+                            stack = (f"unattributed {thread_names.get(ident, ident)}",
+                                     *(self._frame_name(code) for code in reversed(codes)))
+                            for profile in active:
+                                profile.add(stack, weight)
+                        continue
+                    
+                    context = _context_of(frame)
+                    profile = context.get(active_profile) if context is not None else None
+                    if profile not in active:
+                        continue
+                    
+                    root = 'event loop' if frame.f_code is _LOOP_BOUNDARY else f"thread {thread_names.get(ident, ident)}"
+                    profile.add((root, *(self._frame_name(code) for code in reversed(codes))), weight)
+
+
+class ProfileStore:
+    """Profiles on disk, keeping only the newest max_files"""
+    
+    # <UTC time>-<profile id>-<method>-<path slug>.<extension>
+    _NAME = re.compile(r'^(\d{8}T\d{6}Z)-([0-9a-f]{12})-([A-Z]+)-([\w.-]*?)(\.speedscope\.json|\.collapsed\.txt)$')
+    
+    def __init__(self, directory: str, max_files: int = 200, fmt: str = 'speedscope'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown profile format '{fmt}', expected one of {FORMATS}")
+        self.directory = directory
+        self.max_files = max_files
+        self.format = fmt
+    
+    def save(self, profile: Profile) -> Optional[str]:
+        """Write a profile and drop the oldest files over the limit"""
+        if not profile.samples:
+            return None
+        
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.fromtimestamp(profile.started, timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        slug = re.sub(r'[^\w.-]+', '_', profile.path.strip('/')) or 'root'
+        name = f"{stamp}-{profile.id}-{profile.method}-{slug}{EXTENSIONS[self.format]}"
+        path = os.path.join(self.directory, name)
+        
+        # Write then rename so a listing never sees a partial file
+        content = json.dumps(profile.speedscope()) if self.format == 'speedscope' else profile.collapsed()
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(path + '.tmp', path)
+        
+        self._rotate()
+        return name
+    
+    def _rotate(self):
+        names = sorted(entry['name'] for entry in self.list())
+        for name in names[:max(len(names) - self.max_files, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+    
+    def list(self) -> List[dict]:
+        """Stored profiles, newest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        
+        profiles = []
+        for name in names:
+            match = self._NAME.match(name)
+            if match is None:
+                continue
+            stamp, profile_id, method, endpoint, _ = match.groups()
+            profiles.append({
+                'name': name,
+                'id': profile_id,
+                'method': method,
+                'endpoint': endpoint,
+                'created': datetime.strptime(stamp, '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc).isoformat(),
+                'size': os.path.getsize(os.path.join(self.directory, name)),
+            })
+        return sorted(profiles, key=lambda entry: entry['name'], reverse=True)
+    
+    def path_of(self, name: str) -> Optional[str]:
+        """Absolute path of a stored profile, None for anything else"""
+        if self._NAME.match(name) is None:
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+@functools.lru_cache()
+def get_profiler() -> SamplingProfiler:
+    settings = get_settings()
+    return SamplingProfiler(settings.PROFILING_INTERVAL_MS, settings.PROFILING_MAX_CONCURRENT)
+
+
+@functools.lru_cache()
+def get_profile_store() -> ProfileStore:
+    settings = get_settings()
+    return ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES, settings.PROFILING_FORMAT)
+
+
+if __name__ == "__main__":
+    # python -m app.utils.profiling POST /api/predict_behavior [--ttl 600]
+    parser = argparse.ArgumentParser(description="Print an X-Profile-Request header signed with PROFILING_SECRET")
+    parser.add_argument('method')
+    parser.add_argument('path')
+    parser.add_argument('--ttl', type=float, default=600.0, help="Seconds the signature stays valid")
+    args = parser.parse_args()
+    
+    secret = get_settings().PROFILING_SECRET
+    if not secret:
+        sys.exit("PROFILING_SECRET is not set")
+    print(f"X-Profile-Request: {sign_profile_request(secret, args.method, args.path, args.ttl)}")
\ No newline at end of file
@@ -0,0 +1,75 @@
+import math
+import numpy as np
+from typing import Dict
+
+
+class RunningStats:
+    """
+    Welford running mean/variance with min and max
+    
+    Values can be added one at a time or a chunk at a time; chunks are
+    merged with Chan's parallel update, so the result does not depend on
+    how the stream was split. Non-finite values are skipped.
+    """
+    
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, value: float):
+        """Add a single value"""
+        if not math.isfinite(value):
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    def update(self, values: np.ndarray):
+        """Merge a chunk of values"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        n = len(values)
+        if n == 0:
+            return
+        
+        chunk_mean = values.mean()
+        chunk_m2 = np.square(values - chunk_mean).sum()
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+    
+    def variance(self, ddof: int = 1) -> float:
+        """Variance, NaN when there are not enough values"""
+        if self.count - ddof <= 0:
+            return math.nan
+        return self.m2 / (self.count - ddof)
+    
+    def std(self, ddof: int = 1) -> float:
+        """Standard deviation, NaN when there are not enough values"""
+        return math.sqrt(self.variance(ddof))
+    
+    def to_dict(self) -> Dict[str, float]:
+        """Summary for JSON responses (None where undefined)"""
+        if self.count == 0:
+            return {'count': 0, 'mean': None, 'std': None, 'min': None, 'max': None}
+        std = self.std()
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std': None if math.isnan(std) else std,
+            'min': self.min,
+            'max': self.max,
+        }
\ No newline at end of file
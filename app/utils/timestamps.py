@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Optional, Sequence, Union
+
+# Layout of the browser's Date.toISOString(): YYYY-MM-DDTHH:MM:SS.sssZ
+ISO_LENGTH = 24
+_SEPARATOR_POSITIONS = np.array([4, 7, 10, 13, 16, 19, 23])
+_SEPARATORS = np.frombuffer(b'--T::.Z', dtype=np.uint8)
+_DIGIT_POSITIONS = np.setdiff1d(np.arange(ISO_LENGTH), _SEPARATOR_POSITIONS)
+
+# Place values turning the 17 digits into year, month, day, hour, minute, second, millisecond
+_FIELD_WEIGHTS = np.zeros((len(_DIGIT_POSITIONS), 7), dtype=np.int64)
+for _field, (_first, _width) in enumerate([(0, 4), (4, 2), (6, 2), (8, 2), (10, 2), (12, 2), (14, 3)]):
+    _FIELD_WEIGHTS[_first:_first + _width, _field] = 10 ** np.arange(_width - 1, -1, -1)
+
+UNITS = {'ms': 1, 'ns': 1_000_000}
+
+TimestampColumn = Union[pd.Series, np.ndarray, Sequence[Any]]
+
+
+def _invalid() -> ValueError:
+    return ValueError("Invalid timestamps")
+
+
+def _fixed_iso_ms(values: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Epoch milliseconds of YYYY-MM-DDTHH:MM:SS.sssZ strings, None for any other layout
+    
+    The strings are joined into one ASCII buffer viewed as an (n, 24) byte
+    matrix; separators are checked column-wise and the digits become date
+    fields with one matrix product. Calendar arithmetic uses datetime64.
+    """
+    n = len(values)
+    try:
+        lengths = np.fromiter(map(len, values), dtype=np.int64, count=n)
+        if (lengths != ISO_LENGTH).any():
+            return None
+        raw = ''.join(values).encode('ascii')
+    except (TypeError, UnicodeEncodeError):
+        return None
+    
+    chars = np.frombuffer(raw, dtype=np.uint8).reshape(n, ISO_LENGTH)
+    if not (chars[:, _SEPARATOR_POSITIONS] == _SEPARATORS).all():
+        return None
+    digits = chars[:, _DIGIT_POSITIONS].astype(np.int64) - ord('0')
+    if ((digits < 0) | (digits > 9)).any():
+        return None
+    
+    year, month, day, hour, minute, second, millisecond = (digits @ _FIELD_WEIGHTS).T
+    if ((month < 1) | (month > 12) | (day < 1) | (hour > 23) | (minute > 59) | (second > 59)).any():
+        raise _invalid()
+    
+    # Days since the epoch at the start of the month, and the month's length
+    months = (year - 1970) * 12 + month - 1
+    month_start = months.astype('M8[M]').astype('M8[D]').astype(np.int64)
+    month_end = (months + 1).astype('M8[M]').astype('M8[D]').astype(np.int64)
+    if (day > month_end - month_start).any():
+        raise _invalid()
+    
+    days = month_start + day - 1
+    return (((days * 24 + hour) * 60 + minute) * 60 + second) * 1000 + millisecond
+
+
+def decode_timestamps(values: TimestampColumn, unit: str = 'ms') -> np.ndarray:
+    """
+    Decode a timestamp column to int64 epoch milliseconds or nanoseconds
+    
+    The format is detected once per column rather than per value:
+    datetime64 columns are converted directly, numbers are epoch
+    milliseconds, strings in the fixed YYYY-MM-DDTHH:MM:SS.sssZ layout go
+    through the vectorized parser, and any other strings fall back to
+    pd.to_datetime.
+    
+    Args:
+        values: Column from a parsed upload, or a list from a streamed frame
+        unit: "ms" or "ns"
+    
+    Returns:
+        int64 array of epoch times in unit
+    
+    Raises:
+        ValueError("Invalid timestamps") if any value can't be decoded
+    """
+    if unit not in UNITS:
+        raise ValueError(f"Unknown timestamp unit '{unit}', expected one of {tuple(UNITS)}")
+    scale = UNITS[unit]
+    
+    if not isinstance(values, pd.Series):
+        # Streamed frames: all numbers are epoch milliseconds, anything else is parsed as text
+        if not isinstance(values, np.ndarray):
+            numeric = all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values)
+            values = np.asarray(values, dtype=np.float64 if numeric else object)
+        values = pd.Series(values, copy=False)
+    dtype = values.dtype
+    
+    # Already datetimes
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        if values.isna().any():
+            raise _invalid()
+        return values.dt.as_unit(unit).astype('int64').to_numpy()
+    
+    # Epoch milliseconds
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        if pd.api.types.is_integer_dtype(dtype) and not values.hasnans:
+            return values.to_numpy(dtype=np.int64) * scale
+        milliseconds = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        if not np.isfinite(milliseconds).all():
+            raise _invalid()
+        # Whole and fractional milliseconds apart, so nanoseconds stay exact
+        whole = np.floor(milliseconds)
+        if unit == 'ms':
+            return whole.astype(np.int64)
+        return whole.astype(np.int64) * scale + np.rint((milliseconds - whole) * scale).astype(np.int64)
+    
+    # ISO-8601 strings from the browser
+    milliseconds = _fixed_iso_ms(values.to_numpy(dtype=object))
+    if milliseconds is not None:
+        return milliseconds * scale
+    
+    # Any other layout
+    timestamps = pd.to_datetime(values, errors='coerce')
+    if timestamps.isna().any():
+        raise _invalid()
+    return timestamps.dt.as_unit(unit).astype('int64').to_numpy()
\ No newline at end of file
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+# File signature: a non-ASCII first byte so it can't be mistaken for CSV text
+TRAJECTORY_MAGIC = b'\x89TRJ'
+
+# Layout written by encode_trajectory; decoders reject other versions
+TRAJECTORY_VERSION = 1
+
+# A 64-bit value never needs more 7-bit groups than this
+MAX_VARINT_BYTES = 10
+
+
+def is_trajectory(data: bytes) -> bool:
+    """True if an upload uses the compact trajectory codec"""
+    return data[:len(TRAJECTORY_MAGIC)] == TRAJECTORY_MAGIC
+
+
+def zigzag_encode(values: np.ndarray) -> np.ndarray:
+    """Map signed integers to unsigned so small magnitudes stay small: 0, -1, 1, -2 -> 0, 1, 2, 3"""
+    values = np.asarray(values, dtype=np.int64)
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def zigzag_decode(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.uint64)
+    return (values >> np.uint64(1)).view(np.int64) ^ -(values & np.uint64(1)).view(np.int64)
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """LEB128: 7 bits per byte, low groups first, high bit set on all but the last byte"""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for group in range(1, MAX_VARINT_BYTES):
+        lengths += (values >> np.uint64(7 * group)) > 0
+    
+    offsets = np.r_[0, np.cumsum(lengths)[:-1]].astype(np.int64)
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for group in range(int(lengths.max(initial=0))):
+        present = lengths > group
+        byte = ((values[present] >> np.uint64(7 * group)) & np.uint64(0x7F)).astype(np.uint8)
+        byte[lengths[present] > group + 1] |= 0x80
+        out[offsets[present] + group] = byte
+    return out.tobytes()
+
+
+def decode_varints(buffer: np.ndarray) -> np.ndarray:
+    """
+    Decode a run of LEB128 varints without a Python loop
+    
+    Every byte without the continuation bit ends a value; each byte's
+    7 bits are shifted by its position within the value and OR-reduced
+    per value with bitwise_or.reduceat.
+    """
+    if len(buffer) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    if buffer[-1] & 0x80:
+        raise ValueError("Truncated varint at end of trajectory")
+    
+    ends = np.flatnonzero((buffer & 0x80) == 0)
+    starts = np.r_[0, ends[:-1] + 1]
+    lengths = ends - starts + 1
+    if lengths.max() > MAX_VARINT_BYTES:
+        raise ValueError("Varint longer than 10 bytes in trajectory")
+    
+    position = np.arange(len(buffer)) - np.repeat(starts, lengths)
+    groups = (buffer & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+    return np.bitwise_or.reduceat(groups, starts)
+
+
+def encode_trajectory(timestamps_ms: np.ndarray, x: np.ndarray, y: np.ndarray) -> bytes:
+    """
+    Reference encoder for the compact mouse trajectory codec
+    
+    Layout (version 1): TRAJECTORY_MAGIC, one version byte, then varints:
+    the event count, then one (timestamp, x, y) triple per event, zigzag
+    encoded. The first triple is absolute (epoch milliseconds and pixels),
+    every later one is the difference to the event before, so a typical
+    event takes 3 bytes instead of about 45 as CSV.
+    """
+    events = np.column_stack([
+        np.asarray(timestamps_ms, dtype=np.int64),
+        np.rint(np.asarray(x, dtype=np.float64)).astype(np.int64),
+        np.rint(np.asarray(y, dtype=np.float64)).astype(np.int64),
+    ])
+    deltas = np.diff(events, axis=0, prepend=np.zeros((1, 3), dtype=np.int64))
+    header = TRAJECTORY_MAGIC + bytes([TRAJECTORY_VERSION])
+    return header + encode_varints(np.r_[np.uint64(len(events)), zigzag_encode(deltas.ravel())])
+
+
+def decode_trajectory(data: bytes) -> pd.DataFrame:
+    """
+    Trajectory upload as a DataFrame shaped like the parsed mouse CSV
+    
+    Returns timestamp (datetime64[ms]), x and y columns; the deltas are
+    undone with one cumsum over the (events, 3) matrix.
+    """
+    if not is_trajectory(data) or len(data) <= len(TRAJECTORY_MAGIC):
+        raise ValueError("Not a trajectory upload")
+    version = data[len(TRAJECTORY_MAGIC)]
+    if version != TRAJECTORY_VERSION:
+        raise ValueError(f"Unsupported trajectory codec version {version}")
+    
+    values = decode_varints(np.frombuffer(data, dtype=np.uint8, offset=len(TRAJECTORY_MAGIC) + 1))
+    if len(values) == 0:
+        raise ValueError("Trajectory has no event count")
+    count = int(values[0])
+    if len(values) - 1 != 3 * count:
+        raise ValueError(f"Trajectory holds {len(values) - 1} values, expected 3 per event for {count} events")
+    
+    events = np.cumsum(zigzag_decode(values[1:]).reshape(count, 3), axis=0)
+    return pd.DataFrame({
+        'timestamp': np.ascontiguousarray(events[:, 0]).view('M8[ms]'),
+        'x': events[:, 1],
+        'y': events[:, 2],
+    }, copy=False)
\ No newline at end of file
@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict, deque
+from typing import Hashable, Optional
+
+
+class SlidingWindowCounter:
+    """
+    Per-key event counter over a sliding time window
+    
+    Each key keeps a short deque of (bucket, count) pairs plus a running
+    total, so recording an event and reading the window count are O(1)
+    amortized. Keys idle for longer than the window are evicted, and the
+    number of tracked keys is capped (least recently active go first).
+    Not thread-safe: intended for use from the event loop.
+    """
+    
+    def __init__(self, window_ms: int = 30000, bucket_ms: int = 1000, max_keys: int = 100000):
+        self.window_ms = window_ms
+        self.bucket_ms = bucket_ms
+        self.max_keys = max_keys
+        self._keys: "OrderedDict[Hashable, list]" = OrderedDict()
+        self.evictions = 0
+    
+    def record(self, key: Hashable, event_ms: Optional[int] = None, now_ms: Optional[int] = None) -> int:
+        """
+        Count one event and return the number of events in the window
+        
+        Events stamped before the window (relative to now_ms) are not
+        counted; everything else is bucketed at arrival time, so the window
+        edge is accurate to one bucket.
+        """
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        self._evict_idle(now_ms)
+        
+        state = self._keys.get(key)
+        if state is None:
+            state = [deque(), 0]
+            self._keys[key] = state
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._keys.move_to_end(key)
+        
+        buckets = self._expire(state, now_ms)
+        if event_ms is not None and event_ms < now_ms - self.window_ms:
+            return state[1]
+        
+        bucket = now_ms // self.bucket_ms
+        if buckets and buckets[-1][0] == bucket:
+            buckets[-1][1] += 1
+        else:
+            buckets.append([bucket, 1])
+        state[1] += 1
+        return state[1]
+    
+    def count(self, key: Hashable, now_ms: Optional[int] = None) -> int:
+        """Events for key inside the window ending at now_ms"""
+        state = self._keys.get(key)
+        if state is None:
+            return 0
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        self._expire(state, now_ms)
+        return state[1]
+    
+    def reset(self, key: Hashable):
+        """Forget a key"""
+        self._keys.pop(key, None)
+    
+    def _expire(self, state: list, now_ms: int) -> deque:
+        """Drop buckets that slid out of the window"""
+        buckets = state[0]
+        oldest = (now_ms - self.window_ms) // self.bucket_ms
+        while buckets and buckets[0][0] < oldest:
+            state[1] -= buckets.popleft()[1]
+        return buckets
+    
+    def _evict_idle(self, now_ms: int):
+        """Evict least recently active keys whose window is empty"""
+        oldest = (now_ms - self.window_ms) // self.bucket_ms
+        while self._keys:
+            key, (buckets, _) = next(iter(self._keys.items()))
+            if buckets and buckets[-1][0] >= oldest:
+                break
+            del self._keys[key]
+            self.evictions += 1
+    
+    def __len__(self) -> int:
+        return len(self._keys)
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+Parity check and latency benchmark for CompiledForest
+
+Compiles each pickled verifier, checks that predict/predict_proba match
+sklearn exactly (including NaN inputs), then times one predict call for
+1, 100 and 10k rows on both evaluators.
+
+Usage:
+    python -m benchmarks.bench_compiled_forest
+"""
+import time
+import warnings
+import joblib
+import numpy as np
+
+from app.utils.compiled_forest import CompiledForest
+
+warnings.filterwarnings('ignore')
+
+MODEL_PATHS = [
+    "artifacts/serialized/models/MouseVerifier.pkl",
+    "artifacts/serialized/models/KeyboardVerifier.pkl",
+    "artifacts/serialized/models/MouseSessionVerifier.pkl",
+    "artifacts/serialized/models/ScrollVerifier.pkl",
+]
+SIZES = [1, 100, 10_000]
+
+
+def sample_inputs(model, n: int, seed: int = 0) -> np.ndarray:
+    """Rows drawn around the split thresholds the model actually uses"""
+    rng = np.random.default_rng(seed)
+    thresholds = np.concatenate([e.tree_.threshold[e.tree_.children_left != -1] for e in model.estimators_])
+    X = rng.choice(thresholds, size=(n, model.n_features_in_))
+    X += rng.normal(scale=np.abs(X).mean() * 0.01 + 1e-6, size=X.shape)
+    return X
+
+
+def check_parity(model, compiled: CompiledForest, path: str):
+    """Fail unless probabilities and labels are identical"""
+    X = sample_inputs(model, 5000)
+    X[::97, 0] = np.nan
+    if not np.array_equal(model.predict_proba(X), compiled.predict_proba(X)):
+        raise AssertionError(f"{path}: predict_proba differs")
+    if not np.array_equal(model.predict(X), compiled.predict(X)):
+        raise AssertionError(f"{path}: predict differs")
+
+
+def time_call(func, X: np.ndarray, repeat: int) -> float:
+    """Median wall time in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(X)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1000
+
+
+def main():
+    for path in MODEL_PATHS:
+        model = joblib.load(path)
+        compiled = CompiledForest.from_sklearn(model)
+        check_parity(model, compiled, path)
+        print(f"{path}: parity OK")
+
+        print(f"{'rows':>8} {'sklearn ms':>12} {'compiled ms':>12} {'speedup':>8}")
+        for n in SIZES:
+            X = sample_inputs(model, n, seed=n)
+            repeat = 50 if n < 10_000 else 5
+            sklearn_ms = time_call(model.predict, X, repeat)
+            compiled_ms = time_call(compiled.predict, X, repeat)
+            print(f"{n:>8} {sklearn_ms:>12.3f} {compiled_ms:>12.3f} {sklearn_ms / compiled_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Latency and memory benchmark for every scoring hot path
+
+For seeded human- and bot-like mouse, keystroke and scroll streams from
+benchmarks.generators, times each stage of the services separately:
+
+    parse     parse_upload of the uploaded bytes, with the service's event
+              cap applied while parsing as on a request
+    features  service.extract_features
+    predict   model_predict on the extracted features, as the services call it
+    analyze   BehaviorDetectionService.analyze_behavior end to end, with
+              all three uploads of the given size
+
+plus BrowserDetectionService.detect_automation per payload. Sizes run
+from 10 to 1e6 events. Each row reports p50/p99/mean/min latency and
+peak traced memory, and the run is saved as JSON under
+benchmarks/results/ with the git revision, library versions and
+settings, so runs can be compared with --compare.
+
+The blacklist lookup in "analyze" goes to a throwaway SQLite database
+unless STORAGE_BACKEND is set explicitly. "analyze" sends the same bytes
+on every iteration, so the verdict cache is turned off unless
+VERDICT_CACHE_ENABLED is set explicitly; otherwise it would time cache hits.
+
+Usage:
+    python -m benchmarks.bench_hot_paths
+    python -m benchmarks.bench_hot_paths --sizes 10 1000 --signals mouse analyze
+    python -m benchmarks.bench_hot_paths --compare benchmarks/results/A.json benchmarks/results/B.json
+"""
+import os
+import sys
+import asyncio
+import argparse
+import tempfile
+import warnings
+import itertools
+import contextlib
+
+from benchmarks.generators import KINDS, browser_infos, key_events, mouse_events, scroll_events, to_csv_bytes
+from benchmarks.harness import load_results, measure, repeat_for, save_results, environment
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+SIGNALS = ['mouse', 'keyboard', 'scroll', 'browser', 'analyze']
+GENERATORS = {'mouse': mouse_events, 'keyboard': key_events, 'scroll': scroll_events}
+SETTINGS_REPORTED = [
+    'MOUSE_MODEL_MODE', 'MODEL_BACKEND', 'KEYBOARD_FIELD_ORDER', 'INFERENCE_EXECUTOR',
+    'INFERENCE_WORKERS', 'INFERENCE_BATCHING_ENABLED', 'SHORT_CIRCUIT_ENABLED', 'VERDICT_CACHE_ENABLED',
+    'STORAGE_BACKEND',
+]
+
+warnings.filterwarnings('ignore')
+
+
+def bench_signal(signal: str, service, kind: str, n: int):
+    """parse / features / predict rows for one generated upload"""
+    from app.services.inference_executor import parse_upload
+    from app.utils.compiled_forest import model_predict
+
+    data = to_csv_bytes(GENERATORS[signal](n, kind, seed=n))
+    max_rows = getattr(service, 'max_events', None)
+    frame = parse_upload(data, max_rows)
+    features = service.extract_features(frame)
+    repeat = repeat_for(n)
+    warmup = 1 if n <= 100_000 else 0
+
+    stages = {
+        'parse': lambda: parse_upload(data, max_rows),
+        'features': lambda: service.extract_features(frame),
+        'predict': lambda: model_predict(service.model, features),
+    }
+    for stage, func in stages.items():
+        yield stage, measure(func, repeat, warmup)
+
+
+def bench_analyze(behavior_service, loop, kind: str, n: int):
+    """analyze_behavior end to end on three uploads of n events each"""
+    mouse_data = to_csv_bytes(mouse_events(n, kind, seed=n))
+    key_data = to_csv_bytes(key_events(n, kind, seed=n))
+    scroll_data = to_csv_bytes(scroll_events(n, kind, seed=n))
+    browser_info = browser_infos(1, kind, seed=n)[0]
+
+    def run():
+        return loop.run_until_complete(behavior_service.analyze_behavior(
+            mouse_data, key_data, browser_info, f'bench-{kind}', scroll_data
+        ))
+
+    # The service prints every verdict; keep that out of the table
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return measure(run, repeat_for(n), 1 if n <= 100_000 else 0)
+
+
+def bench_browser(browser_service, kind: str):
+    """detect_automation per call over a repeating payload population"""
+    payloads = itertools.cycle(browser_infos(1000, kind, seed=0))
+    return measure(lambda: browser_service.detect_automation(next(payloads)), 10_000)
+
+
+def print_row(row: dict):
+    events = '-' if row['events'] is None else row['events']
+    print(f"{row['signal']:>9} {row['kind']:>6} {row['stage']:>9} {events:>9} "
+          f"{row['p50_ms']:>10.3f} {row['p99_ms']:>10.3f} {row['peak_mib']:>9.2f}", flush=True)
+
+
+def run(args) -> list:
+    # Keep the end-to-end runs off the network unless a backend was chosen
+    if 'STORAGE_BACKEND' not in os.environ:
+        os.environ['STORAGE_BACKEND'] = 'sqlite'
+        os.environ['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    # Repeated uploads would be answered from the verdict cache
+    os.environ.setdefault('VERDICT_CACHE_ENABLED', 'false')
+
+    from app.config import get_settings
+    from app.services.behavior_detection_service import BehaviorDetectionService
+
+    settings = get_settings()
+    behavior_service = BehaviorDetectionService()
+    services = {
+        'mouse': behavior_service.mouse_service,
+        'keyboard': behavior_service.keyboard_service,
+        'scroll': behavior_service.scroll_service,
+    }
+    loop = asyncio.new_event_loop()
+
+    print(f"{'signal':>9} {'kind':>6} {'stage':>9} {'events':>9} {'p50 ms':>10} {'p99 ms':>10} {'peak MiB':>9}")
+    results = []
+    try:
+        for signal in args.signals:
+            for kind in args.kinds:
+                if signal == 'browser':
+                    rows = [dict(stage='detect', events=None, **bench_browser(behavior_service.browser_service, kind))]
+                elif signal == 'analyze':
+                    rows = (dict(stage='analyze', events=n, **bench_analyze(behavior_service, loop, kind, n))
+                            for n in args.sizes)
+                else:
+                    rows = (dict(stage=stage, events=n, **stats)
+                            for n in args.sizes
+                            for stage, stats in bench_signal(signal, services[signal], kind, n))
+                for row in rows:
+                    row = {'signal': signal, 'kind': kind, **row}
+                    print_row(row)
+                    results.append(row)
+    finally:
+        loop.run_until_complete(behavior_service.repository.close())
+        loop.close()
+        behavior_service.close()
+
+    meta = environment({name: getattr(settings, name) for name in SETTINGS_REPORTED})
+    if not args.no_save:
+        print(f"Saved {save_results('hot_paths', meta, results, args.output)}")
+    return results
+
+
+def compare(old_path: str, new_path: str):
+    """p50/p99 ratio (new / old) for every row present in both runs"""
+    def keyed(path):
+        return {(r['signal'], r['kind'], r['stage'], r['events']): r for r in load_results(path)['results']}
+
+    old, new = keyed(old_path), keyed(new_path)
+    print(f"{'signal':>9} {'kind':>6} {'stage':>9} {'events':>9} {'old p50':>10} {'new p50':>10} {'p50 x':>7} {'p99 x':>7}")
+    for key in sorted(old.keys() & new.keys(), key=lambda k: (k[0], k[1], k[2], k[3] or 0)):
+        before, after = old[key], new[key]
+        events = '-' if key[3] is None else key[3]
+        print(f"{key[0]:>9} {key[1]:>6} {key[2]:>9} {events:>9} {before['p50_ms']:>10.3f} {after['p50_ms']:>10.3f} "
+              f"{after['p50_ms'] / before['p50_ms']:>7.2f} {after['p99_ms'] / before['p99_ms']:>7.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--signals', nargs='+', choices=SIGNALS, default=SIGNALS)
+    parser.add_argument('--kinds', nargs='+', choices=KINDS, default=list(KINDS))
+    parser.add_argument('--output', help="JSON path (default: benchmarks/results/hot_paths-<utc time>.json)")
+    parser.add_argument('--no-save', action='store_true', help="Print only, don't write a JSON file")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="Compare two saved runs and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,107 @@
+"""
+Parity check and latency benchmark for the keystroke feature engine
+
+Compares app.utils.features.extract_keyboard_features against the pandas
+groupby feature engineering of the keypress training script, both in the
+legacy layout (every field, sorted) and in a declared fixed-width layout,
+then times feature extraction alone (timestamps pre-parsed) from 10 to
+1e5 events.
+
+Usage:
+    python -m benchmarks.bench_keyboard_features
+"""
+import glob
+import time
+import numpy as np
+import pandas as pd
+
+from app.utils.features import KEYBOARD_STAT_COLUMNS, extract_keyboard_features
+
+KEYPRESS_DATA_GLOB = "data/raw/Keypress Model/*.csv"
+SIZES = [10, 30, 100, 1_000, 10_000, 100_000]
+FIELDS = ['username', 'password', 'email', 'aadhaar']
+
+
+def parse_timestamps(data: pd.DataFrame) -> pd.DataFrame:
+    """Parse ISO timestamps once so only feature extraction is timed"""
+    data = data.copy()
+    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    return data
+
+
+def reference_features(data: pd.DataFrame) -> pd.DataFrame:
+    """Pandas feature engineering as written in keypress.py, one row per field"""
+    data = data.copy()
+    data['time_diff'] = data.groupby('fieldName')['timestamp'].diff().dt.total_seconds().fillna(0)
+    return data.groupby('fieldName')['time_diff'].agg(list(KEYBOARD_STAT_COLUMNS))
+
+
+def engine_features(data: pd.DataFrame, field_order=None) -> np.ndarray:
+    """Vectorized engine fed the same parsed columns as the service"""
+    return extract_keyboard_features(
+        data['fieldName'].to_numpy(),
+        data['timestamp'].array.as_unit('ns').asi8,
+        field_order
+    )
+
+
+def synthetic_keystrokes(n: int, seed: int = 0) -> pd.DataFrame:
+    """Interleaved typing into several fields with repeated timestamps"""
+    rng = np.random.default_rng(seed)
+    fields = rng.choice(FIELDS[:3], size=n)
+    gaps = rng.choice([0, 1, 45, 80, 130, 210, 900], size=n)
+    ms = 1_724_784_458_607 + np.cumsum(gaps)
+    timestamps = pd.to_datetime(ms, unit='ms', utc=True).strftime('%Y-%m-%dT%H:%M:%S.%f').str[:-3] + 'Z'
+    return pd.DataFrame({'eventType': 'input', 'timestamp': timestamps, 'fieldName': fields, 'fieldValue': ''})
+
+
+def assert_close(expected: np.ndarray, actual: np.ndarray, label: str):
+    """Fail unless shapes, NaN positions and values match to rounding error"""
+    if expected.shape != actual.shape:
+        raise AssertionError(f"{label}: shape {actual.shape} != {expected.shape}")
+    if not np.allclose(expected, actual, rtol=1e-12, atol=1e-15, equal_nan=True):
+        raise AssertionError(f"{label}: feature values differ")
+
+
+def check_parity(data: pd.DataFrame, label: str):
+    """Legacy and declared layouts against the pandas reference"""
+    reference = reference_features(data)
+    assert_close(reference.to_numpy().ravel(), engine_features(data), f"{label} (sorted layout)")
+    
+    # Declared order: known fields in that order, absent ones zero-filled, others dropped
+    field_order = ['password', 'username', 'email']
+    expected = reference.reindex(field_order).to_numpy(copy=True)
+    expected[~np.isin(field_order, reference.index)] = 0.0
+    assert_close(expected.ravel(), engine_features(data, field_order), f"{label} (declared layout)")
+
+
+def time_call(func, data: pd.DataFrame, repeat: int) -> float:
+    """Best-of-N wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    # Parity on the recorded datasets and on synthetic sessions
+    for path in sorted(glob.glob(KEYPRESS_DATA_GLOB)):
+        check_parity(parse_timestamps(pd.read_csv(path)), path)
+    for n in [1, 2, 3] + SIZES[:-1]:
+        check_parity(parse_timestamps(synthetic_keystrokes(n, seed=n)), f"synthetic n={n}")
+    print("Parity: OK")
+
+    # Latency
+    print(f"{'events':>10} {'pandas ms':>12} {'numpy ms':>12} {'speedup':>8}")
+    for n in SIZES:
+        data = parse_timestamps(synthetic_keystrokes(n))
+        repeat = 50 if n <= 10_000 else 5
+        pandas_ms = time_call(reference_features, data, repeat)
+        numpy_ms = time_call(engine_features, data, repeat)
+        print(f"{n:>10} {pandas_ms:>12.3f} {numpy_ms:>12.3f} {pandas_ms / numpy_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Parity check and latency benchmark for the mouse feature engine
+
+Compares app.utils.features.extract_mouse_features against the pandas
+feature engineering used by MouseDetectionService and the mouse training
+script, then times feature extraction alone (timestamps pre-parsed) from 10 to 1e6
+events.
+
+Usage:
+    python -m benchmarks.bench_mouse_features
+"""
+import glob
+import time
+import numpy as np
+import pandas as pd
+
+from app.utils.features import MOUSE_FEATURE_COLUMNS, extract_mouse_features
+
+MOUSE_DATA_GLOB = "data/raw/Mouse Movement Model/*.csv"
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def parse_timestamps(data: pd.DataFrame) -> pd.DataFrame:
+    """Parse ISO timestamps once so only feature extraction is timed"""
+    data = data.copy()
+    data['timestamp'] = pd.to_datetime(data['timestamp'], errors='coerce')
+    return data
+
+
+def reference_features(data: pd.DataFrame) -> pd.DataFrame:
+    """Pandas feature engineering as written in mouse_movement.py"""
+    data = data.copy()
+    data['time_diff'] = data['timestamp'].diff().dt.total_seconds().fillna(0) * 1000
+    data['distance'] = np.sqrt((data['x'].diff()**2) + (data['y'].diff()**2)).fillna(0)
+    data['speed'] = data['distance'] / data['time_diff'].replace(0, np.nan).fillna(0)
+    data['direction'] = np.arctan2(data['y'].diff(), data['x'].diff()).fillna(0)
+    data['curvature'] = data['direction'].diff().fillna(0)
+    return data[list(MOUSE_FEATURE_COLUMNS)]
+
+
+def engine_features(data: pd.DataFrame) -> np.ndarray:
+    """Vectorized engine fed the same parsed columns as the service"""
+    return extract_mouse_features(
+        data['x'].to_numpy(),
+        data['y'].to_numpy(),
+        data['timestamp'].dt.as_unit('ns').astype('int64').to_numpy()
+    )
+
+
+def synthetic_trajectory(n: int, seed: int = 0) -> pd.DataFrame:
+    """Random walk with repeated points and duplicate timestamps"""
+    rng = np.random.default_rng(seed)
+    steps = rng.integers(-20, 21, size=(n, 2))
+    steps[rng.random(n) < 0.05] = 0
+    xy = 500 + np.cumsum(steps, axis=0)
+    gaps = rng.choice([0, 1, 8, 16, 17, 33, 250], size=n)
+    ms = 1_724_739_332_087 + np.cumsum(gaps)
+    timestamps = pd.to_datetime(ms, unit='ms', utc=True).strftime('%Y-%m-%dT%H:%M:%S.%f').str[:-3] + 'Z'
+    return pd.DataFrame({'eventType': 'mousemove', 'timestamp': timestamps, 'x': xy[:, 0], 'y': xy[:, 1]})
+
+
+def assert_bitwise_equal(expected: np.ndarray, actual: np.ndarray, label: str):
+    """Fail unless both matrices hold identical float64 bit patterns (NaN aside)"""
+    if expected.shape != actual.shape:
+        raise AssertionError(f"{label}: shape {actual.shape} != {expected.shape}")
+    nan_expected = np.isnan(expected)
+    if not np.array_equal(nan_expected, np.isnan(actual)):
+        raise AssertionError(f"{label}: NaN positions differ")
+    expected_bits = np.where(nan_expected, 0, expected).view(np.uint64)
+    actual_bits = np.where(nan_expected, 0, actual).view(np.uint64)
+    if not np.array_equal(expected_bits, actual_bits):
+        raise AssertionError(f"{label}: feature values differ")
+
+
+def time_call(func, data: pd.DataFrame, repeat: int) -> float:
+    """Best-of-N wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    # Parity on the recorded datasets and on synthetic trajectories
+    for path in sorted(glob.glob(MOUSE_DATA_GLOB)):
+        data = parse_timestamps(pd.read_csv(path))
+        assert_bitwise_equal(reference_features(data).to_numpy(), engine_features(data), path)
+    for n in [0, 1, 2, 3] + SIZES[:-1]:
+        data = parse_timestamps(synthetic_trajectory(n, seed=n))
+        assert_bitwise_equal(reference_features(data).to_numpy(), engine_features(data), f"synthetic n={n}")
+    print("Parity: OK")
+
+    # Latency
+    print(f"{'events':>10} {'pandas ms':>12} {'numpy ms':>12} {'speedup':>8}")
+    for n in SIZES:
+        data = parse_timestamps(synthetic_trajectory(n))
+        repeat = 20 if n <= 10_000 else 3
+        pandas_ms = time_call(reference_features, data, repeat)
+        numpy_ms = time_call(engine_features, data, repeat)
+        print(f"{n:>10} {pandas_ms:>12.3f} {numpy_ms:>12.3f} {pandas_ms / numpy_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Cold-start time and memory per worker for each STARTUP_MODE
+
+Two reports, each from fresh processes (Linux only, memory comes from
+/proc/<pid>/smaps_rollup):
+
+    process  one interpreter per mode (eager, lazy), with and without the
+             startup warm-up: time and RSS after importing app.main, time
+             until /health/ready answers 200, then the latency of the
+             first and second /api/predict_behavior and RSS after them
+    workers  N workers started with `uvicorn --workers N` (each worker
+             spawns and loads its own models) against
+             `python -m app.prefork --workers N` (models loaded once and
+             shared copy-on-write): time until /health/ready answers,
+             until a first verdict comes back, and RSS, PSS and private
+             memory summed over the workers after every worker has
+             scored requests
+
+The app uses the SQLite backend in a temporary directory. PSS splits
+shared pages between the processes sharing them, so its sum is the
+memory the workers really cost; private memory is what each one adds.
+
+Usage:
+    python -m benchmarks.bench_startup [--workers 4] [--output results.json]
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Optional
+
+import httpx
+
+MODES = ('eager', 'lazy')
+MODEL_PATHS = {
+    'MOUSE_MODEL_PATH': "artifacts/serialized/models/MouseVerifier.pkl",
+    'KEYBOARD_MODEL_PATH': "artifacts/serialized/models/KeyboardVerifier.pkl",
+    'MOUSE_SESSION_MODEL_PATH': "artifacts/serialized/models/MouseSessionVerifier.pkl",
+    'SCROLL_MODEL_PATH': "artifacts/serialized/models/ScrollVerifier.pkl",
+}
+MEMORY_FIELDS = ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty')
+PORT = 8790
+
+
+def app_env(workdir: str, **extra: str) -> Dict[str, str]:
+    return {
+        **{name: path for name, path in MODEL_PATHS.items() if os.path.exists(path)},
+        **os.environ,
+        'STORAGE_BACKEND': 'sqlite',
+        'SQLITE_PATH': os.path.join(workdir, 'startup.db'),
+        **extra,
+    }
+
+
+def predict_request(seed: int = 0) -> Dict:
+    """Keyword arguments for one httpx /api/predict_behavior call, distinct per seed"""
+    # Imported here so the measured interpreter loads pandas only when app.main does
+    from benchmarks.generators import browser_infos, key_events, mouse_events, to_csv_bytes
+
+    return {
+        'files': {
+            'mouse_file': ('mouse.csv', to_csv_bytes(mouse_events(200, 'human', seed=seed))),
+            'key_file': ('key.csv', to_csv_bytes(key_events(30, 'human', seed=seed))),
+        },
+        'data': {'browser_info': json.dumps(browser_infos(1, seed=0)[0]), 'fingerprint': 'startup-bench'},
+    }
+
+
+def memory_mb(pid: int) -> Dict[str, float]:
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        values = dict(re.findall(r'^(\w+):\s+(\d+) kB', f.read(), re.M))
+    return {name: int(values.get(name, 0)) / 1024 for name in MEMORY_FIELDS}
+
+
+def descendants(pid: int) -> List[int]:
+    """Every process below pid"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                parent = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def child_process_report(timeout: float = 120.0):
+    """Runs inside the measured interpreter: prints one JSON line"""
+    started = time.perf_counter()
+    import app.main
+    imported = time.perf_counter() - started
+    after_import = memory_mb(os.getpid())
+    loaded = [name for name in ('pandas', 'sklearn', 'firebase_admin') if name in sys.modules]
+
+    from fastapi.testclient import TestClient
+    with TestClient(app.main.app) as client:
+        deadline = time.monotonic() + timeout
+        while client.get('/health/ready').status_code != 200:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Not ready after {timeout:.0f}s")
+            time.sleep(0.01)
+        ready = time.perf_counter() - started
+
+        latencies = []
+        for seed in range(2):
+            started = time.perf_counter()
+            response = client.post('/api/predict_behavior', **predict_request(seed))
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+        after_request = memory_mb(os.getpid())
+
+    print(json.dumps({
+        'import_s': imported, 'import_rss_mb': after_import['Rss'], 'heavy_modules': loaded, 'ready_s': ready,
+        'first_request_s': latencies[0], 'second_request_s': latencies[1], 'rss_mb': after_request['Rss'],
+    }))
+
+
+def process_report(mode: str, warmup: bool, workdir: str) -> Dict:
+    output = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-m', 'benchmarks.bench_startup', '--child'],
+        env=app_env(workdir, STARTUP_MODE=mode, WARMUP_ENABLED=str(warmup).lower()),
+        capture_output=True, text=True, check=True
+    ).stdout
+    return {'mode': mode, 'warmup': warmup, **json.loads(output.strip().splitlines()[-1])}
+
+
+def worker_report(launcher: str, workers: int, workdir: str, requests_per_worker: int = 4,
+                  timeout: float = 120.0) -> Dict:
+    url = f"http://127.0.0.1:{PORT}"
+    if launcher == 'prefork':
+        command = [sys.executable, '-W', 'ignore', '-m', 'app.prefork', '--workers', str(workers),
+                   '--port', str(PORT), '--log-level', 'warning']
+    else:
+        command = [sys.executable, '-W', 'ignore', '-m', 'uvicorn', 'app.main:app', '--workers', str(workers),
+                   '--port', str(PORT), '--log-level', 'warning']
+
+    started = time.perf_counter()
+    process = subprocess.Popen(command, env=app_env(workdir), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        ready_s: Optional[float] = None
+        first_verdict_s: Optional[float] = None
+        deadline = time.monotonic() + timeout
+        while first_verdict_s is None and time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{launcher} exited with code {process.returncode}")
+            try:
+                if ready_s is None and httpx.get(f"{url}/health/ready", timeout=1.0).status_code == 200:
+                    ready_s = time.perf_counter() - started
+                if ready_s is not None:
+                    httpx.post(f"{url}/api/predict_behavior", timeout=30.0, **predict_request()).raise_for_status()
+                    first_verdict_s = time.perf_counter() - started
+                else:
+                    time.sleep(0.1)
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        if first_verdict_s is None:
+            raise RuntimeError(f"{launcher} not ready after {timeout:.0f}s")
+
+        # New connections spread over the workers, so each one has scored requests
+        for seed in range(1, workers * requests_per_worker + 1):
+            httpx.post(f"{url}/api/predict_behavior", timeout=30.0, **predict_request(seed)).raise_for_status()
+
+        processes = [process.pid] + descendants(process.pid)
+        memory = {name: 0.0 for name in MEMORY_FIELDS}
+        for pid in processes:
+            for name, value in memory_mb(pid).items():
+                memory[name] += value
+        return {
+            'launcher': launcher, 'workers': workers, 'processes': len(processes),
+            'ready_s': ready_s, 'first_verdict_s': first_verdict_s,
+            'rss_mb': memory['Rss'], 'pss_mb': memory['Pss'],
+            'private_mb': memory['Private_Clean'] + memory['Private_Dirty'],
+        }
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time and memory per worker")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--output', help="Also save the results as JSON to this path")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_process_report()
+        return
+
+    workdir = tempfile.mkdtemp(prefix='smart-captcha-startup-')
+    processes = [process_report(mode, warmup, workdir) for mode in MODES for warmup in (False, True)]
+    print(f"{'mode':>8} {'warm-up':>8} {'import s':>9} {'import RSS MB':>14} {'ready s':>8} {'1st request s':>14} "
+          f"{'2nd request s':>14} {'RSS MB':>7}  heavy modules after import")
+    for row in processes:
+        print(f"{row['mode']:>8} {'on' if row['warmup'] else 'off':>8} {row['import_s']:>9.2f} "
+              f"{row['import_rss_mb']:>14.0f} {row['ready_s']:>8.2f} {row['first_request_s']:>14.3f} "
+              f"{row['second_request_s']:>14.3f} {row['rss_mb']:>7.0f}  {', '.join(row['heavy_modules']) or '-'}")
+
+    workers = [worker_report(launcher, args.workers, workdir) for launcher in ('uvicorn', 'prefork')]
+    print(f"\n{'launcher':>8} {'workers':>8} {'processes':>10} {'ready s':>8} {'1st verdict s':>14} "
+          f"{'RSS MB':>7} {'PSS MB':>7} {'private MB':>11}")
+    for row in workers:
+        print(f"{row['launcher']:>8} {row['workers']:>8} {row['processes']:>10} {row['ready_s']:>8.2f} "
+              f"{row['first_verdict_s']:>14.2f} {row['rss_mb']:>7.0f} {row['pss_mb']:>7.0f} {row['private_mb']:>11.0f}")
+
+    if args.output:
+        from benchmarks.harness import environment, save_results
+        results = [{'report': 'process', **row} for row in processes] + [{'report': 'workers', **row} for row in workers]
+        save_results('startup', environment({'workers': args.workers}), results, args.output)
+
+
+if __name__ == "__main__":
+    main()
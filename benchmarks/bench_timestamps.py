@@ -0,0 +1,107 @@
+"""
+Parity check and latency benchmark for timestamp decoding
+
+Compares app.utils.timestamps.decode_timestamps against pd.to_datetime,
+which the detection services used before: on the timestamp column of
+every recorded CSV in data/raw, on generated ISO strings spanning
+1900-2100, and on malformed values, which both must reject. Then times
+both on ISO strings and on epoch milliseconds from 100 to 1e6 values,
+with pd.to_datetime given an explicit format as a second baseline.
+
+Usage:
+    python -m benchmarks.bench_timestamps [--sizes 100 10000 1000000]
+"""
+import glob
+import argparse
+import numpy as np
+import pandas as pd
+
+from benchmarks.generators import START_MS, iso_timestamps
+from benchmarks.harness import measure, repeat_for
+from app.utils.timestamps import decode_timestamps
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+RAW_DATA_GLOB = "data/raw/**/*.csv"
+ISO_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+# Values each decoder must reject
+MALFORMED = [
+    '2024-02-30T10:00:00.000Z',
+    '2023-02-29T10:00:00.000Z',
+    '2024-13-01T10:00:00.000Z',
+    '2024-08-27T24:00:00.000Z',
+    '2024-08-27T10:60:00.000Z',
+    'not a timestamp',
+    '',
+]
+
+
+def pandas_ns(values: pd.Series, **kwargs) -> np.ndarray:
+    """The services' previous conversion: pd.to_datetime, then int64 nanoseconds"""
+    timestamps = pd.to_datetime(values, errors='coerce', **kwargs)
+    if timestamps.isna().any():
+        raise ValueError("Invalid timestamps")
+    return timestamps.dt.as_unit('ns').astype('int64').to_numpy()
+
+
+def check_recorded():
+    checked = 0
+    for path in sorted(glob.glob(RAW_DATA_GLOB, recursive=True)):
+        data = pd.read_csv(path)
+        if 'timestamp' not in data.columns or pd.api.types.is_numeric_dtype(data['timestamp']):
+            continue
+        if not np.array_equal(decode_timestamps(data['timestamp'], unit='ns'), pandas_ns(data['timestamp'])):
+            raise AssertionError(f"{path}: decoded timestamps differ from pd.to_datetime")
+        checked += len(data)
+    print(f"recorded CSVs: {checked} ISO timestamps match pd.to_datetime")
+
+
+def check_generated(n: int = 200_000):
+    rng = np.random.default_rng(0)
+    low, high = np.array(['1900-01-01', '2100-01-01'], dtype='M8[ms]').astype(np.int64)
+    values = pd.Series(iso_timestamps(rng.integers(low, high, n)).astype(object))
+    if not np.array_equal(decode_timestamps(values, unit='ns'), pandas_ns(values)):
+        raise AssertionError("decoded timestamps differ from pd.to_datetime on generated values")
+    print(f"generated: {n} ISO timestamps between 1900 and 2100 match pd.to_datetime")
+
+
+def check_malformed():
+    valid = list(iso_timestamps(np.array([START_MS])))
+    for value in MALFORMED:
+        for decoder in (decode_timestamps, pandas_ns):
+            try:
+                decoder(pd.Series(valid + [value], dtype=object))
+            except ValueError:
+                continue
+            raise AssertionError(f"{decoder.__name__} accepted {value!r}")
+    print(f"malformed: all {len(MALFORMED)} values rejected by both")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timestamp decoding parity and latency")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    args = parser.parse_args()
+
+    check_recorded()
+    check_generated()
+    check_malformed()
+
+    print(f"\n{'values':>8} {'input':>6} {'to_datetime ms':>15} {'with format ms':>15} {'decode ms':>10} {'speedup':>8}")
+    for n in args.sizes:
+        ms = START_MS + np.cumsum(np.random.default_rng(n).integers(1, 40, n))
+        inputs = {'iso': pd.Series(iso_timestamps(ms).astype(object)), 'epoch': pd.Series(ms)}
+        for name, values in inputs.items():
+            repeat = repeat_for(n)
+            if name == 'iso':
+                baseline = measure(lambda: pandas_ns(values), repeat)['p50_ms']
+                with_format = measure(lambda: pandas_ns(values, format=ISO_FORMAT), repeat)['p50_ms']
+            else:
+                baseline = measure(lambda: pandas_ns(values, unit='ms'), repeat)['p50_ms']
+                with_format = float('nan')
+            decoded = measure(lambda: decode_timestamps(values, unit='ns'), repeat)['p50_ms']
+            print(f"{n:>8} {name:>6} {baseline:>15.3f} {with_format:>15.3f} {decoded:>10.3f} "
+                  f"{baseline / decoded:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
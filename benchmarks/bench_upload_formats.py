@@ -0,0 +1,107 @@
+"""
+Size and decode cost of the upload encodings
+
+For each signal, the same seeded events are serialized as CSV, in the
+columnar .npy encoding (app.utils.columnar) and, for mouse, with the
+compact trajectory codec (app.utils.trajectory_codec). Each upload is then decoded
+into the arrays feature extraction starts from: the DataFrame of
+parse_upload() plus timestamps as int64 nanoseconds (epoch milliseconds
+for scroll), converted the way the detection services do it. The table
+reports bytes per event and decode time per 10k events. Before timing,
+the features from every encoding are checked against the CSV ones.
+A second table gives the upload size of the recorded mouse sets in
+data/raw/Mouse Movement Model under each encoding.
+
+Usage:
+    python -m benchmarks.bench_upload_formats [--sizes 1000 10000 100000]
+"""
+import os
+import glob
+import argparse
+import numpy as np
+import pandas as pd
+
+from benchmarks.generators import (
+    key_events, mouse_events, scroll_events, to_columnar_bytes, to_csv_bytes, to_trajectory_bytes
+)
+from benchmarks.harness import measure, repeat_for
+from app.services.inference_executor import parse_upload
+from app.utils.features import extract_keyboard_features, extract_mouse_features, extract_scroll_features
+from app.utils.timestamps import decode_timestamps
+
+SIZES = [1_000, 10_000, 100_000]
+GENERATORS = {'mouse': mouse_events, 'keyboard': key_events, 'scroll': scroll_events}
+MOUSE_DATA_GLOB = "data/raw/Mouse Movement Model/*.csv"
+
+
+def decode(signal: str, data: bytes) -> tuple:
+    """Upload bytes to the typed columns the feature engines take"""
+    df = parse_upload(data)
+    if signal == 'scroll':
+        return df, pd.to_numeric(df['timestamp']).to_numpy(dtype=np.float64)
+    return df, decode_timestamps(df['timestamp'], unit='ns')
+
+
+def features(signal: str, data: bytes) -> np.ndarray:
+    df, timestamps = decode(signal, data)
+    if signal == 'mouse':
+        return extract_mouse_features(df['x'].to_numpy(), df['y'].to_numpy(), timestamps)
+    if signal == 'keyboard':
+        return extract_keyboard_features(df['fieldName'].to_numpy(), timestamps)
+    return extract_scroll_features(df['position'].to_numpy(dtype=np.float64),
+                                   df['speed'].to_numpy(dtype=np.float64), timestamps)
+
+
+def uploads_for(signal: str, events: pd.DataFrame) -> dict:
+    uploads = {'csv': to_csv_bytes(events), 'columnar': to_columnar_bytes(events)}
+    if signal == 'mouse':
+        uploads['trajectory'] = to_trajectory_bytes(events)
+    return uploads
+
+
+def check_parity(signal: str, uploads: dict):
+    expected = features(signal, uploads['csv'])
+    for name, data in uploads.items():
+        # CSV prints floats with limited digits, so scroll only matches to rounding
+        if not np.allclose(expected, features(signal, data), rtol=1e-9, equal_nan=True):
+            raise AssertionError(f"{signal}: {name} features differ from CSV")
+
+
+def recorded_sizes():
+    print(f"\n{'recorded mouse set':>20} {'events':>7} {'csv':>8} {'columnar':>9} {'trajectory':>11} {'ratio':>6}")
+    for path in sorted(glob.glob(MOUSE_DATA_GLOB)):
+        with open(path, 'rb') as f:
+            csv = f.read()
+        events = pd.read_csv(path)
+        if not {'x', 'y', 'timestamp'} <= set(events.columns):
+            continue
+        columnar, trajectory = to_columnar_bytes(events), to_trajectory_bytes(events)
+        print(f"{os.path.basename(path):>20} {len(events):>7} {len(csv):>8} {len(columnar):>9} "
+              f"{len(trajectory):>11} {len(csv) / len(trajectory):>5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size and decode cost of the upload encodings")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--signals', nargs='+', choices=list(GENERATORS), default=list(GENERATORS))
+    args = parser.parse_args()
+
+    print(f"{'signal':>9} {'events':>8} {'format':>10} {'bytes/event':>12} {'ms/10k events':>14} {'speedup':>8}")
+    for signal in args.signals:
+        for n in args.sizes:
+            events = GENERATORS[signal](n, 'human', seed=n)
+            uploads = uploads_for(signal, events)
+            check_parity(signal, uploads)
+
+            baseline = None
+            for name, data in uploads.items():
+                stats = measure(lambda: decode(signal, data), repeat_for(n))
+                per_10k = stats['p50_ms'] * 10_000 / n
+                baseline = baseline or per_10k
+                print(f"{signal:>9} {n:>8} {name:>10} {len(data) / n:>12.1f} {per_10k:>14.2f} "
+                      f"{baseline / per_10k:>7.1f}x")
+    recorded_sizes()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+In-process stand-in for the Firebase Realtime Database REST API
+
+Serves the subset of the REST surface that firebase_admin.db uses for
+FirebaseRepository: GET (with orderBy/startAt/endAt/equalTo/limitTo*
+queries and shallow), PUT, PATCH (multi-path updates), POST and DELETE
+on /<path>.json. Data is kept in one nested dict, like the real tree.
+
+Every request can be delayed by a fixed latency plus uniform jitter and
+failed with a given probability, so the app can be load tested against
+a slow or flaky database without touching the real one.
+
+Point the app at it with the emulator form of the database URL, which
+makes firebase_admin skip OAuth:
+
+    FIREBASE_DATABASE_URL=http://127.0.0.1:<port>/?ns=<namespace>
+
+Usage:
+    python -m benchmarks.fake_rtdb --port 9000 --latency-ms 40 --jitter-ms 10
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from app.repositories.write_behind import PushIdGenerator
+
+
+def _split(path: str) -> list:
+    """'/fingerprints/abc.json' -> ['fingerprints', 'abc']"""
+    path = unquote(path)
+    if path.endswith('.json'):
+        path = path[:-5]
+    return [part for part in path.split('/') if part]
+
+
+def _query(value: Any, params: dict) -> Any:
+    """Apply orderBy/startAt/endAt/equalTo/limitTo* to the children of value"""
+    if 'orderBy' not in params or not isinstance(value, dict):
+        return value
+
+    order_by = json.loads(params['orderBy'])
+    if order_by == '$key':
+        sort_key = lambda item: item[0]
+    elif order_by == '$value':
+        sort_key = lambda item: item[1]
+    else:
+        sort_key = lambda item: item[1].get(order_by) if isinstance(item[1], dict) else None
+
+    items = [(key, child) for key, child in value.items()]
+    bounds = {name: json.loads(params[name]) for name in ('startAt', 'endAt', 'equalTo') if name in params}
+    if bounds:
+        # Children without the ordered value never match a bound
+        items = [item for item in items if sort_key(item) is not None]
+    if 'startAt' in bounds:
+        items = [item for item in items if sort_key(item) >= bounds['startAt']]
+    if 'endAt' in bounds:
+        items = [item for item in items if sort_key(item) <= bounds['endAt']]
+    if 'equalTo' in bounds:
+        items = [item for item in items if sort_key(item) == bounds['equalTo']]
+
+    if 'limitToFirst' in params or 'limitToLast' in params:
+        items.sort(key=lambda item: (sort_key(item) is not None, sort_key(item) or 0, item[0]))
+        if 'limitToFirst' in params:
+            items = items[:int(params['limitToFirst'])]
+        else:
+            items = items[-int(params['limitToLast']):]
+
+    return {key: child for key, child in items}
+
+
+class FakeRealtimeDatabase:
+    """Threaded HTTP server holding an in-memory RTDB tree"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0, namespace: str = 'loadtest',
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.namespace = namespace
+        self._root: dict = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._push_id = PushIdGenerator()
+        self._counts = Counter()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def database_url(self) -> str:
+        """Emulator-style databaseURL for firebase_admin"""
+        return f"http://{self.address}/?ns={self.namespace}"
+
+    def start(self) -> 'FakeRealtimeDatabase':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-rtdb', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> dict:
+        """Requests served per method, plus injected failures"""
+        with self._lock:
+            return dict(self._counts)
+
+    def snapshot(self, path: str = '/') -> Any:
+        with self._lock:
+            return json.loads(json.dumps(self._get(_split(path))))
+
+    # Tree operations, called with the lock held
+
+    def _get(self, parts: list) -> Any:
+        node = self._root
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def _set(self, parts: list, value: Any):
+        if not parts:
+            self._root = value if isinstance(value, dict) else {}
+            return
+
+        node = self._root
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                if value is None:
+                    return
+                child = node[part] = {}
+            node = child
+
+        if value is None:
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = value
+
+    def _respond(self, method: str, parts: list, params: dict, body: Any) -> Any:
+        """Apply one REST call and return the JSON response body"""
+        if method == 'GET':
+            value = _query(self._get(parts), params)
+            if params.get('shallow') == 'true' and isinstance(value, dict):
+                value = {key: True for key in value}
+            return value
+        if method == 'PUT':
+            self._set(parts, body)
+            return body
+        if method == 'PATCH':
+            for key, value in body.items():
+                self._set(parts + _split(key), value)
+            return body
+        if method == 'POST':
+            name = self._push_id()
+            self._set(parts + [name], body)
+            return {'name': name}
+        if method == 'DELETE':
+            self._set(parts, None)
+            return None
+        raise ValueError(f"Unsupported method {method}")
+
+    def _handler_class(self):
+        database = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                url = urlsplit(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+
+                # Injected latency and failures
+                delay = database.latency_ms + database._random.uniform(0, database.jitter_ms)
+                if delay > 0:
+                    time.sleep(delay / 1000)
+                if database.error_rate and database._random.random() < database.error_rate:
+                    with database._lock:
+                        database._counts['injected_errors'] += 1
+                    return self._send(503, {'error': 'Injected failure'})
+
+                try:
+                    with database._lock:
+                        database._counts[self.command] += 1
+                        result = database._respond(self.command, _split(url.path), params, body)
+                except Exception as e:
+                    return self._send(400, {'error': str(e)})
+
+                if params.get('print') == 'silent':
+                    return self._send(204, None)
+                self._send(200, result)
+
+            def _send(self, status: int, payload: Any):
+                data = b'' if status == 204 else json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_PUT = do_PATCH = do_POST = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Firebase Realtime Database REST server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--namespace', default='loadtest')
+    args = parser.parse_args()
+
+    database = FakeRealtimeDatabase(args.host, args.port, args.latency_ms, args.jitter_ms,
+                                    args.error_rate, args.namespace)
+    print(f"FIREBASE_DATABASE_URL={database.database_url}")
+    try:
+        database.start()._thread.join()
+    except KeyboardInterrupt:
+        database.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Seeded synthetic event streams modeled on the CSVs in data/raw
+
+Every generator takes the number of events, a kind ("human" or "bot") and
+a seed, and returns a DataFrame with the same columns and timestamp format
+as the recorded data, so it can be fed to the services directly or
+serialized with to_csv_bytes(), to_columnar_bytes() or (mouse only)
+to_trajectory_bytes() for the upload paths.
+"""
+import numpy as np
+import pandas as pd
+
+from app.utils.columnar import encode_columnar
+from app.utils.timestamps import decode_timestamps
+from app.utils.trajectory_codec import encode_trajectory
+
+KINDS = ('human', 'bot')
+
+# Session start used for every generated stream (2024-08-27T06:15:32.087Z)
+START_MS = 1_724_739_332_087
+
+FIELD_NAMES = ('username', 'password', 'email')
+
+KNOWN_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36'
+)
+
+
+def _check_kind(kind: str):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind '{kind}', expected one of {KINDS}")
+
+
+def iso_timestamps(ms: np.ndarray) -> np.ndarray:
+    """Epoch milliseconds to ISO-8601 strings with a Z suffix, like the browser logs"""
+    return np.char.add(np.datetime_as_string(ms.astype('datetime64[ms]'), unit='ms'), 'Z')
+
+
+def mouse_events(n: int, kind: str = 'human', seed: int = 0) -> pd.DataFrame:
+    """
+    Mouse trajectory with eventType, timestamp, x, y columns
+
+    Human: eased strokes between random targets sampled at ~60 Hz with
+    jitter and occasional pauses. Bot: one straight line with a constant
+    step and a near-constant ~300 ms period, like bot.csv.
+    """
+    _check_kind(kind)
+    rng = np.random.default_rng(seed)
+
+    if kind == 'bot':
+        step = rng.integers(1, 6, size=2) * rng.choice([-1, 1], size=2)
+        xy = rng.integers(200, 800, size=2) + np.outer(np.arange(n), step)
+        gaps = rng.normal(300, 10, size=n).round()
+    else:
+        xy = np.empty((n, 2))
+        position = rng.uniform(0, 1500, size=2)
+        filled = 0
+        while filled < n:
+            # One stroke: ease-in-out from the current position to a new target
+            length = min(int(rng.integers(8, 60)), n - filled)
+            target = rng.uniform(0, 1500, size=2)
+            progress = np.linspace(0, 1, length + 1)[1:]
+            eased = progress * progress * (3 - 2 * progress)
+            xy[filled:filled + length] = position + np.outer(eased, target - position)
+            position = target
+            filled += length
+        xy += rng.normal(scale=1.5, size=xy.shape)
+        gaps = rng.lognormal(np.log(16), 0.25, size=n)
+        pauses = rng.random(n) < 0.02
+        gaps[pauses] += rng.uniform(100, 800, size=pauses.sum())
+
+    ms = START_MS + np.cumsum(np.maximum(gaps, 1)).astype(np.int64)
+    return pd.DataFrame({
+        'eventType': 'mousemove',
+        'timestamp': iso_timestamps(ms),
+        'x': np.rint(xy[:, 0]).astype(np.int64),
+        'y': np.rint(xy[:, 1]).astype(np.int64),
+    })
+
+
+def key_events(n: int, kind: str = 'human', seed: int = 0) -> pd.DataFrame:
+    """
+    Keystrokes with eventType, timestamp, fieldName, fieldValue columns
+
+    Fields are typed one after another. Human: log-normal inter-key times
+    around 150 ms with longer gaps when moving to the next field. Bot:
+    1 ms apart, like bot.csv.
+    """
+    _check_kind(kind)
+    rng = np.random.default_rng(seed)
+
+    # Split the keystrokes over the form fields in order
+    cuts = np.sort(rng.integers(0, n + 1, size=len(FIELD_NAMES) - 1))
+    counts = np.diff(np.r_[0, cuts, n])
+    fields = np.repeat(np.array(FIELD_NAMES, dtype=object), counts)
+    field_starts = np.r_[0, np.cumsum(counts)[:-1]]
+
+    if kind == 'bot':
+        gaps = rng.choice([0, 1, 1, 1, 2], size=n).astype(np.float64)
+    else:
+        gaps = rng.lognormal(np.log(150), 0.5, size=n)
+        typed = field_starts[counts > 0]
+        gaps[typed] += rng.uniform(500, 2000, size=len(typed))
+
+    ms = START_MS + np.cumsum(gaps).astype(np.int64)
+    positions = np.arange(n) - np.repeat(field_starts, counts)
+    return pd.DataFrame({
+        'eventType': 'input',
+        'timestamp': iso_timestamps(ms),
+        'fieldName': fields,
+        'fieldValue': ['x' * (i % 32 + 1) for i in positions],
+    })
+
+
+def scroll_events(n: int, kind: str = 'human', seed: int = 0) -> pd.DataFrame:
+    """
+    Scroll samples with position, speed, timestamp (epoch ms) columns
+
+    Human: bursts of decaying wheel momentum in both directions with pauses
+    between them. Bot: constant speed down the page, one sample per millisecond like
+    the bot datasets.
+    """
+    _check_kind(kind)
+    rng = np.random.default_rng(seed)
+
+    if kind == 'bot':
+        speed = np.full(n, float(rng.integers(20, 80)))
+        gaps = np.ones(n)
+        position = np.cumsum(speed)
+    else:
+        # Wheel flicks: speed decays within a burst, direction flips between bursts
+        burst = np.cumsum(rng.random(n) < 0.08)
+        direction = np.where(rng.random(burst[-1] + 1) < 0.8, 1.0, -1.0)[burst]
+        age = np.arange(n) - np.searchsorted(burst, burst)
+        speed = rng.uniform(1, 4, size=n) * np.exp(-age / 6)
+        gaps = rng.lognormal(np.log(16), 0.2, size=n)
+        starts = np.r_[False, np.diff(burst) > 0]
+        gaps[starts] += rng.uniform(200, 1500, size=starts.sum())
+        position = np.maximum(np.cumsum(direction * speed * rng.uniform(10, 20, size=n)), 0)
+
+    ms = START_MS + np.cumsum(gaps).astype(np.int64)
+    return pd.DataFrame({'position': position, 'speed': speed, 'timestamp': ms})
+
+
+def browser_infos(n: int, kind: str = 'human', seed: int = 0) -> list:
+    """
+    browser_info payloads drawn from a small repeating population
+
+    Human payloads use known user agents and platforms. Bot payloads
+    mix webdriver=true, headless user agents and odd screen sizes.
+    """
+    _check_kind(kind)
+    rng = np.random.default_rng(seed)
+
+    if kind == 'bot':
+        population = [
+            {'userAgent': KNOWN_USER_AGENT, 'webdriver': True, 'platform': 'Win32',
+             'screenResolution': '1920x1080', 'maxTouchPoints': 0, 'pluginsCount': 0, 'languages': ['en-US']},
+            {'userAgent': KNOWN_USER_AGENT.replace('Chrome/', 'HeadlessChrome/'), 'webdriver': False,
+             'platform': 'Linux x86_64', 'screenResolution': '800x600', 'maxTouchPoints': 0,
+             'pluginsCount': 0, 'languages': ['en-US']},
+            {'userAgent': 'python-requests/2.31.0', 'webdriver': False, 'platform': 'Linux x86_64',
+             'screenResolution': '0x0', 'maxTouchPoints': 0},
+        ]
+    else:
+        population = [
+            {'userAgent': KNOWN_USER_AGENT, 'webdriver': False, 'platform': platform,
+             'screenResolution': resolution, 'maxTouchPoints': 0, 'pluginsCount': 5, 'languages': ['en-US', 'en']}
+            for platform in ('Win32', 'Win64')
+            for resolution in ('1920x1080', '1366x768', '2560x1440')
+        ]
+
+    return [dict(population[i]) for i in rng.integers(0, len(population), size=n)]
+
+
+def to_csv_bytes(data: pd.DataFrame) -> bytes:
+    """Serialize like an uploaded CSV file"""
+    return data.to_csv(index=False).encode('utf-8')
+
+
+# Typed columns sent in the columnar upload encoding; other columns are dropped
+COLUMNAR_DTYPES = {'x': np.int32, 'y': np.int32, 'position': np.float64, 'speed': np.float64}
+
+
+def to_columnar_bytes(data: pd.DataFrame) -> bytes:
+    """Serialize in the columnar .npy upload encoding (app.utils.columnar)"""
+    columns = {'timestamp': decode_timestamps(data['timestamp'])}
+    for name, dtype in COLUMNAR_DTYPES.items():
+        if name in data:
+            columns[name] = data[name].to_numpy(dtype=dtype)
+    if 'fieldName' in data:
+        columns['fieldName'] = data['fieldName'].to_numpy(dtype=str)
+    return encode_columnar(columns)
+
+
+def to_trajectory_bytes(data: pd.DataFrame) -> bytes:
+    """Serialize mouse events with the compact trajectory codec (app.utils.trajectory_codec)"""
+    return encode_trajectory(decode_timestamps(data['timestamp']), data['x'].to_numpy(), data['y'].to_numpy())
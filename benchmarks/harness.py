@@ -0,0 +1,110 @@
+"""
+Timing, memory and result-file helpers shared by the benchmarks
+
+measure() times a callable with perf_counter and reports percentiles,
+then repeats it once under tracemalloc for the peak allocation (kept out
+of the timed runs, since tracing slows allocation down). NumPy registers
+its buffers with tracemalloc, so arrays are included in the peak.
+"""
+import gc
+import os
+import json
+import time
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+RESULTS_DIR = "benchmarks/results"
+
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Latency percentiles (ms) over repeat calls plus peak traced memory (MiB)"""
+    for _ in range(warmup):
+        func()
+
+    samples = np.empty(repeat)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples[i] = time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples *= 1000
+    return {
+        'repeat': repeat,
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'mean_ms': float(samples.mean()),
+        'min_ms': float(samples.min()),
+        'peak_mib': peak / 2**20,
+    }
+
+
+def repeat_for(events: int, budget_events: int = 200_000, low: int = 3, high: int = 200) -> int:
+    """Fewer repetitions for bigger inputs so every size takes similar time"""
+    return int(min(high, max(low, budget_events // max(events, 1))))
+
+
+def git_revision() -> Optional[str]:
+    """Current commit, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Machine, library versions and the settings that change the hot paths"""
+    import pandas
+    import sklearn
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'sklearn': sklearn.__version__,
+        'settings': settings,
+    }
+
+
+def save_results(name: str, meta: Dict[str, Any], results: List[Dict[str, Any]],
+                 output: Optional[str] = None) -> str:
+    """Write one run as JSON; the default name sorts chronologically"""
+    if output is None:
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        output = os.path.join(RESULTS_DIR, f"{name}-{stamp}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'name': name, 'meta': meta, 'results': results}, f, indent=2)
+    return output
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
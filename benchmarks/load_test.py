@@ -0,0 +1,429 @@
+"""
+End-to-end HTTP load test for the API against a fake Firebase database
+
+Starts benchmarks.fake_rtdb.FakeRealtimeDatabase in this process (with
+injected latency, jitter and failures), then runs app.main:app under
+uvicorn in a subprocess. The app uses the real FirebaseRepository,
+pointed at the fake, with a throwaway service account. Traffic is sent to
+/api/predict_behavior (multipart uploads) and /api/add_visit_info in the
+weights given by --mix, with one of two load models:
+
+    --rps N          open loop: requests start on a fixed schedule and
+                     latency counts from the scheduled start, so a
+                     slow server can't hide queueing (no coordinated omission)
+    --concurrency N  closed loop: N clients each send their next request
+                     when the previous one completes
+
+Uploads are synthetic (benchmarks.generators, --events per stream) or
+replayed from the recorded human*/bot* sessions in data/raw (--replay).
+For each endpoint the report gives throughput, latency percentiles, the
+error rate and the status codes. It is saved as JSON under
+benchmarks/results/, together with the fake database's request counts.
+
+Extra app settings can be passed with --app-env, e.g.
+--app-env VISIT_WRITE_BEHIND_ENABLED=true INFERENCE_EXECUTOR=process.
+The payloads repeat, so the started server runs with the verdict cache
+off unless --app-env turns it on. --url sends the traffic to a server
+that is already running, and starts nothing. The server's verdict cache
+counters are saved with the results either way; hits mean the predict
+latencies include cached verdicts.
+
+Usage:
+    python -m benchmarks.load_test --rps 50 --duration 30 --rtdb-latency-ms 40
+    python -m benchmarks.load_test --concurrency 32 --replay --workers 2
+"""
+import os
+import sys
+import glob
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks.fake_rtdb import FakeRealtimeDatabase
+from benchmarks.generators import KINDS, browser_infos, key_events, mouse_events, scroll_events, to_csv_bytes
+from benchmarks.harness import environment, save_results
+
+ENDPOINTS = {
+    'predict_behavior': '/api/predict_behavior',
+    'add_visit_info': '/api/add_visit_info',
+}
+REPLAY_GLOBS = {
+    'mouse': "data/raw/Mouse Movement Model/{kind}*.csv",
+    'key': "data/raw/Keypress Model/{kind}*.csv",
+    'scroll': "data/raw/Scroll Movement/dataset/{kind}/*.csv",
+}
+MODEL_PATHS = {
+    'MOUSE_MODEL_PATH': "artifacts/serialized/models/MouseVerifier.pkl",
+    'KEYBOARD_MODEL_PATH': "artifacts/serialized/models/KeyboardVerifier.pkl",
+    'MOUSE_SESSION_MODEL_PATH': "artifacts/serialized/models/MouseSessionVerifier.pkl",
+    'SCROLL_MODEL_PATH': "artifacts/serialized/models/ScrollVerifier.pkl",
+}
+
+
+@dataclass
+class Payload:
+    """One predict_behavior upload"""
+    kind: str
+    mouse: bytes
+    key: bytes
+    scroll: bytes
+    browser_info: str
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+    def record(self, latency_ms: float, status: str, ok: bool):
+        self.latencies_ms.append(latency_ms)
+        self.statuses[status] += 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        requests = len(self.latencies_ms)
+        latencies = np.array(self.latencies_ms) if requests else np.zeros(1)
+        return {
+            'requests': requests,
+            'errors': self.errors,
+            'error_rate': self.errors / requests if requests else 0.0,
+            'throughput_rps': requests / elapsed if elapsed else 0.0,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p90_ms': float(np.percentile(latencies, 90)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'max_ms': float(latencies.max()),
+            'mean_ms': float(latencies.mean()),
+            'statuses': dict(self.statuses),
+        }
+
+
+def synthetic_payloads(count: int, events: int, bot_share: float, seed: int) -> List[Payload]:
+    """Generated sessions, bot_share of them bot-like"""
+    rng = random.Random(seed)
+    payloads = []
+    for i in range(count):
+        kind = 'bot' if rng.random() < bot_share else 'human'
+        payloads.append(Payload(
+            kind=kind,
+            mouse=to_csv_bytes(mouse_events(events, kind, seed + i)),
+            key=to_csv_bytes(key_events(max(events // 10, 1), kind, seed + i)),
+            scroll=to_csv_bytes(scroll_events(max(events // 4, 1), kind, seed + i)),
+            browser_info=json.dumps(browser_infos(1, kind, seed + i)[0]),
+        ))
+    return payloads
+
+
+def replay_payloads(bot_share: float, seed: int, count: int = 64) -> List[Payload]:
+    """Recorded data/raw sessions, cycled so every file gets used"""
+    rng = random.Random(seed)
+    recorded = {
+        kind: {signal: [open(path, 'rb').read() for path in sorted(glob.glob(pattern.format(kind=kind)))]
+               for signal, pattern in REPLAY_GLOBS.items()}
+        for kind in KINDS
+    }
+    for kind, files in recorded.items():
+        for signal, contents in files.items():
+            if not contents:
+                raise FileNotFoundError(f"No {kind} {signal} recordings matching {REPLAY_GLOBS[signal]}")
+
+    browsers = {kind: browser_infos(count, kind, seed) for kind in KINDS}
+    payloads = []
+    for i in range(count):
+        kind = 'bot' if rng.random() < bot_share else 'human'
+        files = recorded[kind]
+        payloads.append(Payload(
+            kind=kind,
+            mouse=files['mouse'][i % len(files['mouse'])],
+            key=files['key'][i % len(files['key'])],
+            scroll=files['scroll'][i % len(files['scroll'])],
+            browser_info=json.dumps(browsers[kind][i]),
+        ))
+    return payloads
+
+
+def write_service_account(path: str):
+    """Throwaway service account: firebase_admin needs a parseable key, the fake never checks it"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_key = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode('ascii')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'type': 'service_account',
+            'project_id': 'loadtest',
+            'private_key_id': 'loadtest',
+            'private_key': private_key,
+            'client_email': 'loadtest@loadtest.iam.gserviceaccount.com',
+            'client_id': '0',
+            'token_uri': 'http://127.0.0.1:1/token',
+        }, f)
+
+
+class Server:
+    """uvicorn running app.main:app against the fake database"""
+
+    def __init__(self, database: FakeRealtimeDatabase, port: int, workers: int, app_env: Dict[str, str]):
+        self.workers = workers
+        self.url = f"http://127.0.0.1:{port}"
+        self._workdir = tempfile.mkdtemp(prefix='smart-captcha-load-')
+        self.log_path = os.path.join(self._workdir, 'app.log')
+        credentials_path = os.path.join(self._workdir, 'service_account.json')
+        write_service_account(credentials_path)
+
+        # The checked-in model artifacts, unless the environment names others
+        self.env = {
+            **{name: path for name, path in MODEL_PATHS.items() if os.path.exists(path)},
+            **os.environ,
+            'STORAGE_BACKEND': 'firebase',
+            'FIREBASE_CREDENTIALS_PATH': credentials_path,
+            'FIREBASE_DATABASE_URL': database.database_url,
+            # The payloads repeat; a cache would answer most of them without scoring
+            'VERDICT_CACHE_ENABLED': 'false',
+            **app_env,
+        }
+        self.command = [
+            sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1', '--port', str(port),
+            '--workers', str(workers), '--log-level', 'warning', '--no-access-log',
+        ]
+        self._process: Optional[subprocess.Popen] = None
+        self._log = None
+
+    def start(self, timeout: float = 120.0):
+        self._log = open(self.log_path, 'wb')
+        self._process = subprocess.Popen(self.command, env=self.env, stdout=self._log, stderr=subprocess.STDOUT)
+
+        # Wait until the workers have warmed up and report ready
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {self._process.returncode}, see {self.log_path}")
+            try:
+                if httpx.get(f"{self.url}/health/ready", timeout=1.0).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.25)
+        self.stop()
+        raise RuntimeError(f"Server not ready after {timeout:.0f}s, see {self.log_path}")
+
+    def stop(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        if self._log is not None:
+            self._log.close()
+
+
+class LoadGenerator:
+    """Sends the request mix and records per-endpoint outcomes"""
+
+    def __init__(self, base_url: str, payloads: List[Payload], mix: Dict[str, float],
+                 fingerprints: int, seed: int, max_connections: int):
+        self.base_url = base_url
+        self.payloads = payloads
+        self.endpoints = list(mix)
+        self.weights = [mix[name] for name in self.endpoints]
+        self.fingerprints = [f"load-{i:06d}" for i in range(fingerprints)]
+        self.random = random.Random(seed)
+        self.stats: Dict[str, EndpointStats] = {name: EndpointStats() for name in self.endpoints}
+        self.recording = False
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+
+    def _request(self, endpoint: str):
+        """Keyword arguments for httpx for one request of the given endpoint"""
+        fingerprint = self.random.choice(self.fingerprints)
+        if endpoint == 'add_visit_info':
+            return {'data': {'fingerprint': fingerprint, 'timestamp': str(int(time.time() * 1000))}}
+
+        payload = self.random.choice(self.payloads)
+        return {
+            'data': {'browser_info': payload.browser_info, 'fingerprint': fingerprint},
+            'files': {
+                'mouse_file': ('mouse.csv', payload.mouse, 'text/csv'),
+                'key_file': ('key.csv', payload.key, 'text/csv'),
+                'scroll_file': ('scroll.csv', payload.scroll, 'text/csv'),
+            },
+        }
+
+    async def _send(self, client: httpx.AsyncClient, started: Optional[float] = None):
+        endpoint = self.random.choices(self.endpoints, self.weights)[0]
+        request = self._request(endpoint)
+        started = time.perf_counter() if started is None else started
+        try:
+            response = await client.post(ENDPOINTS[endpoint], **request)
+            status, ok = str(response.status_code), response.is_success
+        except httpx.HTTPError as e:
+            status, ok = type(e).__name__, False
+
+        if self.recording:
+            self.stats[endpoint].record((time.perf_counter() - started) * 1000, status, ok)
+
+    async def open_loop(self, rps: float, duration: float):
+        """Start requests on a fixed schedule regardless of completions"""
+        async with httpx.AsyncClient(base_url=self.base_url, limits=self.limits, timeout=60.0) as client:
+            start = time.perf_counter()
+            tasks = set()
+            for i in range(int(rps * duration)):
+                scheduled = start + i / rps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(self._send(client, scheduled))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+
+    async def closed_loop(self, concurrency: int, duration: float):
+        """concurrency clients, each sending back to back until the deadline"""
+        async with httpx.AsyncClient(base_url=self.base_url, limits=self.limits, timeout=60.0) as client:
+            deadline = time.perf_counter() + duration
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await self._send(client)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def run(self, args) -> float:
+        """Warm up unrecorded, then run the measured phase; returns its length in seconds"""
+        drive = (lambda seconds: self.open_loop(args.rps, seconds)) if args.rps \
+            else (lambda seconds: self.closed_loop(args.concurrency, seconds))
+        if args.warmup > 0:
+            await drive(args.warmup)
+
+        self.recording = True
+        start = time.perf_counter()
+        await drive(args.duration)
+        return time.perf_counter() - start
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """'predict_behavior=3,add_visit_info=1' -> weights per endpoint"""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}', expected one of {list(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def parse_env(items: List[str]) -> Dict[str, str]:
+    return dict(item.split('=', 1) for item in items)
+
+
+def verdict_cache_stats(base_url: str) -> dict:
+    """The server's verdict cache counters (one worker's), empty if unavailable"""
+    try:
+        response = httpx.get(f"{base_url}/api/verdict_cache_stats", timeout=10.0)
+        return response.json() if response.is_success else {}
+    except httpx.HTTPError:
+        return {}
+
+
+def print_report(summaries: Dict[str, dict], database_stats: dict):
+    print(f"{'endpoint':>17} {'requests':>9} {'rps':>8} {'errors':>7} {'p50 ms':>9} {'p90 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9}  statuses")
+    for name, s in summaries.items():
+        print(f"{name:>17} {s['requests']:>9} {s['throughput_rps']:>8.1f} {s['error_rate']:>7.1%} "
+              f"{s['p50_ms']:>9.1f} {s['p90_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}  {s['statuses']}")
+    if database_stats:
+        print(f"Fake RTDB requests: {database_stats}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument('--rps', type=float, help="Open-loop target request rate")
+    load.add_argument('--concurrency', type=int, default=16, help="Closed-loop client count (default 16)")
+    parser.add_argument('--duration', type=float, default=30.0, help="Measured seconds")
+    parser.add_argument('--warmup', type=float, default=3.0, help="Unrecorded seconds before measuring")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('predict_behavior=1,add_visit_info=1'))
+    parser.add_argument('--replay', action='store_true', help="Replay data/raw sessions instead of synthetic ones")
+    parser.add_argument('--events', type=int, default=300, help="Mouse events per synthetic session")
+    parser.add_argument('--bot-share', type=float, default=0.5)
+    parser.add_argument('--fingerprints', type=int, default=1000, help="Distinct fingerprints to draw from")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-connections', type=int, default=256)
+    parser.add_argument('--rtdb-latency-ms', type=float, default=30.0)
+    parser.add_argument('--rtdb-jitter-ms', type=float, default=10.0)
+    parser.add_argument('--rtdb-error-rate', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument('--app-env', nargs='*', default=[], metavar='NAME=VALUE', help="Extra app settings")
+    parser.add_argument('--url', help="Load an already running server instead of starting one")
+    parser.add_argument('--output', help="JSON path (default: benchmarks/results/load-<utc time>.json)")
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        payloads = replay_payloads(args.bot_share, args.seed)
+    else:
+        payloads = synthetic_payloads(64, args.events, args.bot_share, args.seed)
+
+    database, server = None, None
+    try:
+        if args.url:
+            base_url = args.url.rstrip('/')
+        else:
+            database = FakeRealtimeDatabase(latency_ms=args.rtdb_latency_ms, jitter_ms=args.rtdb_jitter_ms,
+                                            error_rate=args.rtdb_error_rate, seed=args.seed).start()
+            server = Server(database, args.port, args.workers, parse_env(args.app_env))
+            server.start()
+            base_url = server.url
+
+        generator = LoadGenerator(base_url, payloads, args.mix, args.fingerprints, args.seed, args.max_connections)
+        elapsed = asyncio.run(generator.run(args))
+        verdict_cache = verdict_cache_stats(base_url)
+    finally:
+        if server is not None:
+            server.stop()
+        if database is not None:
+            database.stop()
+
+    summaries = {name: stats.summary(elapsed) for name, stats in generator.stats.items()}
+    database_stats = database.stats() if database is not None else {}
+    print_report(summaries, database_stats)
+    if verdict_cache.get('hits'):
+        print(f"Verdict cache answered {verdict_cache['hits']} uploads: predict latencies include cached verdicts")
+
+    if not args.no_save:
+        meta = environment({
+            'load': {'rps': args.rps} if args.rps else {'concurrency': args.concurrency},
+            'duration': args.duration,
+            'mix': args.mix,
+            'source': 'replay' if args.replay else f"synthetic ({args.events} events)",
+            'bot_share': args.bot_share,
+            'rtdb': {'latency_ms': args.rtdb_latency_ms, 'jitter_ms': args.rtdb_jitter_ms,
+                     'error_rate': args.rtdb_error_rate},
+            'workers': args.workers,
+            'app_env': parse_env(args.app_env),
+            'url': args.url,
+        })
+        results = [{'endpoint': name, **summary} for name, summary in summaries.items()]
+        meta['rtdb_requests'] = database_stats
+        meta['verdict_cache'] = verdict_cache
+        print(f"Saved {save_results('load', meta, results, args.output)}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
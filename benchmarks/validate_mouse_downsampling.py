@@ -0,0 +1,133 @@
+"""
+Accuracy and latency check for mouse trajectory downsampling
+
+Accuracy: every labelled file in data/raw/Mouse Movement Model (human*.csv
+is class 0, bot*.csv class 1) is scored whole and in sliding windows under
+each reduction config. For each config the table reports the events kept,
+the per-event accuracy of the point model, the accuracy of the request
+verdicts and how often the verdict agrees with no reduction at all. The
+labelled sets are a few hundred events long, so the event-cap configs use
+small caps that actually cut them.
+
+Latency: synthetic uploads from 1e3 to 1e6 events go through the same
+parse-and-score path as /api/predict_behavior, with the default event cap
+and without one, to show the request cost levels off at the cap.
+
+Usage:
+    python -m benchmarks.validate_mouse_downsampling [--window 60 --step 20]
+"""
+import os
+import glob
+import argparse
+import contextlib
+import numpy as np
+import pandas as pd
+
+from benchmarks.generators import mouse_events, to_csv_bytes
+from benchmarks.harness import measure, repeat_for
+from app.config import get_settings
+from app.services.inference_executor import parse_and_predict
+from app.services.mouse_detection_service import MouseDetectionService
+
+MOUSE_DATA_DIR = "data/raw/Mouse Movement Model"
+LABELS = {'human': 0, 'bot': 1}
+LATENCY_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# name -> (max_events, reduction, rdp epsilon, resample interval ms)
+CONFIGS = {
+    'none': (0, 'none', 1.0, 8.0),
+    'rdp eps=0.5': (0, 'rdp', 0.5, 8.0),
+    'rdp eps=1': (0, 'rdp', 1.0, 8.0),
+    'rdp eps=2': (0, 'rdp', 2.0, 8.0),
+    'resample 8ms': (0, 'resample', 1.0, 8.0),
+    'resample 16ms': (0, 'resample', 1.0, 16.0),
+    'cap 100': (100, 'none', 1.0, 8.0),
+    'cap 50': (50, 'none', 1.0, 8.0),
+    'cap 100 + rdp eps=1': (100, 'rdp', 1.0, 8.0),
+}
+
+
+def configure(service: MouseDetectionService, max_events: int, reduction: str, epsilon: float, interval_ms: float):
+    service.max_events = max_events
+    service.reduction = reduction
+    service.rdp_epsilon = epsilon
+    service.resample_interval_ms = interval_ms
+
+
+def labelled_sets():
+    """(file name, label, DataFrame) for every human*/bot* file"""
+    for path in sorted(glob.glob(os.path.join(MOUSE_DATA_DIR, '*.csv'))):
+        name = os.path.basename(path)
+        kind = next((kind for kind in LABELS if name.startswith(kind)), None)
+        if kind is not None:
+            yield name, LABELS[kind], pd.read_csv(path)
+
+
+def samples(data: pd.DataFrame, window: int, step: int):
+    """The whole file, then sliding windows over it"""
+    yield data
+    for start in range(0, len(data) - window + 1, step):
+        yield data.iloc[start:start + window].reset_index(drop=True)
+
+
+def check_accuracy(service: MouseDetectionService, window: int, step: int):
+    sets = list(labelled_sets())
+    baseline = {}
+    print(f"\nAccuracy ({', '.join(name for name, _, _ in sets)}; windows of {window} every {step})")
+    print(f"{'config':>22} {'kept':>7} {'event acc':>10} {'verdict acc':>12} {'agreement':>10}")
+
+    for config, params in CONFIGS.items():
+        configure(service, *params)
+        total = kept = correct_events = 0
+        verdicts = []
+        for name, label, data in sets:
+            for i, sample in enumerate(samples(data, window, step)):
+                features = service.extract_features(sample)
+                predictions = service.model.predict(features)
+                total += len(sample)
+                kept += len(features)
+                correct_events += int((predictions == label).sum())
+                verdict = service.interpret(predictions)
+                verdicts.append(((name, i), verdict, verdict == ('Bot' if label else 'Human')))
+
+        if config == 'none':
+            baseline = {key: verdict for key, verdict, _ in verdicts}
+        agreement = np.mean([baseline[key] == verdict for key, verdict, _ in verdicts])
+        verdict_accuracy = np.mean([correct for _, _, correct in verdicts])
+        print(f"{config:>22} {kept / total:>6.1%} {correct_events / kept:>10.1%} "
+              f"{verdict_accuracy:>12.1%} {agreement:>10.1%}")
+
+
+def check_latency(service: MouseDetectionService, default_cap: int):
+    print(f"\nLatency of parse + score per upload (p50 ms), point model")
+    print(f"{'events':>10} {'no cap':>10} {f'cap {default_cap}':>12}")
+    devnull = open(os.devnull, 'w')
+    for n in LATENCY_SIZES:
+        data = to_csv_bytes(mouse_events(n, 'human', seed=n))
+        row = []
+        for cap in (0, default_cap):
+            configure(service, cap, 'none', 1.0, 8.0)
+            with contextlib.redirect_stdout(devnull):
+                stats = measure(lambda: parse_and_predict(service, data), repeat_for(n if not cap else min(n, cap)))
+            row.append(stats['p50_ms'])
+        print(f"{n:>10} {row[0]:>10.1f} {row[1]:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate mouse trajectory downsampling")
+    parser.add_argument('--window', type=int, default=60, help="Events per sliding window")
+    parser.add_argument('--step', type=int, default=20, help="Events between window starts")
+    parser.add_argument('--no-latency', action='store_true', help="Skip the synthetic latency table")
+    args = parser.parse_args()
+
+    service = MouseDetectionService()
+    if service.mode != 'point':
+        raise SystemExit("Run with MOUSE_MODEL_MODE=point")
+
+    check_accuracy(service, args.window, args.step)
+    if not args.no_latency:
+        check_latency(service, get_settings().MOUSE_MAX_EVENTS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import joblib
+import pandas as pd
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier
+from sklearn.model_selection import cross_val_score
+
+# Share the feature code with the API
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+from app.utils.features import (
+    MOUSE_SESSION_FEATURE_COLUMNS, MOUSE_SESSION_WINDOW, extract_mouse_session_features, extract_mouse_session_windows
+)
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(ROOT_DIR, 'artifacts', 'serialized', 'models', 'MouseSessionVerifier.pkl')
+
+# Session windows cut from each recording (events per window, step between windows).
+# The API scores uploads on windows of the same size, see extract_mouse_session_windows
+WINDOW_SIZE = MOUSE_SESSION_WINDOW
+WINDOW_STEP = 5
+
+
+# Function to parse the dataset
+def parse_data(file_path):
+    data = pd.read_csv(file_path)
+    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    return data
+
+
+# Function to summarize every window of a recording into one row
+def extract_session_rows(data):
+    x = data['x'].to_numpy()
+    y = data['y'].to_numpy()
+    timestamps_ns = data['timestamp'].dt.as_unit('ns').astype('int64').to_numpy()
+
+    rows = []
+    for start in range(0, max(len(data) - WINDOW_SIZE, 0) + 1, WINDOW_STEP):
+        end = start + WINDOW_SIZE
+        rows.append(extract_mouse_session_features(x[start:end], y[start:end], timestamps_ns[start:end]))
+    return pd.DataFrame(rows, columns=list(MOUSE_SESSION_FEATURE_COLUMNS))
+
+
+# Prepare features and labels
+features_human = extract_session_rows(parse_data(os.path.join(DATA_DIR, 'human.csv')))
+features_bot = extract_session_rows(parse_data(os.path.join(DATA_DIR, 'bot.csv')))
+
+features_human['label'] = 0  # Human label
+features_bot['label'] = 1    # Bot label
+
+dataset = pd.concat([features_human, features_bot]).reset_index(drop=True)
+X = dataset.drop('label', axis=1).to_numpy()
+y = dataset['label'].to_numpy()
+
+# Train the session model
+model = ExtraTreesClassifier(n_estimators=100, random_state=42)
+scores = cross_val_score(model, X, y, cv=5)
+print(f"Cross-validated accuracy: {np.mean(scores):.3f} (+/- {np.std(scores):.3f})")
+
+model.fit(X, y)
+joblib.dump(model, MODEL_PATH)
+print(f"Session model saved to {MODEL_PATH}")
+
+
+# Function to predict a whole recording by a majority vote over its windows, like the API
+def predict_new_data(file_path, model):
+    new_data = parse_data(file_path)
+    windows = extract_mouse_session_windows(
+        new_data['x'].to_numpy(),
+        new_data['y'].to_numpy(),
+        new_data['timestamp'].dt.as_unit('ns').astype('int64').to_numpy()
+    )
+    predictions = model.predict(windows)
+    prediction = "Human" if (predictions == 0).sum() > (predictions == 1).sum() else "Bot"
+    print(f"The session prediction for '{os.path.basename(file_path)}' is: {prediction}")
+    return prediction
+
+
+predict_new_data(os.path.join(DATA_DIR, 'human_test.csv'), model)
+predict_new_data(os.path.join(DATA_DIR, 'bot_test.csv'), model)